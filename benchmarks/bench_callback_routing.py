@@ -0,0 +1,126 @@
+"""
+Сравнение стоимости маршрутизации callback-запроса:
+цепочка фильтров aiogram (как было в telegram_bot.py) против CallbackDispatcher.
+
+Запуск: ``cd benchmarks && pytest bench_callback_routing.py``
+"""
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from bots.platforms.telegram.callback_dispatcher import CallbackDispatcher
+from bots.utils.callback_data import CallbackData
+
+WAITING_FOR_LANGUAGE = "UserDataStates:WAITING_FOR_LANGUAGE"
+CONFIRMING_CHANGES = "UserDataStates:CONFIRMING_CHANGES"
+
+SAMPLES = [
+    CallbackData.BOOK_EVENT.value,
+    CallbackData.date(2025, 3, 14),
+    CallbackData.month(2025, 4),
+    CallbackData.time(date(2025, 3, 14), 15),
+    CallbackData.FINISH_BOOKING.value,
+]
+
+LEGACY_SAMPLES = ["book_event", "date_2025_3_14", "month_2025_4", "time_15", "finish_booking"]
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+def _run(coroutine):
+    """Выполняет корутину без event loop: маршрутизация не делает реального ожидания."""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+    raise RuntimeError("Корутина ожидала I/O")
+
+
+class _State:
+    def __init__(self, value):
+        self.__value = value
+
+    async def get_state(self):
+        return self.__value
+
+
+def _legacy_filter_chain():
+    """Порядок и фильтры обработчиков в том виде, в котором их проверял aiogram."""
+    return [
+        (lambda c, s: c.data == "change_data", lambda d: None),
+        (lambda c, s: s == WAITING_FOR_LANGUAGE, lambda d: d.split("_")[1]),
+        (lambda c, s: c.data == "confirm_changes" and s == CONFIRMING_CHANGES, lambda d: None),
+        (lambda c, s: c.data == "reject_changes" and s == CONFIRMING_CHANGES, lambda d: None),
+        (lambda c, s: c.data == CallbackData.BOOK_EVENT.value, lambda d: None),
+        (lambda c, s: c.data.startswith("date_"), lambda d: tuple(int(x) for x in d.split("_")[1:])),
+        (lambda c, s: c.data.startswith("month_"), lambda d: tuple(int(x) for x in d.split("_")[1:])),
+        (lambda c, s: c.data.startswith("time_"), lambda d: int(d.split("_")[1])),
+        (lambda c, s: c.data == CallbackData.FINISH_BOOKING.value, lambda d: None),
+    ]
+
+
+def _dispatcher() -> CallbackDispatcher:
+    dispatcher = CallbackDispatcher()
+    dispatcher.exact(CallbackData.UPDATE_DATA.value)(_noop)
+    dispatcher.prefix(CallbackData.LANGUAGE_PREFIX.value, CallbackData.parse_language,
+                      state=WAITING_FOR_LANGUAGE)(_noop)
+    dispatcher.exact(CallbackData.CONFIRM_CHANGES.value, state=CONFIRMING_CHANGES)(_noop)
+    dispatcher.exact(CallbackData.REJECT_CHANGES.value, state=CONFIRMING_CHANGES)(_noop)
+    dispatcher.exact(CallbackData.BOOK_EVENT.value)(_noop)
+    dispatcher.prefix(CallbackData.DATE_PREFIX.value, CallbackData.parse_date)(_noop)
+    dispatcher.prefix(CallbackData.MONTH_PREFIX.value, CallbackData.parse_month)(_noop)
+    dispatcher.prefix(CallbackData.TIME_PREFIX.value, CallbackData.parse_time)(_noop)
+    dispatcher.exact(CallbackData.FINISH_BOOKING.value)(_noop)
+    return dispatcher
+
+
+@pytest.mark.benchmark(group="callback-routing")
+def bench_legacy_filter_chain(benchmark):
+    chain = _legacy_filter_chain()
+    queries = [SimpleNamespace(data=data) for data in LEGACY_SAMPLES]
+
+    def route_all():
+        for query in queries:
+            for check, parse in chain:
+                if check(query, None):
+                    parse(query.data)
+                    break
+
+    benchmark(route_all)
+
+
+@pytest.mark.benchmark(group="callback-routing")
+def bench_callback_dispatcher(benchmark):
+    dispatcher = _dispatcher()
+    state = _State(None)
+
+    def route_all():
+        for data in SAMPLES:
+            _run(dispatcher.resolve(data, state))
+
+    benchmark(route_all)
+
+
+def bench_dispatcher_resolves_same_routes():
+    dispatcher = _dispatcher()
+    state = _State(None)
+
+    assert _run(dispatcher.resolve(CallbackData.date(2025, 3, 14), state))[1].day == 14
+    assert _run(dispatcher.resolve(CallbackData.time(date(2025, 3, 14), 15), state))[1].hour == 15
+    assert _run(dispatcher.resolve(CallbackData.CONFIRM_CHANGES.value, state)) is None
+    assert _run(dispatcher.resolve(CallbackData.IGNORE.value, state)) is None
+
+
+@pytest.mark.benchmark(group="callback-codec")
+def bench_callback_codec_round_trip(benchmark):
+    selected_date = date(2025, 3, 14)
+
+    def round_trip():
+        for hour in range(10, 18):
+            CallbackData.parse_time(CallbackData.time(selected_date, hour))
+
+    benchmark(round_trip)
@@ -0,0 +1,148 @@
+"""
+Микробенчмарки горячих функций.
+
+Результаты сохраняются в ``benchmarks/.benchmarks`` (см. pytest.ini). Сравнение с прошлым прогоном
+и падение при замедлении: ``pytest --benchmark-compare --benchmark-compare-fail=mean:15%``.
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from pytz import timezone
+
+from bots.config.availability_days_config import AvailabilityDaysConfig
+from bots.platforms.telegram.menu_builder import MenuBuilder
+from bots.services.analytics_service import aggregate_period, capacity_hours
+from bots.services.availability_service import FreeSlotMatrix
+from bots.services.session_service import decode_state_payload, encode_state_payload
+from bots.services.user_service import row_to_user_dto
+from bots.utils.cryptographer import decrypt_platform_user_id, encrypt_platform_user_id
+
+
+@pytest.mark.benchmark(group="caldav")
+def bench_parse_calendar_events(benchmark, caldav_service, busy_day):
+    moscow = timezone("Europe/Moscow")
+    start = moscow.localize(datetime.combine(busy_day, datetime.min.time()))
+    events = caldav_service.get_events(start, start + timedelta(days=1), moscow)
+    assert events
+
+    busy_hours = benchmark(caldav_service.parse_calendar_events, events)
+
+    assert busy_hours
+
+
+@pytest.mark.benchmark(group="caldav")
+def bench_book_slot_overlap_check(benchmark, caldav_service, busy_day, event_loop_runner):
+    utc = timezone("UTC")
+    start = timezone("Europe/Moscow").localize(datetime.combine(busy_day, datetime.min.time()).replace(hour=17))
+
+    def book_conflicting_slot():
+        return event_loop_runner(caldav_service.book_slot(
+            summary="Пётр Петров 1500 (Java)",
+            start=start.astimezone(utc),
+            end=(start + timedelta(hours=1)).astimezone(utc),
+        ))
+
+    assert benchmark(book_conflicting_slot) is None
+
+
+@pytest.mark.benchmark(group="cryptographer")
+def bench_encrypt_platform_user_id(benchmark):
+    benchmark(encrypt_platform_user_id, 123456789)
+
+
+@pytest.mark.benchmark(group="cryptographer")
+def bench_decrypt_platform_user_id(benchmark):
+    encrypted = encrypt_platform_user_id(123456789)
+
+    assert benchmark(decrypt_platform_user_id, encrypted) == 123456789
+
+
+def _busy_intervals(start_date: date) -> list[tuple[datetime, datetime]]:
+    moscow = timezone("Europe/Moscow")
+    busy_intervals = []
+
+    for offset in range(31):
+        day_start = moscow.localize(datetime.combine(start_date + timedelta(days=offset), datetime.min.time()))
+        busy_intervals += [
+            (day_start.replace(hour=hour), day_start.replace(hour=hour) + timedelta(hours=1))
+            for hour in (10, 13, 16)
+        ]
+
+    return busy_intervals
+
+
+@pytest.fixture
+def free_slot_matrix() -> FreeSlotMatrix:
+    start_date = date.today() + timedelta(days=1)
+    return FreeSlotMatrix.build(AvailabilityDaysConfig(), start_date, _busy_intervals(start_date))
+
+
+@pytest.mark.benchmark(group="availability")
+def bench_build_free_slot_matrix(benchmark):
+    config = AvailabilityDaysConfig()
+    start_date = date.today() + timedelta(days=1)
+    busy_intervals = _busy_intervals(start_date)
+
+    benchmark(FreeSlotMatrix.build, config, start_date, busy_intervals)
+
+
+@pytest.mark.benchmark(group="keyboards")
+def bench_generate_calendar_keyboard(benchmark, free_slot_matrix):
+    start_date = free_slot_matrix.start_date
+    benchmark(MenuBuilder.generate_calendar_keyboard, start_date.year, start_date.month, free_slot_matrix)
+
+
+@pytest.mark.benchmark(group="keyboards")
+def bench_generate_hours_keyboard(benchmark, free_slot_matrix):
+    benchmark(MenuBuilder.generate_hours_keyboard, free_slot_matrix, free_slot_matrix.start_date)
+
+
+@pytest.mark.benchmark(group="availability")
+def bench_is_date_blocked(benchmark):
+    config = AvailabilityDaysConfig()
+    dates = [date.today() + timedelta(days=offset) for offset in range(31)]
+
+    def check_window():
+        for target_date in dates:
+            config.is_date_blocked(target_date)
+
+    benchmark(check_window)
+
+
+@pytest.mark.benchmark(group="session")
+def bench_session_payload_round_trip(benchmark):
+    payload = {"selected_date": "2025-03-14", "selected_hours": [10, 11, 15], "note": "Занятие по Python"}
+
+    assert benchmark(lambda: decode_state_payload(encode_state_payload(payload))) == payload
+
+
+@pytest.mark.benchmark(group="users")
+def bench_row_to_user_dto(benchmark):
+    row = (42, "Иван", "Иванов", "Python", None, 1500, 0, None)
+
+    assert benchmark(row_to_user_dto, row, 123456789).hour_rate == 1500
+
+
+@pytest.fixture(scope="module")
+def year_of_bookings() -> tuple:
+    """Год записей: 20 занятий в день со случайным часом начала, ставкой и языком."""
+    generator = np.random.default_rng(42)
+    count = 365 * 20
+    days = np.datetime64("2025-01-01") + generator.integers(0, 365, count).astype("timedelta64[D]")
+    starts = days.astype("datetime64[s]") + generator.integers(9, 21, count).astype("timedelta64[h]")
+    durations = generator.choice([1.0, 1.5, 2.0], count)
+    rates = generator.choice([1000.0, 1500.0, 2000.0], count)
+    language_codes = generator.integers(0, 4, count)
+
+    return starts, durations, rates, language_codes, ["English", "Deutsch", "Python", "—"]
+
+
+@pytest.mark.benchmark(group="analytics")
+def bench_aggregate_period(benchmark, year_of_bookings):
+    assert benchmark(aggregate_period, *year_of_bookings).lessons == 365 * 20
+
+
+@pytest.mark.benchmark(group="analytics")
+def bench_capacity_hours_month(benchmark):
+    benchmark(capacity_hours, [AvailabilityDaysConfig()], date(2025, 1, 1), date(2025, 2, 1))
@@ -0,0 +1,88 @@
+import asyncio
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from pytz import timezone
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+MOSCOW_TIMEZONE = timezone("Europe/Moscow")
+
+ICAL_TEMPLATE = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Apple Inc.//iCloud 2.0//EN
+CALSCALE:GREGORIAN
+BEGIN:VTIMEZONE
+TZID:Europe/Moscow
+BEGIN:STANDARD
+DTSTART:20110327T020000
+TZOFFSETFROM:+0300
+TZOFFSETTO:+0300
+TZNAME:MSK
+END:STANDARD
+END:VTIMEZONE
+BEGIN:VEVENT
+UID:{uid}
+DTSTAMP:20250101T090000Z
+CREATED:20250101T090000Z
+LAST-MODIFIED:20250101T090000Z
+SEQUENCE:0
+DTSTART;TZID=Europe/Moscow:{start:%Y%m%dT%H%M%S}
+DTEND;TZID=Europe/Moscow:{end:%Y%m%dT%H%M%S}
+SUMMARY:{summary}
+TRANSP:OPAQUE
+X-APPLE-TRAVEL-ADVISORY-BEHAVIOR:AUTOMATIC
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def make_ical_event(start: datetime, end: datetime, summary: str, uid: str) -> str:
+    """
+    Событие в том виде, в котором его отдаёт iCloud: VTIMEZONE и локальное время с TZID.
+    """
+    return ICAL_TEMPLATE.format(start=start, end=end, summary=summary, uid=uid)
+
+
+@pytest.fixture(scope="session")
+def busy_day() -> date:
+    return date(2025, 3, 14)
+
+
+@pytest.fixture(scope="session")
+def caldav_server(busy_day):
+    """
+    Локальный CalDAV без задержки, заполненный занятиями на ``busy_day``.
+    """
+    from loadtest.fake_caldav import FakeCalDavServer
+
+    server = FakeCalDavServer(latency=0)
+    server.install()
+
+    from bots.config.consts import STUDENT_WORK_CALENDAR
+
+    calendar = server.get_calendar(STUDENT_WORK_CALENDAR.get_name())
+
+    for hour in range(10, 18):
+        start = MOSCOW_TIMEZONE.localize(datetime.combine(busy_day, datetime.min.time()).replace(hour=hour))
+        calendar.add_event(make_ical_event(start, start + timedelta(hours=1), "Иван Иванов 1500 (Python)", f"uid-{hour}"))
+
+    return server
+
+
+@pytest.fixture(scope="session")
+def caldav_service(caldav_server):
+    from bots.services.cal_dav_service import CalDavService
+
+    return CalDavService("https://caldav.local/", "user", "password")
+
+
+@pytest.fixture
+def event_loop_runner():
+    loop = asyncio.new_event_loop()
+
+    yield loop.run_until_complete
+
+    loop.close()
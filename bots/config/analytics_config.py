@@ -0,0 +1,4 @@
+import os
+
+# Сколько кэшируются агрегаты текущего и будущих месяцев; завершённые месяцы кэшируются бессрочно.
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
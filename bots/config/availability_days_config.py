@@ -15,14 +15,49 @@ class Weekday(Enum):
     SUNDAY = 7
 
 
+class TimeOfDay(Enum):
+    """
+    Enum для фильтрации слотов по времени суток (местное время).
+    """
+    ANY = 0
+    MORNING = 1
+    AFTERNOON = 2
+    EVENING = 3
+
+    @property
+    def hours(self) -> range:
+        return {
+            TimeOfDay.ANY: range(0, 24),
+            TimeOfDay.MORNING: range(0, 12),
+            TimeOfDay.AFTERNOON: range(12, 15),
+            TimeOfDay.EVENING: range(15, 24),
+        }[self]
+
+    @property
+    def mask(self) -> int:
+        return ((1 << self.hours.stop) - 1) ^ ((1 << self.hours.start) - 1)
+
+
 class AvailabilityDaysConfig:
     """
     Класс для управления доступностью дней для бронирования.
     """
 
+    DEFAULT_START_HOUR = 10
+    DEFAULT_END_HOUR = 18
+
     def __init__(self):
         self.blocked_weekdays = {Weekday.SUNDAY}
         self.blocked_dates = set()
+        self.working_hours = {
+            weekday: (self.DEFAULT_START_HOUR, self.DEFAULT_END_HOUR) for weekday in Weekday
+        }
+        self.breaks = {weekday: set() for weekday in Weekday}
+        self.horizon_days = 30
+        self.next_slots_count = 8
+        # Варианты длины еженедельной серии, предлагаемые после бронирования занятия.
+        self.weekly_series_weeks = (4, 8, 12)
+        self.timezone = "Europe/Moscow"
 
     def is_date_blocked(self, target_date: date) -> bool:
         """
@@ -59,3 +94,75 @@ class AvailabilityDaysConfig:
         :param weekdays: Множество дней недели (Weekday Enum).
         """
         self.blocked_weekdays = weekdays
+
+    def set_working_hours(self, weekday: Weekday, start_hour: int, end_hour: int):
+        """
+        Задаёт рабочие часы для дня недели (по местному времени).
+
+        :param weekday: День недели.
+        :param start_hour: Час начала первого занятия.
+        :param end_hour: Час окончания последнего занятия (не включительно).
+        """
+        if not 0 <= start_hour <= end_hour <= 24:
+            raise ValueError(f"Некорректные рабочие часы: {start_hour}-{end_hour}")
+
+        self.working_hours[weekday] = (start_hour, end_hour)
+
+    def set_breaks(self, weekday: Weekday, hours: set[int]):
+        """
+        Задаёт часы перерывов для дня недели: в эти часы занятия не бронируются.
+
+        :param weekday: День недели.
+        :param hours: Множество часов начала перерывов.
+        """
+        self.breaks[weekday] = set(hours)
+
+    def get_working_mask(self, target_date: date) -> int:
+        """
+        Возвращает битовую маску рабочих часов даты: бит N установлен, если час N доступен для занятий.
+
+        :param target_date: Дата.
+        :return: Маска часов (0, если дата заблокирована).
+        """
+        if self.is_date_blocked(target_date):
+            return 0
+
+        weekday = Weekday(target_date.weekday() + 1)
+        start_hour, end_hour = self.working_hours[weekday]
+        mask = ((1 << end_hour) - 1) ^ ((1 << start_hour) - 1)
+
+        for hour in self.breaks[weekday]:
+            mask &= ~(1 << hour)
+
+        return mask
+
+    @classmethod
+    def from_settings(cls, settings: dict | None) -> "AvailabilityDaysConfig":
+        """
+        Создаёт конфигурацию преподавателя: значения по умолчанию с переопределениями из teachers.availability.
+
+        Пример: ``{"timezone": "Europe/Moscow", "working_hours": {"1": [9, 15]}, "breaks": {"1": [12]},
+        "blocked_weekdays": [6, 7], "horizon_days": 14}``; дни недели — номера Weekday.
+
+        :param settings: Переопределения или None.
+        :raises ValueError: Некорректные часы или день недели.
+        """
+        config = cls()
+        settings = settings or {}
+
+        if "timezone" in settings:
+            config.timezone = settings["timezone"]
+
+        if "horizon_days" in settings:
+            config.horizon_days = int(settings["horizon_days"])
+
+        if "blocked_weekdays" in settings:
+            config.set_blocked_weekdays({Weekday(int(weekday)) for weekday in settings["blocked_weekdays"]})
+
+        for weekday, (start_hour, end_hour) in settings.get("working_hours", {}).items():
+            config.set_working_hours(Weekday(int(weekday)), int(start_hour), int(end_hour))
+
+        for weekday, hours in settings.get("breaks", {}).items():
+            config.set_breaks(Weekday(int(weekday)), {int(hour) for hour in hours})
+
+        return config
@@ -0,0 +1,13 @@
+import os
+
+# Таймаут одного HTTP-запроса к CalDAV.
+CALDAV_TIMEOUT_SECONDS = float(os.getenv("CALDAV_TIMEOUT_SECONDS", "5"))
+# Общий срок на загрузку занятости за окно бронирования (несколько запросов).
+CALDAV_READ_DEADLINE_SECONDS = float(os.getenv("CALDAV_READ_DEADLINE_SECONDS", "8"))
+
+# Автомат размыкается, если в окне из CALDAV_BREAKER_WINDOW последних вызовов
+# (не менее CALDAV_BREAKER_MINIMUM_CALLS) доля ошибок достигла порога.
+CALDAV_BREAKER_FAILURE_RATE = float(os.getenv("CALDAV_BREAKER_FAILURE_RATE", "0.5"))
+CALDAV_BREAKER_MINIMUM_CALLS = int(os.getenv("CALDAV_BREAKER_MINIMUM_CALLS", "4"))
+CALDAV_BREAKER_WINDOW = int(os.getenv("CALDAV_BREAKER_WINDOW", "20"))
+CALDAV_BREAKER_OPEN_SECONDS = float(os.getenv("CALDAV_BREAKER_OPEN_SECONDS", "30"))
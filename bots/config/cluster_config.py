@@ -0,0 +1,19 @@
+import os
+
+# Количество процессов-воркеров. 1 — один процесс с long polling,
+# больше 1 — супервизор с webhook-фронтендом и шардированием апдейтов по пользователю.
+WORKERS = int(os.getenv("BOT_WORKERS", "1"))
+
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+
+WORKER_QUEUE_SIZE = int(os.getenv("WORKER_QUEUE_SIZE", "1000"))
+WORKER_RESTART_DELAY = float(os.getenv("WORKER_RESTART_DELAY", "5"))
+
+# Хранилище общего состояния: "memory" — локальная замена для одного процесса,
+# "database" — FSM и инвалидация кэшей через БД, общие для всех воркеров (по умолчанию при BOT_WORKERS > 1).
+STATE_BACKEND = os.getenv("STATE_BACKEND", "database" if WORKERS > 1 else "memory")
+INVALIDATION_POLL_INTERVAL = float(os.getenv("INVALIDATION_POLL_INTERVAL", "1.0"))
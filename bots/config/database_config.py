@@ -0,0 +1,24 @@
+import os
+
+# Общий срок на запрос к БД вместе с повторами и ожиданием переподключения.
+DB_REQUEST_DEADLINE_SECONDS = float(os.getenv("DB_REQUEST_DEADLINE_SECONDS", "3"))
+DB_MAX_ATTEMPTS = int(os.getenv("DB_MAX_ATTEMPTS", "3"))
+
+# Экспоненциальная задержка с джиттером: random(0, min(cap, base * 2 ** attempt)).
+DB_RETRY_BASE_DELAY_SECONDS = float(os.getenv("DB_RETRY_BASE_DELAY_SECONDS", "0.05"))
+DB_RETRY_MAX_DELAY_SECONDS = float(os.getenv("DB_RETRY_MAX_DELAY_SECONDS", "1"))
+DB_RECONNECT_BASE_DELAY_SECONDS = float(os.getenv("DB_RECONNECT_BASE_DELAY_SECONDS", "0.5"))
+DB_RECONNECT_MAX_DELAY_SECONDS = float(os.getenv("DB_RECONNECT_MAX_DELAY_SECONDS", "30"))
+
+# Таймауты драйвера, ограничивающие один запрос.
+DB_CONNECT_TIMEOUT_SECONDS = int(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "5"))
+DB_READ_TIMEOUT_SECONDS = int(os.getenv("DB_READ_TIMEOUT_SECONDS", "10"))
+DB_WRITE_TIMEOUT_SECONDS = int(os.getenv("DB_WRITE_TIMEOUT_SECONDS", "10"))
+
+# Реплики для чтения: используются, только пока отставание по свежему замеру не превышает порог.
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "2"))
+DB_REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("DB_REPLICA_CHECK_INTERVAL_SECONDS", "5"))
+# Сколько реплика не используется после ошибки запроса к ней.
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+# После своей записи пользователь читает с основной БД; окно должно перекрывать допустимое отставание.
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
@@ -0,0 +1,8 @@
+import os
+
+# Ленивый перенос: при промахе по user_identities искать пользователя по users.telegram_id.
+# Отключается (LEGACY_IDENTITY_FALLBACK=0) после полного прогона python -m bots.models.identity_backfill.
+LEGACY_IDENTITY_FALLBACK_ENABLED = os.getenv("LEGACY_IDENTITY_FALLBACK", "1") == "1"
+
+IDENTITY_BACKFILL_BATCH_SIZE = int(os.getenv("IDENTITY_BACKFILL_BATCH_SIZE", "1000"))
+IDENTITY_BACKFILL_CHECKPOINT_PATH = os.getenv("IDENTITY_BACKFILL_CHECKPOINT_PATH", "logs/identity_backfill.json")
@@ -1,6 +1,10 @@
+import atexit
+import itertools
 import logging
+import os
+import queue
 
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 LOG_DIRECTORY = Path(__file__).resolve().parents[2] / "logs"
@@ -13,14 +17,71 @@ BACKUP_COUNT = 10
 FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
 DATEFMT = "%Y-%m-%d %H:%M:%S"
 
+ROOT_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Уровни логирования по модулям. Переопределяются переменной окружения
+# LOG_LEVELS в формате "sqlalchemy.engine=INFO,bots.services.cal_dav_service=DEBUG".
+LOGGER_LEVELS = {
+    "sqlalchemy.engine": "WARNING",
+    "sqlalchemy.pool": "WARNING",
+    "aiogram.event": "WARNING",
+    "caldav": "WARNING",
+}
+
+# Частые однотипные сообщения на каждый запрос пишутся в дочерний логгер "<модуль>.sampled"
+# (см. get_sampled_logger), и в лог попадает каждое N-е из них. Аудит бронирований и отмен
+# пишется в логгер модуля и не семплируется.
+SAMPLED_LOGGER_SUFFIX = "sampled"
+LOGGER_SAMPLE_EVERY = {
+    "bots.models.database.sampled": 100,
+    "bots.services.cal_dav_service.sampled": 10,
+    "bots.services.availability_service.sampled": 10,
+    "bots.middlewares.throttling_middleware.sampled": 20,
+}
+
+__listener: QueueListener | None = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает каждое N-е сообщение ниже WARNING. Предупреждения и ошибки пропускаются всегда.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.__every = max(1, every)
+        self.__counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        return next(self.__counter) % self.__every == 0
+
+
+def __parse_levels(raw_levels: str) -> dict[str, str]:
+    levels = {}
+
+    for item in raw_levels.split(","):
+        name, separator, level = item.partition("=")
+
+        if separator and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+
+    return levels
+
 
 def __configure_root_logger() -> None:
-    root = logging.getLogger()
-    root.setLevel(logging.INFO)
+    """
+    Все записи из event loop попадают в очередь через QueueHandler,
+    а форматирование и запись в консоль и файл выполняет поток QueueListener.
+    """
+    global __listener
+
+    formatter = logging.Formatter(FORMAT, DATEFMT)
 
     console = logging.StreamHandler()
-    console.setFormatter(logging.Formatter(FORMAT, DATEFMT))
-    root.addHandler(console)
+    console.setFormatter(formatter)
 
     rotating = RotatingFileHandler(
         LOG_FILE,
@@ -28,8 +89,23 @@ def __configure_root_logger() -> None:
         backupCount=BACKUP_COUNT,
         encoding="utf-8",
     )
-    rotating.setFormatter(logging.Formatter(FORMAT, DATEFMT))
-    root.addHandler(rotating)
+    rotating.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    root.setLevel(ROOT_LEVEL)
+    root.addHandler(QueueHandler(log_queue))
+
+    __listener = QueueListener(log_queue, console, rotating, respect_handler_level=True)
+    __listener.start()
+    atexit.register(__listener.stop)
+
+    for name, level in {**LOGGER_LEVELS, **__parse_levels(os.getenv("LOG_LEVELS", ""))}.items():
+        logging.getLogger(name).setLevel(level)
+
+    for name, every in LOGGER_SAMPLE_EVERY.items():
+        logging.getLogger(name).addFilter(SamplingFilter(every))
 
 
 __configure_root_logger()
@@ -37,3 +113,10 @@ __configure_root_logger()
 
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
+
+
+def get_sampled_logger(name: str) -> logging.Logger:
+    """
+    Логгер для частых сообщений модуля; семплируется согласно LOGGER_SAMPLE_EVERY.
+    """
+    return logging.getLogger(f"{name}.{SAMPLED_LOGGER_SUFFIX}")
@@ -0,0 +1,10 @@
+import os
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0.1"))
+TRACING_JSONL_PATH = os.getenv("TRACING_JSONL_PATH", "")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "booking-bot")
@@ -0,0 +1,15 @@
+import os
+
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "1") == "1"
+# За сколько минут до занятия отправлять напоминания (по умолчанию за сутки и за час).
+REMINDER_OFFSETS_MINUTES = tuple(sorted(
+    {int(value) for value in os.getenv("REMINDER_OFFSETS_MINUTES", "1440,60").split(",") if value.strip()},
+    reverse=True,
+))
+# Догрузка новых записей перечитывает и это окно до прошлой загрузки: запись, вставленная до чтения,
+# но зафиксированная после него, не теряется (дубликаты отсеиваются).
+REMINDER_RELOAD_OVERLAP_SECONDS = float(os.getenv("REMINDER_RELOAD_OVERLAP_SECONDS", "60"))
+# Максимальный сон планировщика: защита от переводов системных часов.
+REMINDER_MAX_SLEEP_SECONDS = float(os.getenv("REMINDER_MAX_SLEEP_SECONDS", "600"))
+# Повтор, если отметку об отправке не удалось записать из-за недоступности БД.
+REMINDER_RETRY_SECONDS = float(os.getenv("REMINDER_RETRY_SECONDS", "30"))
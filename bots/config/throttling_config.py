@@ -0,0 +1,43 @@
+from bots.utils.callback_data import CallbackData
+
+
+class ThrottlingConfig:
+    """
+    Настройки ограничения частоты запросов пользователя.
+
+    Для каждого типа события задаётся ведро токенов: ёмкость (допустимый всплеск)
+    и скорость пополнения (токенов в секунду).
+    """
+    MESSAGE = "message"
+    CALENDAR = "calendar"
+    HOURS = "hours"
+    DEFAULT = "default"
+
+    def __init__(self):
+        self.buckets: dict[str, tuple[float, float]] = {
+            self.MESSAGE: (5, 1.0),
+            self.CALENDAR: (6, 2.0),
+            self.HOURS: (3, 0.5),
+            self.DEFAULT: (8, 2.0),
+        }
+        self.callback_prefixes: dict[str, str] = {
+            CallbackData.DATE_PREFIX.value: self.CALENDAR,
+            CallbackData.MONTH_PREFIX.value: self.CALENDAR,
+            CallbackData.TIME_PREFIX.value: self.HOURS,
+            CallbackData.NEXT_SLOTS_PREFIX.value: self.CALENDAR,
+            CallbackData.SLOT_PREFIX.value: self.HOURS,
+            CallbackData.BOOKINGS_PREFIX.value: self.CALENDAR,
+            CallbackData.CANCEL_BOOKING_PREFIX.value: self.HOURS,
+            CallbackData.WEEKLY_PREFIX.value: self.HOURS,
+            CallbackData.TEACHER_PREFIX.value: self.CALENDAR,
+        }
+        self.max_tracked_buckets = 50_000
+        self.throttled_text = "⏳ Слишком много запросов. Пожалуйста, подождите пару секунд."
+
+    def get_bucket(self, event_type: str) -> tuple[float, float]:
+        """
+        Возвращает (ёмкость, скорость пополнения) для типа события.
+
+        :param event_type: Тип события.
+        """
+        return self.buckets.get(event_type, self.buckets[self.DEFAULT])
@@ -0,0 +1,138 @@
+import asyncio
+import multiprocessing
+import queue
+import secrets
+
+from aiogram import Bot
+from aiohttp import web
+
+from bots.config.cluster_config import (STATE_BACKEND, WEBHOOK_BASE_URL,
+                                        WEBHOOK_HOST, WEBHOOK_PATH,
+                                        WEBHOOK_PORT, WEBHOOK_SECRET,
+                                        WORKER_QUEUE_SIZE,
+                                        WORKER_RESTART_DELAY)
+from bots.config.consts import API_TOKEN
+from bots.config.logging_config import get_logger
+from bots.config.monitoring_config import (METRICS_ENABLED, METRICS_HOST,
+                                           METRICS_PORT)
+from bots.utils.metrics import (REGISTRY, SUPERVISOR_REJECTED_UPDATES,
+                                SUPERVISOR_UPDATES, MetricsServer)
+from bots.utils.sharding import get_update_shard
+
+logger = get_logger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def _run_worker_process(worker_index: int, update_queue: multiprocessing.Queue) -> None:
+    """
+    Точка входа процесса-воркера. Модуль бота импортируется только здесь,
+    чтобы супервизор не поднимал собственные подключения к БД и CalDAV.
+    """
+    from bots.handlers.telegram_bot import run_worker
+
+    asyncio.run(run_worker(update_queue, worker_index))
+
+
+class Supervisor:
+    """
+    Запускает N процессов-воркеров за webhook-фронтендом.
+
+    Фронтенд принимает апдейты Telegram и раскладывает их по очередям воркеров по хэшу
+    ``from_user.id``: все апдейты пользователя обрабатывает один процесс, поэтому FSM
+    в памяти, блокировки пользователя, дедупликация и троттлинг остаются локальными.
+    Упавший воркер перезапускается с той же очередью.
+    """
+
+    def __init__(self, workers: int):
+        self.__context = multiprocessing.get_context("spawn")
+        self.__queues = [self.__context.Queue(WORKER_QUEUE_SIZE) for _ in range(workers)]
+        self.__processes: list[multiprocessing.Process | None] = [None] * workers
+        self.__secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+
+    async def run(self) -> None:
+        if not WEBHOOK_BASE_URL:
+            raise RuntimeError("Для запуска нескольких воркеров требуется WEBHOOK_BASE_URL")
+
+        if STATE_BACKEND != "database":
+            # С локальным состоянием FSM, баны и инвалидация кэшей не видны другим воркерам.
+            raise RuntimeError("Для запуска нескольких воркеров требуется STATE_BACKEND=database")
+
+        for worker_index in range(len(self.__processes)):
+            self.__start_worker(worker_index)
+
+        application = web.Application()
+        application.router.add_post(WEBHOOK_PATH, self.__handle_update)
+
+        runner = web.AppRunner(application)
+        await runner.setup()
+        await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+
+        if METRICS_ENABLED:
+            await MetricsServer(REGISTRY, METRICS_HOST, METRICS_PORT).start()
+
+        bot = Bot(token=API_TOKEN)
+
+        try:
+            await bot.set_webhook(WEBHOOK_BASE_URL.rstrip("/") + WEBHOOK_PATH, secret_token=self.__secret)
+            logger.info("Супервизор запущен: %s воркеров, webhook на %s:%s%s",
+                        len(self.__processes), WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH)
+
+            await self.__watch_workers()
+        finally:
+            await bot.session.close()
+            await runner.cleanup()
+            self.__stop_workers()
+
+    async def __handle_update(self, request: web.Request) -> web.Response:
+        if not secrets.compare_digest(request.headers.get(SECRET_HEADER, ""), self.__secret):
+            return web.Response(status=401)
+
+        raw_update = await request.json()
+        shard = get_update_shard(raw_update, len(self.__queues))
+
+        try:
+            self.__queues[shard].put_nowait(raw_update)
+        except queue.Full:
+            # Telegram повторит доставку апдейта, получив код ошибки.
+            SUPERVISOR_REJECTED_UPDATES.inc(shard=shard)
+            logger.warning("Очередь воркера %s переполнена, апдейт отклонён", shard)
+            return web.Response(status=503)
+
+        SUPERVISOR_UPDATES.inc(shard=shard)
+        return web.Response()
+
+    async def __watch_workers(self) -> None:
+        while True:
+            await asyncio.sleep(WORKER_RESTART_DELAY)
+
+            for worker_index, process in enumerate(self.__processes):
+                if process is not None and not process.is_alive():
+                    logger.error("Воркер %s завершился с кодом %s, перезапускаем",
+                                 worker_index, process.exitcode)
+                    self.__start_worker(worker_index)
+
+    def __start_worker(self, worker_index: int) -> None:
+        process = self.__context.Process(
+            target=_run_worker_process,
+            args=(worker_index, self.__queues[worker_index]),
+            name=f"bot-worker-{worker_index}",
+        )
+        process.start()
+        self.__processes[worker_index] = process
+
+    def __stop_workers(self) -> None:
+        for update_queue in self.__queues:
+            try:
+                update_queue.put(None, timeout=WORKER_RESTART_DELAY)
+            except queue.Full:
+                pass
+
+        for process in self.__processes:
+            if process is None:
+                continue
+
+            process.join(timeout=WORKER_RESTART_DELAY * 2)
+
+            if process.is_alive():
+                process.terminate()
@@ -1,58 +1,120 @@
 import asyncio
-from asyncio import Lock
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from functools import wraps
 
+import numpy as np
 from aiogram import Bot, Dispatcher, Router, types
-from aiogram.filters import Command
+from aiogram.dispatcher.event.bases import SkipHandler
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.filters import Command, ExceptionTypeFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.fsm.storage.memory import MemoryStorage
 from pytz import timezone
 
-from bots.config.availability_days_config import AvailabilityDaysConfig
-from bots.config.consts import (ADMIN_TELEGRAM_ID, API_TOKEN,
-                                APPLE_APP_PASSWORD, URL, USERNAME)
+from bots.config.availability_days_config import TimeOfDay, Weekday
+from bots.config.consts import ADMIN_TELEGRAM_ID, API_TOKEN
 from bots.config.logging_config import get_logger
+from bots.config.monitoring_config import (METRICS_ENABLED, METRICS_HOST,
+                                           METRICS_PORT, TRACING_JSONL_PATH,
+                                           TRACING_OTLP_ENDPOINT,
+                                           TRACING_SERVICE_NAME)
 from bots.config.platforms import Platforms
+from bots.config.reminder_config import REMINDERS_ENABLED
 from bots.middlewares.ban_middleware import BanMiddleware
+from bots.middlewares.consistency_middleware import ReadConsistencyMiddleware
+from bots.middlewares.metrics_middleware import (MetricsMiddleware,
+                                                 MetricsRequestMiddleware)
+from bots.middlewares.throttling_middleware import ThrottlingMiddleware
+from bots.middlewares.tracing_middleware import (TracingMiddleware,
+                                                 TracingRequestMiddleware)
 from bots.handlers.user_data_handler import UserDataHandler, UserDataStates
-from bots.models.database import Database
-from bots.models.models import User
-from bots.services.cal_dav_service import CalDavService
+from bots.models.database import Database, DatabaseUnavailableError
+from bots.models.models import BookingDTO, User
+from bots.services.analytics_service import AnalyticsReport, AnalyticsService
+from bots.services.availability_service import FreeSlotMatrix
+from bots.services.ban_registry import BanRegistry
+from bots.services.booking_service import BookingService
+from bots.services.cal_dav_service import CalDavUnavailableError, CancelResult
 from bots.services.user_service import UserService
 from bots.services.identity_service import IdentityService
+from bots.services.reminder_scheduler import Reminder, ReminderScheduler
 from bots.services.session_service import SessionService
-from bots.utils.callback_data import CallbackData
+from bots.services.shared_state import (create_fsm_storage,
+                                        create_invalidation_bus)
+from bots.services.teacher_registry import TeacherContext, TeacherRegistry
+from bots.utils.callback_data import (BookingsPagePayload, CallbackData,
+                                      CancelBookingPayload, DatePayload,
+                                      LanguagePayload, MonthPayload,
+                                      NextSlotsPayload, TeacherPayload,
+                                      TimePayload, WeeklyPayload)
 from bots.utils.cryptographer import decrypt_telegram_id
-from bots.utils.main import is_date_available
+from bots.utils.metrics import REGISTRY, MetricsServer
+from bots.utils.tracing import JsonLinesExporter, OtlpHttpExporter, tracer
+from bots.utils.update_deduplicator import UpdateDeduplicator
 
+from bots.platforms.telegram.callback_dispatcher import CallbackDispatcher
 from bots.platforms.telegram.menu_builder import MenuBuilder
 
 logger = get_logger(__name__)
 
+database = Database()
+
 bot = Bot(token=API_TOKEN)
-storage = MemoryStorage()
+bot.session.middleware(MetricsRequestMiddleware())
+bot.session.middleware(TracingRequestMiddleware())
+storage = create_fsm_storage(database)
 dispatcher = Dispatcher(storage=storage)
 
-dispatcher.message.middleware(BanMiddleware())
-dispatcher.callback_query.middleware(BanMiddleware())
+dispatcher.update.outer_middleware(TracingMiddleware())
+dispatcher.update.outer_middleware(ReadConsistencyMiddleware())
+
+throttling_middleware = ThrottlingMiddleware()
+dispatcher.message.outer_middleware(throttling_middleware)
+dispatcher.callback_query.outer_middleware(throttling_middleware)
+
+dispatcher.message.middleware(MetricsMiddleware())
+ban_registry = BanRegistry(database)
+dispatcher.message.middleware(BanMiddleware(ban_registry))
+dispatcher.callback_query.middleware(BanMiddleware(ban_registry))
 
 router = Router()
+callback_dispatcher = CallbackDispatcher()
 
-user_task_locks = defaultdict(Lock)
-user_tasks = defaultdict(set)
+update_deduplicator = UpdateDeduplicator()
 
-calDavService = CalDavService(URL, USERNAME, APPLE_APP_PASSWORD)
-availability_days_config = AvailabilityDaysConfig()
+invalidation_bus = create_invalidation_bus(database)
+invalidation_bus.subscribe(BanRegistry.INVALIDATION_TOPIC, ban_registry.request_refresh)
 
-database = Database()
-asyncio.run(database.connect())
+teacher_registry = TeacherRegistry(database, invalidation_bus)
 
 user_service = UserService(database)
 identity_service = IdentityService(database, user_service)
 session_service = SessionService(database)
+booking_service = BookingService(database)
+# Зависит от состава преподавателей и создаётся в connect_services после загрузки реестра.
+analytics_service: AnalyticsService | None = None
+
+
+async def _send_reminder(reminder: Reminder) -> None:
+    teacher = teacher_registry.get(reminder.teacher_id)
+    start = reminder.start_at.astimezone(teacher.availability.local_tz)
+    minutes_left = max(1, round((reminder.start_at - datetime.now(timezone("UTC"))).total_seconds() / 60))
+    left = f"{round(minutes_left / 60)} ч." if minutes_left >= 60 else f"{minutes_left} мин."
+    text = f"⏰ Напоминание: занятие {start:%d.%m.%Y} в {start:%H:%M} (через {left})"
+
+    if teacher_registry.has_choice:
+        text += f"\nПреподаватель: {teacher.name}"
+
+    try:
+        await bot.send_message(reminder.telegram_id, text)
+    except (TelegramForbiddenError, TelegramBadRequest) as exception:
+        # Бот заблокирован или чат недоступен: повтор не поможет, остальные ошибки повторяет планировщик.
+        logger.warning("Напоминание о записи %s не доставлено: %s", reminder.booking_id, exception)
+
+
+reminder_scheduler = ReminderScheduler(database, _send_reminder)
+invalidation_bus.subscribe(ReminderScheduler.INVALIDATION_TOPIC, reminder_scheduler.request_reload)
 
 
 class UserStates(StatesGroup):
@@ -61,10 +123,30 @@ class UserStates(StatesGroup):
     selecting_time = State()
 
 
+def _get_update_key(event) -> str | None:
+    if isinstance(event, types.CallbackQuery):
+        return f"callback_{event.id}"
+
+    if isinstance(event, types.Message):
+        return f"message_{event.chat.id}_{event.message_id}"
+
+    return None
+
+
+def _with_stale_note(text: str, matrix: FreeSlotMatrix) -> str:
+    if matrix.is_stale:
+        return f"⚠️ Календарь сейчас недоступен, показана последняя известная занятость.\n\n{text}"
+
+    return text
+
+
 def task_handler(task_key_func=None):
     """
     Декоратор для управления задачами пользователя.
     task_key_func: Функция, которая возвращает уникальный ключ задачи (по умолчанию ID пользователя и имя функции).
+
+    Повторная доставка того же апдейта, повтор задачи во время её выполнения и двойное нажатие
+    сразу после завершения подавляются через update_deduplicator.
     """
 
     def decorator(handler):
@@ -79,17 +161,15 @@ def task_handler(task_key_func=None):
 
             task_key = task_key_func(event, *args, **kwargs) if task_key_func else f"{user_id}_{handler.__name__}"
 
-            if task_key in user_tasks[user_id]:
-                logger.warning(f"Пользователь {user_id} уже выполняет задачу {task_key}. Игнорируем повторный запрос.")
+            if not update_deduplicator.try_begin(_get_update_key(event), task_key):
+                logger.warning("Пользователь %s уже выполняет задачу %s. Игнорируем повторный запрос.", user_id, task_key)
                 return
 
-            user_tasks[user_id].add(task_key)
-
-            async with user_task_locks[user_id]:
-                try:
+            try:
+                async with update_deduplicator.user_lock(user_id):
                     return await handler(*args, **kwargs)
-                finally:
-                    user_tasks[user_id].remove(task_key)
+            finally:
+                update_deduplicator.finish(task_key)
 
         return wrapper
 
@@ -139,7 +219,7 @@ async def start_command(message: types.Message, state: FSMContext):
         await session_service.clear_state(user.id, Platforms.TELEGRAM)
         await message.answer(
             "Все данные заполнены. Добро пожаловать в главное меню!",
-            reply_markup=MenuBuilder.generate_main_menu(),
+            reply_markup=MenuBuilder.generate_main_menu(teacher_registry.has_choice),
         )
 
 
@@ -178,8 +258,8 @@ async def help_command(message: types.Message):
 
 
 @router.message(Command(str(CallbackData.UPDATE_DATA.value)))
-@router.callback_query(lambda c: c.data == "change_data")
-async def change_data_command(event: types.Message | types.CallbackQuery, state: FSMContext):
+@callback_dispatcher.exact(CallbackData.UPDATE_DATA.value)
+async def change_data_command(event: types.Message | types.CallbackQuery, state: FSMContext, payload=None):
     platform_user_id = str(event.from_user.id)
     user = await identity_service.get_or_create_user_by_identity(Platforms.TELEGRAM, platform_user_id)
 
@@ -235,12 +315,16 @@ async def process_surname(message: types.Message, state: FSMContext):
     )
 
 
-@router.callback_query(UserDataStates.WAITING_FOR_LANGUAGE)
-async def process_language(callback_query: types.CallbackQuery, state: FSMContext):
+@callback_dispatcher.prefix(
+    CallbackData.LANGUAGE_PREFIX.value,
+    CallbackData.parse_language,
+    state=UserDataStates.WAITING_FOR_LANGUAGE,
+)
+async def process_language(callback_query: types.CallbackQuery, state: FSMContext, payload: LanguagePayload):
     """
     Обрабатывает выбор языка программирования.
     """
-    language = callback_query.data.split("_")[1]
+    language = payload.language
     await state.update_data(new_language=language)
 
     user_data = await state.get_data()
@@ -259,8 +343,8 @@ async def process_language(callback_query: types.CallbackQuery, state: FSMContex
     )
 
 
-@router.callback_query(lambda c: c.data == "confirm_changes", UserDataStates.CONFIRMING_CHANGES)
-async def confirm_changes(callback_query: types.CallbackQuery, state: FSMContext):
+@callback_dispatcher.exact(CallbackData.CONFIRM_CHANGES.value, state=UserDataStates.CONFIRMING_CHANGES)
+async def confirm_changes(callback_query: types.CallbackQuery, state: FSMContext, payload=None):
     user = await identity_service.get_user_by_identity(
         Platforms.TELEGRAM,
         str(callback_query.from_user.id),
@@ -287,12 +371,12 @@ async def confirm_changes(callback_query: types.CallbackQuery, state: FSMContext
 
     await callback_query.message.edit_text(
         "✅ Данные успешно обновлены! Выберите действие:",
-        reply_markup=MenuBuilder.generate_main_menu(),
+        reply_markup=MenuBuilder.generate_main_menu(teacher_registry.has_choice),
     )
 
 
-@router.callback_query(lambda c: c.data == "reject_changes", UserDataStates.CONFIRMING_CHANGES)
-async def reject_changes(callback_query: types.CallbackQuery, state: FSMContext):
+@callback_dispatcher.exact(CallbackData.REJECT_CHANGES.value, state=UserDataStates.CONFIRMING_CHANGES)
+async def reject_changes(callback_query: types.CallbackQuery, state: FSMContext, payload=None):
     """
     Отклоняет изменения и возвращает пользователя к вводу имени.
     """
@@ -300,8 +384,8 @@ async def reject_changes(callback_query: types.CallbackQuery, state: FSMContext)
     await callback_query.message.edit_text("❌ Изменение данных отменено. Введите ваше новое имя:")
 
 
-@router.callback_query(lambda c: c.data == CallbackData.BOOK_EVENT.value)
-async def book_event(callback_query: types.CallbackQuery, state: FSMContext):
+@callback_dispatcher.exact(CallbackData.BOOK_EVENT.value)
+async def book_event(callback_query: types.CallbackQuery, state: FSMContext, payload=None):
     user = await identity_service.get_or_create_user_by_identity(
         Platforms.TELEGRAM,
         str(callback_query.from_user.id),
@@ -325,24 +409,35 @@ async def book_event(callback_query: types.CallbackQuery, state: FSMContext):
         )
         return
 
-    today = date.today()
-    keyboard = MenuBuilder.generate_calendar_keyboard(today.year, today.month)
+    matrix = await teacher_registry.get(user.teacher_id).availability.get_matrix()
+    keyboard = MenuBuilder.generate_calendar_keyboard(matrix.start_date.year, matrix.start_date.month, matrix)
 
-    await callback_query.message.edit_text("Выберите дату:", reply_markup=keyboard)
+    await callback_query.message.edit_text(_with_stale_note("Выберите дату:", matrix), reply_markup=keyboard)
 
 
-@router.callback_query(lambda c: c.data.startswith(CallbackData.DATE_PREFIX.value))
-async def select_date(callback_query: types.CallbackQuery, state: FSMContext):
+async def _get_teacher(callback_query: types.CallbackQuery) -> tuple[User | None, TeacherContext]:
     """
-    Обрабатывает выбор даты и предлагает выбрать время.
+    Пользователь и выбранный им преподаватель (по умолчанию, если пользователь не найден или не выбирал).
     """
-    _, year, month, day = callback_query.data.split("_")
-    selected_date = date(int(year), int(month), int(day))
+    user = await identity_service.get_user_by_identity(
+        Platforms.TELEGRAM,
+        str(callback_query.from_user.id),
+    )
+
+    return user, teacher_registry.get(user.teacher_id if user else None)
 
-    today = date.today()
 
-    if is_date_available(selected_date, today):
-        keyboard = MenuBuilder.generate_calendar_keyboard(today.year, today.month)
+@callback_dispatcher.prefix(CallbackData.DATE_PREFIX.value, CallbackData.parse_date)
+async def select_date(callback_query: types.CallbackQuery, state: FSMContext, payload: DatePayload):
+    """
+    Обрабатывает выбор даты и предлагает выбрать время.
+    """
+    selected_date = payload.date
+    user, teacher = await _get_teacher(callback_query)
+    matrix = await teacher.availability.get_matrix()
+
+    if not matrix.is_date_available(selected_date):
+        keyboard = MenuBuilder.generate_calendar_keyboard(matrix.start_date.year, matrix.start_date.month, matrix)
 
         await callback_query.message.edit_text(
             f"Выбранная дата ({selected_date}) недоступна. Пожалуйста, выберите актуальную дату:",
@@ -353,11 +448,6 @@ async def select_date(callback_query: types.CallbackQuery, state: FSMContext):
 
     await state.update_data(selected_date=str(selected_date))
 
-    user = await identity_service.get_user_by_identity(
-        Platforms.TELEGRAM,
-        str(callback_query.from_user.id),
-    )
-
     if user:
         await session_service.set_state(
             user.id,
@@ -366,77 +456,113 @@ async def select_date(callback_query: types.CallbackQuery, state: FSMContext):
             {"selected_date": str(selected_date)},
         )
 
-    busy_hours = calDavService.parse_calendar_events(
-        calDavService.get_events_time_by_date(selected_date)
-    )
-    keyboard = MenuBuilder.generate_hours_keyboard(busy_hours)
+    keyboard = MenuBuilder.generate_hours_keyboard(matrix, selected_date)
 
     await callback_query.message.edit_text(f"Вы выбрали дату: {selected_date}. Теперь выберите время:")
-    await bot.send_message(callback_query.from_user.id, "Выберите время:", reply_markup=keyboard)
+    await bot.send_message(callback_query.from_user.id, _with_stale_note("Выберите время:", matrix),
+                           reply_markup=keyboard)
 
 
-@router.callback_query(lambda c: c.data.startswith(CallbackData.MONTH_PREFIX.value))
-async def change_month(callback_query: types.CallbackQuery):
+@callback_dispatcher.prefix(CallbackData.MONTH_PREFIX.value, CallbackData.parse_month)
+async def change_month(callback_query: types.CallbackQuery, state: FSMContext, payload: MonthPayload):
     """
     Обрабатывает навигацию по месяцам в календаре.
     """
-    _, year, month = callback_query.data.split("_")
-    year, month = int(year), int(month)
-
     # Генерация новой клавиатуры для выбранного месяца
-    keyboard = MenuBuilder.generate_calendar_keyboard(year, month)
+    _, teacher = await _get_teacher(callback_query)
+    matrix = await teacher.availability.get_matrix()
+    keyboard = MenuBuilder.generate_calendar_keyboard(payload.year, payload.month, matrix)
 
-    await callback_query.message.edit_text("Выберите дату:", reply_markup=keyboard)
+    await callback_query.message.edit_text(_with_stale_note("Выберите дату:", matrix), reply_markup=keyboard)
 
 
-@router.callback_query(lambda c: c.data.startswith(CallbackData.TIME_PREFIX.value))
-@task_handler(task_key_func=lambda event, *args, **kwargs: f"{event.from_user.id}_{event.data}")
-async def select_time(callback_query: types.CallbackQuery, state: FSMContext):
-    hour = int(callback_query.data.split("_")[1])
+async def _notify_bookings_changed() -> None:
+    """
+    Новые записи попадают в планировщик напоминаний этого и остальных процессов.
+    """
+    reminder_scheduler.request_reload()
+    await invalidation_bus.publish(ReminderScheduler.INVALIDATION_TOPIC)
 
-    user = await identity_service.get_user_by_identity(
-        Platforms.TELEGRAM,
-        str(callback_query.from_user.id),
-    )
 
-    if not user:
-        await callback_query.message.edit_text("❌ Пользователь не найден.")
-        return
+def _hour_rate(user: User, teacher: TeacherContext) -> int:
+    """
+    Ставка преподавателя, если она задана, иначе индивидуальная ставка ученика.
+    """
+    return teacher.hour_rate or user.hour_rate
 
-    local_tz = timezone("Europe/Moscow")
 
-    session_payload = await session_service.get_payload(user.id, Platforms.TELEGRAM)
-    selected_date_raw = session_payload.get("selected_date")
+def _booking_summary(user: User, teacher: TeacherContext) -> str:
+    return f"{user.name} {user.surname} {_hour_rate(user, teacher)} ({user.language})"
 
-    if not selected_date_raw:
-        fallback_state_data = await state.get_data()
-        selected_date_raw = fallback_state_data.get("selected_date")
 
-    if not selected_date_raw:
-        await callback_query.message.edit_text("❌ Не выбрана дата. Начните бронирование заново.")
-        return
+async def _book_hour(user: User, teacher: TeacherContext, selected_date, hour: int) -> bool:
+    """
+    Бронирует час в календаре, если он свободен в матрице доступности,
+    и сразу отражает результат в матрице.
 
-    selected_date = datetime.strptime(selected_date_raw, "%Y-%m-%d").date()
+    :return: True, если слот успешно забронирован.
+    :raises CalDavUnavailableError: Календарь недоступен — бронирование явно отклоняется.
+    """
+    local_tz = teacher.availability.local_tz
 
     start_time_local = local_tz.localize(datetime.combine(selected_date, datetime.min.time().replace(hour=hour)))
     start_time = start_time_local.astimezone(timezone("UTC"))
     end_time = (start_time_local + timedelta(hours=1)).astimezone(timezone("UTC"))
 
-    is_success = await calDavService.book_slot(
-        summary=f"{user.name} {user.surname} {user.hour_rate} ({user.language})",
+    matrix = await teacher.availability.get_matrix()
+
+    if matrix.is_stale:
+        raise CalDavUnavailableError("Бронирование отклонено: данные о занятости устарели")
+
+    if not matrix.is_slot_free(selected_date, hour):
+        return False
+
+    booked_event = await teacher.caldav.book_slot(
+        summary=_booking_summary(user, teacher),
         start=start_time,
         end=end_time,
     )
 
-    busy_hours = calDavService.parse_calendar_events(
-        calDavService.get_events_time_by_date(selected_date)
-    )
-    keyboard = MenuBuilder.generate_hours_keyboard(busy_hours)
+    if not booked_event:
+        teacher.availability.invalidate()
+        return False
+
+    teacher.availability.mark_busy(start_time, end_time)
+    await invalidation_bus.publish(teacher.invalidation_topic)
+
+    try:
+        await booking_service.record_booking(user.id, start_time, end_time, booked_event, teacher.id,
+                                             _hour_rate(user, teacher))
+        await _notify_bookings_changed()
+    except DatabaseUnavailableError as exception:
+        # Событие уже в календаре: пользователь получает подтверждение, теряется только локальная история.
+        logger.error("Не удалось сохранить бронирование %s в истории: %s", booked_event.uid, exception)
+
+    return True
+
+
+@callback_dispatcher.prefix(CallbackData.TIME_PREFIX.value, CallbackData.parse_time)
+@task_handler(task_key_func=lambda event, *args, **kwargs: f"{event.from_user.id}_{event.data}")
+async def select_time(callback_query: types.CallbackQuery, state: FSMContext, payload: TimePayload):
+    hour = payload.hour
+    selected_date = payload.date
+
+    user, teacher = await _get_teacher(callback_query)
+
+    if not user:
+        await callback_query.message.edit_text("❌ Пользователь не найден.")
+        return
+
+    is_success = await _book_hour(user, teacher, selected_date, hour)
+    matrix = await teacher.availability.get_matrix()
+    keyboard = MenuBuilder.generate_hours_keyboard(matrix, selected_date)
 
     if is_success:
         await callback_query.message.answer(
             f"✅ Событие успешно забронировано на {selected_date} в {hour}:00.\n"
-            f"Выберите следующий слот или закончите бронирование."
+            f"Выберите следующий слот или закончите бронирование.\n\n"
+            f"Повторять это занятие каждую неделю?",
+            reply_markup=_weekly_offer_keyboard(teacher, selected_date, hour),
         )
         await callback_query.message.edit_text(
             "Выберите время:",
@@ -449,8 +575,320 @@ async def select_time(callback_query: types.CallbackQuery, state: FSMContext):
         )
 
 
-@router.callback_query(lambda c: c.data == CallbackData.FINISH_BOOKING.value)
-async def finish_booking(callback_query: types.CallbackQuery):
+async def _show_next_slots(
+    callback_query: types.CallbackQuery,
+    teacher: TeacherContext,
+    weekday: Weekday | None,
+    time_of_day: TimeOfDay,
+    header: str = "",
+):
+    slots = await teacher.availability.find_next_free_slots(
+        teacher.config.next_slots_count,
+        weekday,
+        time_of_day,
+    )
+    text = "Ближайшие свободные слоты:" if slots else "Свободных слотов по выбранным фильтрам нет."
+
+    matrix = await teacher.availability.get_matrix()
+
+    await callback_query.message.edit_text(
+        _with_stale_note(f"{header}{text}", matrix),
+        reply_markup=MenuBuilder.generate_next_slots_keyboard(slots, weekday, time_of_day),
+    )
+
+
+@callback_dispatcher.prefix(CallbackData.NEXT_SLOTS_PREFIX.value, CallbackData.parse_next_slots)
+async def next_slots(callback_query: types.CallbackQuery, state: FSMContext, payload: NextSlotsPayload):
+    """
+    Показывает ближайшие свободные слоты по всему окну бронирования с фильтрами.
+    """
+    user = await identity_service.get_or_create_user_by_identity(
+        Platforms.TELEGRAM,
+        str(callback_query.from_user.id),
+    )
+
+    if not user:
+        await callback_query.message.edit_text("❌ Не удалось инициализировать пользователя.")
+        return
+
+    user_data_handler = UserDataHandler(user_service, user.id)
+    await user_data_handler.ensure_user_exists()
+
+    missing_state, _, first_missing_label = await user_data_handler.get_missing_data_state()
+
+    if missing_state:
+        await state.set_state(missing_state)
+        await session_service.set_state(user.id, Platforms.TELEGRAM, str(missing_state), {})
+        await callback_query.message.edit_text(
+            f"❌ Ваши данные неполные. Завершите их заполнение.\n"
+            f"✍️ Введите: {first_missing_label}."
+        )
+        return
+
+    weekday = Weekday(payload.weekday) if payload.weekday else None
+    await _show_next_slots(callback_query, teacher_registry.get(user.teacher_id), weekday,
+                           TimeOfDay(payload.time_of_day))
+
+
+@callback_dispatcher.prefix(CallbackData.SLOT_PREFIX.value, CallbackData.parse_slot)
+@task_handler(task_key_func=lambda event, *args, **kwargs: f"{event.from_user.id}_{event.data}")
+async def select_slot(callback_query: types.CallbackQuery, state: FSMContext, payload: TimePayload):
+    """
+    Бронирует слот из списка ближайших одним нажатием.
+    """
+    user, teacher = await _get_teacher(callback_query)
+
+    if not user:
+        await callback_query.message.edit_text("❌ Пользователь не найден.")
+        return
+
+    is_success = await _book_hour(user, teacher, payload.date, payload.hour)
+
+    if is_success:
+        header = f"✅ Событие успешно забронировано на {payload.date} в {payload.hour}:00.\n\n"
+    else:
+        header = f"Ошибка: время {payload.hour}:00 уже занято на {payload.date}.\n\n"
+
+    await _show_next_slots(callback_query, teacher, None, TimeOfDay.ANY, header)
+
+    if is_success:
+        await callback_query.message.answer(
+            f"🔁 Повторять занятие {payload.date} в {payload.hour}:00 каждую неделю?",
+            reply_markup=_weekly_offer_keyboard(teacher, payload.date, payload.hour),
+        )
+
+
+def _weekly_offer_keyboard(teacher: TeacherContext, booked_date, hour: int):
+    """
+    Серия начинается через неделю после только что забронированного занятия.
+    """
+    return MenuBuilder.generate_weekly_offer_keyboard(
+        booked_date + timedelta(weeks=1),
+        hour,
+        teacher.config.weekly_series_weeks,
+    )
+
+
+@callback_dispatcher.prefix(CallbackData.WEEKLY_PREFIX.value, CallbackData.parse_weekly)
+@task_handler(task_key_func=lambda event, *args, **kwargs: f"{event.from_user.id}_{event.data}")
+async def book_weekly_series(callback_query: types.CallbackQuery, state: FSMContext, payload: WeeklyPayload):
+    """
+    Бронирует еженедельную серию одним событием с RRULE: занятость всех недель проверяется
+    одним запросом, занятые и нерабочие вхождения исключаются из серии.
+    """
+    user, teacher = await _get_teacher(callback_query)
+
+    if not user:
+        await callback_query.message.edit_text("❌ Пользователь не найден.")
+        return
+
+    local_tz = teacher.availability.local_tz
+    occurrences = [
+        local_tz.localize(datetime.combine(payload.date + timedelta(weeks=week),
+                                           datetime.min.time().replace(hour=payload.hour)))
+        for week in range(payload.weeks)
+    ]
+    excluded = [
+        occurrence for occurrence in occurrences
+        if not teacher.config.get_working_mask(occurrence.date()) >> payload.hour & 1
+    ]
+
+    series = await teacher.caldav.book_weekly(
+        summary=_booking_summary(user, teacher),
+        start=occurrences[0].astimezone(timezone("UTC")),
+        end=(occurrences[0] + timedelta(hours=1)).astimezone(timezone("UTC")),
+        weeks=payload.weeks,
+        excluded=excluded,
+    )
+
+    if series.event is None:
+        teacher.availability.invalidate()
+        await callback_query.message.edit_text("❌ Все занятия серии приходятся на занятое или нерабочее время.")
+        return
+
+    for occurrence in series.booked:
+        teacher.availability.mark_busy(occurrence, occurrence + timedelta(hours=1))
+
+    await invalidation_bus.publish(teacher.invalidation_topic)
+
+    try:
+        await booking_service.record_series(user.id, series, timedelta(hours=1), teacher.id,
+                                            _hour_rate(user, teacher))
+        await _notify_bookings_changed()
+    except DatabaseUnavailableError as exception:
+        logger.error("Не удалось сохранить серию %s в истории: %s", series.event.uid, exception)
+
+    text = (
+        f"✅ Забронировано занятий: {len(series.booked)}, каждую неделю в {payload.hour}:00 "
+        f"с {series.booked[0]:%d.%m.%Y}."
+    )
+
+    if series.conflicts:
+        skipped = ", ".join(f"{conflict:%d.%m}" for conflict in series.conflicts)
+        text += f"\n⚠️ Пропущены занятые или нерабочие даты: {skipped}."
+
+    await callback_query.message.edit_text(text)
+
+
+async def _show_bookings(
+    callback_query: types.CallbackQuery,
+    user: User | None,
+    after_start: datetime | None = None,
+    after_id: int = 0,
+    header: str = "",
+):
+    """
+    Показывает страницу предстоящих записей из локальной истории, без запросов к CalDAV.
+
+    :param after_start: Курсор страницы (начало последней показанной записи); None — первая страница.
+    """
+    is_first_page = after_start is None
+
+    if user:
+        bookings, has_next = await booking_service.get_bookings_page(
+            user.id,
+            datetime.now(timezone("UTC")) if is_first_page else after_start,
+            after_id,
+        )
+    else:
+        bookings, has_next = [], False
+
+    local_tz = teacher_registry.get(user.teacher_id if user else None).availability.local_tz
+
+    if bookings:
+        lines = []
+
+        for booking in bookings:
+            start = timezone("UTC").localize(booking.start_at).astimezone(local_tz)
+            end = timezone("UTC").localize(booking.end_at).astimezone(local_tz)
+            line = f"📅 {start:%d.%m.%Y} {start:%H:%M}–{end:%H:%M}"
+
+            if teacher_registry.has_choice:
+                line += f" · {teacher_registry.get(booking.teacher_id).name}"
+
+            lines.append(line)
+
+        text = "Ваши записи (❌ — отменить):\n\n" + "\n".join(lines)
+    else:
+        text = "У вас нет предстоящих записей." if is_first_page else "Больше записей нет."
+
+    await callback_query.message.edit_text(
+        f"{header}{text}",
+        reply_markup=MenuBuilder.generate_bookings_keyboard(bookings, has_next, is_first_page, local_tz),
+    )
+
+
+@callback_dispatcher.prefix(CallbackData.BOOKINGS_PREFIX.value, CallbackData.parse_bookings_page)
+async def my_bookings(callback_query: types.CallbackQuery, state: FSMContext, payload: BookingsPagePayload):
+    """
+    Показывает предстоящие записи пользователя постранично.
+    """
+    user = await identity_service.get_user_by_identity(
+        Platforms.TELEGRAM,
+        str(callback_query.from_user.id),
+    )
+
+    if payload.after_start:
+        await _show_bookings(callback_query, user, datetime.fromtimestamp(payload.after_start, timezone("UTC")),
+                             payload.after_id)
+    else:
+        await _show_bookings(callback_query, user)
+
+
+async def _cancel_in_calendar(teacher: TeacherContext, booking: BookingDTO) -> CancelResult:
+    """
+    Одиночное занятие удаляется целиком; вхождение серии исключается из общего события через EXDATE.
+    """
+    if booking.recurrence_id is None:
+        return await teacher.caldav.cancel_event(booking.caldav_href, booking.caldav_etag)
+
+    result, etag = await teacher.caldav.cancel_occurrence(
+        booking.caldav_href,
+        booking.caldav_etag,
+        timezone("UTC").localize(booking.recurrence_id),
+    )
+
+    if result is CancelResult.CANCELLED:
+        await booking_service.update_series_etag(booking.caldav_uid, etag)
+
+    return result
+
+
+@callback_dispatcher.prefix(CallbackData.CANCEL_BOOKING_PREFIX.value, CallbackData.parse_cancel_booking)
+@task_handler(task_key_func=lambda event, *args, **kwargs: f"{event.from_user.id}_{event.data}")
+async def cancel_booking(callback_query: types.CallbackQuery, state: FSMContext, payload: CancelBookingPayload):
+    """
+    Отменяет бронирование: один условный DELETE по сохранённому адресу события и сразу освобождает слот.
+    """
+    user = await identity_service.get_user_by_identity(
+        Platforms.TELEGRAM,
+        str(callback_query.from_user.id),
+    )
+    booking = await booking_service.get_booking(user.id, payload.booking_id) if user else None
+    # Запись отменяется в календаре того преподавателя, у которого создана, а не текущего выбранного.
+    teacher = teacher_registry.get(booking.teacher_id if booking else None)
+
+    if not booking:
+        header = "⚠️ Запись не найдена или уже отменена.\n\n"
+    elif booking.start_at <= datetime.now(timezone("UTC")).replace(tzinfo=None):
+        header = "⚠️ Занятие уже началось, отменить его нельзя.\n\n"
+    elif await _cancel_in_calendar(teacher, booking) is CancelResult.MODIFIED:
+        header = "⚠️ Занятие изменено в календаре преподавателем. Для отмены свяжитесь с ним напрямую.\n\n"
+    else:
+        await booking_service.mark_cancelled(booking.id)
+
+        start = timezone("UTC").localize(booking.start_at)
+        end = timezone("UTC").localize(booking.end_at)
+        teacher.availability.mark_free(start, end)
+        await invalidation_bus.publish(teacher.invalidation_topic)
+
+        local_start = start.astimezone(teacher.availability.local_tz)
+        header = f"✅ Запись на {local_start:%d.%m.%Y %H:%M} отменена.\n\n"
+
+    await _show_bookings(callback_query, user, header=header)
+
+
+@callback_dispatcher.exact(CallbackData.CHOOSE_TEACHER.value)
+async def choose_teacher(callback_query: types.CallbackQuery, state: FSMContext, payload=None):
+    """
+    Показывает список преподавателей; текущий выбор отмечен.
+    """
+    _, teacher = await _get_teacher(callback_query)
+
+    await callback_query.message.edit_text(
+        "Выберите преподавателя:",
+        reply_markup=MenuBuilder.generate_teachers_keyboard(teacher_registry.teachers, teacher.id),
+    )
+
+
+@callback_dispatcher.prefix(CallbackData.TEACHER_PREFIX.value, CallbackData.parse_teacher)
+async def select_teacher(callback_query: types.CallbackQuery, state: FSMContext, payload: TeacherPayload):
+    """
+    Сохраняет выбранного преподавателя: дальнейшие бронирования идут в его календари.
+    """
+    user = await identity_service.get_or_create_user_by_identity(
+        Platforms.TELEGRAM,
+        str(callback_query.from_user.id),
+    )
+    teacher = teacher_registry.get(payload.teacher_id)
+
+    if not user or teacher.id != payload.teacher_id:
+        await callback_query.message.edit_text(
+            "⚠️ Преподаватель недоступен. Выберите другого:",
+            reply_markup=MenuBuilder.generate_teachers_keyboard(teacher_registry.teachers, None),
+        )
+        return
+
+    await user_service.update_user_by_id(user.id, teacher_id=teacher.id)
+
+    await callback_query.message.edit_text(
+        f"✅ Ваш преподаватель: {teacher.name}. Выберите действие:",
+        reply_markup=MenuBuilder.generate_main_menu(teacher_registry.has_choice),
+    )
+
+
+@callback_dispatcher.exact(CallbackData.FINISH_BOOKING.value)
+async def finish_booking(callback_query: types.CallbackQuery, state: FSMContext, payload=None):
     user = await identity_service.get_user_by_identity(
         Platforms.TELEGRAM,
         str(callback_query.from_user.id),
@@ -466,10 +904,47 @@ async def finish_booking(callback_query: types.CallbackQuery):
     await bot.send_message(
         callback_query.from_user.id,
         "Выберите действие:",
-        reply_markup=MenuBuilder.generate_main_menu(),
+        reply_markup=MenuBuilder.generate_main_menu(teacher_registry.has_choice),
+    )
+
+
+@router.callback_query()
+async def dispatch_callback(callback_query: types.CallbackQuery, state: FSMContext):
+    """
+    Единая точка входа для callback-запросов: маршрутизация по индексу префиксов.
+    """
+    if not await callback_dispatcher.dispatch(callback_query, state):
+        raise SkipHandler
+
+
+async def _answer_error(event: types.ErrorEvent, text: str) -> None:
+    if event.update.callback_query:
+        await event.update.callback_query.answer(text, show_alert=True)
+    elif event.update.message:
+        await event.update.message.answer(text)
+
+
+@router.error(ExceptionTypeFilter(CalDavUnavailableError))
+async def caldav_unavailable(event: types.ErrorEvent):
+    """
+    Мгновенно отвечает пользователю, когда календарь недоступен, вместо молчаливого сбоя.
+    """
+    logger.warning("CalDAV недоступен при обработке апдейта %s: %s", event.update.update_id, event.exception)
+    await _answer_error(
+        event,
+        "📅 Календарь сейчас недоступен, бронирование не выполнено. Попробуйте через пару минут.",
     )
 
 
+@router.error(ExceptionTypeFilter(DatabaseUnavailableError))
+async def database_unavailable(event: types.ErrorEvent):
+    """
+    Отвечает пользователю сразу, пока БД недоступна, вместо ожидания переподключения.
+    """
+    logger.warning("БД недоступна при обработке апдейта %s: %s", event.update.update_id, event.exception)
+    await _answer_error(event, "⚠️ Сервис временно недоступен. Пожалуйста, попробуйте через минуту.")
+
+
 @router.message(Command("send_admin_message"))
 async def send_admin_message(message: types.Message):
     """
@@ -498,19 +973,225 @@ async def send_admin_message(message: types.Message):
                 await bot.send_message(chat_id=decrypt_telegram_id(user.telegram_id),
                                        text=f"⚠️⚠️⚠️{admin_message}⚠️⚠️⚠️")
             except Exception as exception:
-                logger.error(f"Ошибка при отправке сообщения пользователю {user.telegram_id}: {exception}")
+                logger.error("Ошибка при отправке сообщения пользователю %s: %s", user.telegram_id, exception)
 
         await message.answer("✅ Сообщение успешно отправлено всем активным пользователям.")
     finally:
         await database.close_session()
 
 
-async def main():
+async def _set_user_banned(message: types.Message, is_banned: bool) -> None:
+    if message.from_user.id != ADMIN_TELEGRAM_ID:
+        await message.answer("❌ У вас нет прав для выполнения этой команды.")
+        return
+
+    arguments = message.text.split(maxsplit=1)
+
+    if len(arguments) < 2 or not arguments[1].strip().isdigit():
+        await message.answer("❌ Укажите Telegram ID пользователя.\nПример: /ban 123456789")
+        return
+
+    user = await identity_service.get_user_by_identity(Platforms.TELEGRAM, arguments[1].strip())
+
+    if not user or not await user_service.update_user_by_id(user.id, is_banned=is_banned):
+        await message.answer("⚠️ Пользователь не найден.")
+        return
+
+    await ban_registry.refresh()
+    await invalidation_bus.publish(BanRegistry.INVALIDATION_TOPIC)
+
+    await message.answer("✅ Пользователь заблокирован." if is_banned else "✅ Пользователь разблокирован.")
+
+
+WEEKDAY_SHORT_NAMES = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
+STATS_TOP_SLOTS = 5
+
+
+def _parse_stats_period(argument: str, today: date) -> tuple[date, date] | None:
+    """
+    Период для /stats: без аргумента — текущий месяц, ``year`` — последние 12 месяцев,
+    ``ГГГГ`` — календарный год, ``ГГГГ-ММ`` — месяц.
+    """
+    month_start = today.replace(day=1)
+
+    try:
+        if not argument:
+            return month_start, (month_start + timedelta(days=32)).replace(day=1)
+
+        if argument == "year":
+            months_back = month_start.year * 12 + month_start.month - 1 - 11
+            return date(months_back // 12, months_back % 12 + 1, 1), (month_start + timedelta(days=32)).replace(day=1)
+
+        if len(argument) == 4 and argument.isdigit():
+            return date(int(argument), 1, 1), date(int(argument) + 1, 1, 1)
+
+        start = datetime.strptime(argument, "%Y-%m").date()
+        return start, (start + timedelta(days=32)).replace(day=1)
+    except ValueError:
+        return None
+
+
+def _format_money(value: float) -> str:
+    return f"{value:,.0f} ₽".replace(",", " ")
+
+
+def _format_stats(report: AnalyticsReport) -> str:
+    total = report.total
+    hours = total.booked_hours.sum()
+    lines = [
+        f"📊 Статистика {report.start:%d.%m.%Y} – {report.end - timedelta(days=1):%d.%m.%Y}",
+        f"Занятий: {total.lessons}, часов: {hours:g}",
+        f"Выручка: {_format_money(total.revenue)}",
+        f"Загрузка: {total.utilization:.0%}",
+    ]
+
+    if len(report.monthly_revenue) > 1:
+        lines.append("\nВыручка по месяцам:")
+        lines.extend(f"{month:%m.%Y}: {_format_money(revenue)}" for month, revenue in report.monthly_revenue)
+
+    if total.languages:
+        lines.append("\nПо языкам:")
+        languages = sorted(total.languages.items(), key=lambda item: item[1][1], reverse=True)
+        lines.extend(f"{language}: {lessons} зан., {_format_money(revenue)}"
+                     for language, (lessons, revenue) in languages)
+
+    # Самые загруженные часы: доля занятых часов от рабочих по дню недели и часу начала.
+    capacity = total.capacity_hours
+    utilization = np.divide(total.booked_hours, capacity, out=np.zeros_like(capacity), where=capacity > 0)
+    top_slots = [slot for slot in np.argsort(utilization, axis=None)[::-1][:STATS_TOP_SLOTS] if utilization.flat[slot]]
+
+    if top_slots:
+        lines.append("\nСамые загруженные часы:")
+        lines.extend(f"{WEEKDAY_SHORT_NAMES[slot // 24]} {slot % 24:02d}:00 — {utilization.flat[slot]:.0%}"
+                     for slot in top_slots)
+
+    return "\n".join(lines)
+
+
+@router.message(Command("stats"))
+async def show_stats(message: types.Message):
+    """
+    Загрузка, выручка и разбивка по языкам за период. Доступно только администратору.
+    """
+    if message.from_user.id != ADMIN_TELEGRAM_ID:
+        await message.answer("❌ У вас нет прав для выполнения этой команды.")
+        return
+
+    arguments = message.text.split(maxsplit=1)
+    today = datetime.now(teacher_registry.get(None).availability.local_tz).date()
+    period = _parse_stats_period(arguments[1].strip() if len(arguments) > 1 else "", today)
+
+    if period is None:
+        await message.answer("❌ Укажите период: /stats, /stats year, /stats 2026 или /stats 2026-10")
+        return
+
+    report = await analytics_service.get_report(*period)
+    await message.answer(_format_stats(report))
+
+
+@router.message(Command("ban"))
+async def ban_user(message: types.Message):
+    """
+    Блокирует пользователя по Telegram ID. Доступно только администратору.
+    """
+    await _set_user_banned(message, True)
+
+
+@router.message(Command("unban"))
+async def unban_user(message: types.Message):
+    """
+    Снимает блокировку с пользователя по Telegram ID. Доступно только администратору.
+    """
+    await _set_user_banned(message, False)
+
+
+async def connect_services() -> None:
+    """
+    Подключается к БД, загружает преподавателей и создаёт зависящие от них сервисы.
+    Выполняется в event loop бота, а не при импорте модуля.
+    """
+    global analytics_service
+
+    await database.connect()
+    await teacher_registry.load()
+
+    default_teacher = teacher_registry.get(None)
+    analytics_service = AnalyticsService(
+        database,
+        [teacher.config for teacher in teacher_registry.teachers] or [default_teacher.config],
+        default_teacher.availability.local_tz,
+    )
+
+
+async def _start_background_services(metrics_port: int) -> None:
+    await connect_services()
     dispatcher.include_router(router)
+
+    if METRICS_ENABLED:
+        await MetricsServer(REGISTRY, METRICS_HOST, metrics_port).start()
+
+    if TRACING_JSONL_PATH:
+        tracer.add_exporter(JsonLinesExporter(TRACING_JSONL_PATH))
+
+    if TRACING_OTLP_ENDPOINT:
+        tracer.add_exporter(OtlpHttpExporter(TRACING_OTLP_ENDPOINT, TRACING_SERVICE_NAME))
+
+    await database.start_replica_monitor()
+    await invalidation_bus.start()
+    await ban_registry.start()
+
+    if REMINDERS_ENABLED:
+        await reminder_scheduler.start()
+
+
+async def _stop_background_services() -> None:
+    await reminder_scheduler.stop()
+    await ban_registry.stop()
+    await invalidation_bus.stop()
+    await database.stop_replica_monitor()
+    teacher_registry.close()
+    tracer.shutdown()
+
+
+async def main():
+    await _start_background_services(METRICS_PORT)
     logger.info('Бот запущен и готов к работе')
 
     await bot.delete_webhook(drop_pending_updates=True)
-    await dispatcher.start_polling(bot)
+
+    try:
+        await dispatcher.start_polling(bot)
+    finally:
+        await _stop_background_services()
+
+
+async def run_worker(update_queue, worker_index: int):
+    """
+    Обрабатывает апдейты своего шарда, которые супервизор кладёт в очередь.
+    None в очереди означает завершение работы.
+
+    :param update_queue: Очередь апдейтов (multiprocessing.Queue) в формате JSON Bot API.
+    :param worker_index: Номер воркера; метрики воркера отдаются на METRICS_PORT + 1 + номер.
+    """
+    await _start_background_services(METRICS_PORT + 1 + worker_index)
+    logger.info('Воркер %s запущен и готов к работе', worker_index)
+
+    loop = asyncio.get_running_loop()
+    # Отдельный поток для блокирующего чтения очереди: общий пул нужен запросам к БД и CalDAV.
+    queue_reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"update-queue-{worker_index}")
+    tasks = set()
+
+    try:
+        while (raw_update := await loop.run_in_executor(queue_reader, update_queue.get)) is not None:
+            task = asyncio.create_task(dispatcher.feed_raw_update(bot, raw_update))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        queue_reader.shutdown(wait=False)
+        await _stop_background_services()
+        await bot.session.close()
 
 
 if __name__ == "__main__":
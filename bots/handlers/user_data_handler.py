@@ -23,7 +23,7 @@ class UserDataHandler:
         await self.__load_user()
 
         if not self.__user:
-            logger.warning(f"Пользователь id={self.__user_id} не найден")
+            logger.warning("Пользователь id=%s не найден", self.__user_id)
 
     async def get_missing_data_state(self) -> tuple[State | None, list[str], str | None]:
         await self.__load_user()
@@ -55,7 +55,7 @@ class UserDataHandler:
     async def update_user_data(self, **kwargs):
         await self.__user_service.update_user_by_id(self.__user_id, **kwargs)
         await self.__load_user()
-        logger.info(f"Данные пользователя id={self.__user_id} успешно обновлены.")
+        logger.info("Данные пользователя id=%s успешно обновлены.", self.__user_id)
 
     async def __load_user(self):
         self.__user = await self.__user_service.get_user_by_id(self.__user_id)
\ No newline at end of file
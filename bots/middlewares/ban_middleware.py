@@ -2,31 +2,20 @@ from aiogram import BaseMiddleware
 from aiogram.dispatcher.event.bases import SkipHandler
 from aiogram.types import CallbackQuery
 
-from bots.config.logging_config import get_logger
 from bots.config.platforms import Platforms
-from bots.models.database import Database
-from bots.services.identity_service import IdentityService
-from bots.services.user_service import UserService
-
-logger = get_logger(__name__)
+from bots.services.ban_registry import BanRegistry
 
 
 class BanMiddleware(BaseMiddleware):
+    """
+    Отсекает заблокированных пользователей по реестру в памяти, без запросов к БД.
+    """
+
+    def __init__(self, ban_registry: BanRegistry):
+        self.__ban_registry = ban_registry
+
     async def __call__(self, handler, event, data):
-        database = Database()
-        user_service = UserService(database)
-        identity_service = IdentityService(database, user_service)
-
-        try:
-            user = await identity_service.get_user_by_identity(
-                Platforms.TELEGRAM,
-                str(event.from_user.id),
-            )
-        except Exception as exception:
-            logger.error(f"❌ Не удалось проверить бан: {exception}")
-            user = None
-
-        if user and user.is_banned:
+        if self.__ban_registry.is_banned(Platforms.TELEGRAM, event.from_user.id):
             text_for_user = "🚫 Бот недоступен."
 
             if isinstance(event, CallbackQuery):
@@ -0,0 +1,17 @@
+from aiogram import BaseMiddleware
+
+from bots.config.platforms import Platforms
+from bots.models.database import set_consistency_key
+
+
+class ReadConsistencyMiddleware(BaseMiddleware):
+    """
+    Привязывает запросы к БД внутри апдейта к его пользователю: после собственной записи
+    пользователь читает из основной БД, а не с отстающей реплики.
+    """
+
+    async def __call__(self, handler, event, data):
+        user = data.get("event_from_user")
+        set_consistency_key(f"{Platforms.TELEGRAM}:{user.id}" if user else None)
+
+        return await handler(event, data)
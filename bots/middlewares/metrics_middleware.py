@@ -0,0 +1,39 @@
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+from bots.utils.metrics import (BOT_API_DURATION, BOT_API_ERRORS,
+                                HANDLER_DURATION, HANDLER_ERRORS)
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Замеряет длительность обработчиков сообщений.
+    Callback-запросы замеряются в CallbackDispatcher с разбивкой по префиксам.
+    """
+
+    async def __call__(self, handler, event, data):
+        handler_object = data.get("handler")
+        handler_name = getattr(getattr(handler_object, "callback", None), "__name__", "unknown")
+
+        try:
+            with HANDLER_DURATION.time(handler=handler_name, route="message"):
+                return await handler(event, data)
+        except Exception as exception:
+            HANDLER_ERRORS.inc(handler=handler_name, route="message", error=type(exception).__name__)
+            raise
+
+
+class MetricsRequestMiddleware(BaseRequestMiddleware):
+    """
+    Замеряет исходящие запросы к Telegram Bot API.
+    """
+
+    async def __call__(self, make_request, bot, method):
+        method_name = type(method).__name__
+
+        try:
+            with BOT_API_DURATION.time(method=method_name):
+                return await make_request(bot, method)
+        except Exception as exception:
+            BOT_API_ERRORS.inc(method=method_name, error=type(exception).__name__)
+            raise
@@ -0,0 +1,86 @@
+import time
+from collections import Counter, OrderedDict
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message
+
+from bots.config.logging_config import get_logger, get_sampled_logger
+from bots.config.throttling_config import ThrottlingConfig
+from bots.utils.tracing import tracer
+
+logger = get_logger(__name__)
+sampled_logger = get_sampled_logger(__name__)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Ограничивает частоту запросов пользователя ведром токенов на каждый тип события.
+
+    Подключается как outer-middleware, поэтому лишние запросы отбрасываются
+    до BanMiddleware и обработчиков, то есть до любых обращений к БД и CalDAV.
+    На отброшенный callback отвечает коротким уведомлением, сообщения отбрасываются молча.
+    """
+
+    def __init__(self, config: ThrottlingConfig | None = None):
+        self.__config = config or ThrottlingConfig()
+        self.__buckets: OrderedDict[tuple[int, str], tuple[float, float]] = OrderedDict()
+        self.__counters = Counter()
+
+    async def __call__(self, handler, event, data):
+        user = getattr(event, "from_user", None)
+
+        if user is None:
+            return await handler(event, data)
+
+        with tracer.span("middleware.throttling"):
+            event_type = self.__get_event_type(event)
+            is_allowed = self.__try_acquire(user.id, event_type)
+
+        if is_allowed:
+            return await handler(event, data)
+
+        self.__counters[event_type] += 1
+        sampled_logger.info("Запрос пользователя %s (%s) отброшен ограничителем частоты", user.id, event_type)
+
+        if isinstance(event, CallbackQuery):
+            await event.answer(self.__config.throttled_text)
+
+        return None
+
+    def stats(self) -> dict[str, int]:
+        """
+        Возвращает количество отброшенных запросов по типам событий.
+        """
+        return {**self.__counters, "tracked_buckets": len(self.__buckets)}
+
+    def __get_event_type(self, event) -> str:
+        if isinstance(event, Message):
+            return ThrottlingConfig.MESSAGE
+
+        if isinstance(event, CallbackQuery) and event.data:
+            head, separator, _ = event.data.partition("_")
+
+            if separator:
+                return self.__config.callback_prefixes.get(head + separator, ThrottlingConfig.DEFAULT)
+
+        return ThrottlingConfig.DEFAULT
+
+    def __try_acquire(self, user_id: int, event_type: str) -> bool:
+        capacity, refill_rate = self.__config.get_bucket(event_type)
+        key = (user_id, event_type)
+        now = time.monotonic()
+
+        tokens, updated_at = self.__buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+        is_allowed = tokens >= 1
+
+        if is_allowed:
+            tokens -= 1
+
+        self.__buckets[key] = (tokens, now)
+
+        if len(self.__buckets) > self.__config.max_tracked_buckets:
+            self.__buckets.popitem(last=False)
+
+        return is_allowed
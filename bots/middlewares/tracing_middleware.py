@@ -0,0 +1,24 @@
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+from bots.utils.tracing import tracer
+
+
+class TracingMiddleware(BaseMiddleware):
+    """
+    Открывает корневой спан на каждый апдейт; все спаны обработки становятся его потомками.
+    """
+
+    async def __call__(self, handler, event, data):
+        with tracer.span("update", update_id=event.update_id, event_type=event.event_type):
+            return await handler(event, data)
+
+
+class TracingRequestMiddleware(BaseRequestMiddleware):
+    """
+    Оборачивает исходящие запросы к Telegram Bot API в спаны.
+    """
+
+    async def __call__(self, make_request, bot, method):
+        with tracer.span(f"telegram.{type(method).__name__}"):
+            return await make_request(bot, method)
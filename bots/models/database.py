@@ -1,24 +1,173 @@
 import asyncio
-import logging
+import os
+import random
 import threading
 import time
+from collections import OrderedDict
+from contextvars import ContextVar
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError, DisconnectionError, SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 
-from bots.config.logging_config import get_logger
+from bots.config.database_config import (DB_CONNECT_TIMEOUT_SECONDS,
+                                         DB_MAX_ATTEMPTS,
+                                         DB_READ_TIMEOUT_SECONDS,
+                                         DB_RECONNECT_BASE_DELAY_SECONDS,
+                                         DB_READ_YOUR_WRITES_SECONDS,
+                                         DB_RECONNECT_MAX_DELAY_SECONDS,
+                                         DB_REPLICA_CHECK_INTERVAL_SECONDS,
+                                         DB_REPLICA_MAX_LAG_SECONDS,
+                                         DB_REPLICA_RETRY_SECONDS,
+                                         DB_REQUEST_DEADLINE_SECONDS,
+                                         DB_RETRY_BASE_DELAY_SECONDS,
+                                         DB_RETRY_MAX_DELAY_SECONDS,
+                                         DB_WRITE_TIMEOUT_SECONDS)
+from bots.config.logging_config import get_logger, get_sampled_logger
+from bots.utils.metrics import DB_ERRORS, DB_QUERY_DURATION, DB_READ_ROUTES
+from bots.utils.tracing import tracer
 
 logger = get_logger(__name__)
+sampled_logger = get_sampled_logger(__name__)
 
-DATABASE_URL = "mysql+pymysql://root:@localhost/telegram_bot"
+DATABASE_URL = os.getenv("DATABASE_URL", "mysql+pymysql://root:@localhost/telegram_bot")
+# Реплики для чтения через запятую; без них все запросы идут в DATABASE_URL.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+ENGINE_OPTIONS = {
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+    "connect_args": {
+        "connect_timeout": DB_CONNECT_TIMEOUT_SECONDS,
+        "read_timeout": DB_READ_TIMEOUT_SECONDS,
+        "write_timeout": DB_WRITE_TIMEOUT_SECONDS,
+    },
+}
+SHOW_REPLICA_STATUS = text("SHOW REPLICA STATUS")
+
+# Коды ошибок MySQL: потеря соединения и временные конфликты блокировок.
+CONNECTION_ERROR_CODES = {2002, 2003, 2006, 2013, 2055}
+TRANSIENT_ERROR_CODES = {1205, 1213}
+
+
+class DatabaseUnavailableError(Exception):
+    """БД недоступна: запрос не выполнен в пределах срока."""
+
+
+class ErrorKind:
+    CONNECTION = "connection"
+    TRANSIENT = "transient"
+    FATAL = "fatal"
+
+
+def classify_error(exception: SQLAlchemyError) -> str:
+    """
+    Определяет, имеет ли смысл повторять запрос.
+
+    - CONNECTION — соединение потеряно: нужно переподключиться и повторить;
+    - TRANSIENT — дедлок или таймаут блокировки: повторить с задержкой;
+    - FATAL — ошибка в самом запросе или данных: повтор не поможет.
+    """
+    if isinstance(exception, DisconnectionError):
+        return ErrorKind.CONNECTION
+
+    if isinstance(exception, DBAPIError):
+        if exception.connection_invalidated:
+            return ErrorKind.CONNECTION
+
+        code = exception.orig.args[0] if exception.orig is not None and exception.orig.args else None
+
+        if code in CONNECTION_ERROR_CODES:
+            return ErrorKind.CONNECTION
+
+        if code in TRANSIENT_ERROR_CODES:
+            return ErrorKind.TRANSIENT
+
+    return ErrorKind.FATAL
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Экспоненциальная задержка с полным джиттером, чтобы повторы не шли синхронной волной.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# Ключ согласованности текущего апдейта (обычно пользователь): после его записи чтения идут в основную БД.
+_consistency_key: ContextVar[str | None] = ContextVar("database_consistency_key", default=None)
+
+
+# Реплика, выбранная для текущего чтения. Хранится в контексте задачи, а не в общем Database:
+# параллельные execute_with_retry не перезаписывают друг другу реплику для отказа и пометки недоступности.
+_current_replica: ContextVar["Replica | None"] = ContextVar("database_current_replica", default=None)
+
+
+def set_consistency_key(key: str | None) -> None:
+    """
+    Привязывает чтения и записи текущей задачи к ключу для read-your-writes.
+    """
+    _consistency_key.set(key)
+
+
+class Replica:
+    """
+    Реплика для чтения и результат последнего замера её отставания.
+    """
+
+    def __init__(self, url: str):
+        self.engine = create_engine(url, **ENGINE_OPTIONS)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.session: Session | None = None
+        self.lag: float | None = None
+        self.checked_at = 0.0
+        self.down_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def is_usable(self, now: float) -> bool:
+        """
+        Реплика исправна, замер свежий и отставание в допустимых пределах.
+        """
+        return (
+            now >= self.down_until
+            and now - self.checked_at <= 3 * DB_REPLICA_CHECK_INTERVAL_SECONDS
+            and self.lag is not None
+            and self.lag <= DB_REPLICA_MAX_LAG_SECONDS
+        )
+
+    def measure_lag(self) -> float | None:
+        """
+        Отставание по SHOW REPLICA STATUS; None, если репликация остановлена.
+        Выполняется в отдельном потоке.
+        """
+        with self.engine.connect() as connection:
+            row = connection.execute(SHOW_REPLICA_STATUS).mappings().first()
+
+        if row is None:
+            # Сервер не является репликой (например, тот же сервер в разработке) — отставания нет.
+            return 0.0
+
+        lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        return None if lag is None else float(lag)
 
 
 class Database:
+    """
+    Подключение к БД с общим состоянием здоровья.
+
+    При потере соединения запускается одна фоновая задача переподключения с экспоненциальной
+    задержкой; пока она не завершилась, новые запросы сразу получают DatabaseUnavailableError,
+    а не ждут переподключения каждый по отдельности.
+
+    Чтения, помеченные безопасными (``get_read_session``), идут на реплики из DATABASE_REPLICA_URLS,
+    если отставание реплики в пределах порога и пользователь текущего апдейта недавно ничего не
+    записывал. При отставании, ошибке реплики или отсутствии свежего замера чтение уходит в основную БД.
+    """
     __instance = None
     __threading_lock = threading.Lock()
     __MAX_WAITING_CONNECT_TIME = 600
-    __WAITING_CONNECT_TIME = 30
 
     def __new__(cls):
         with cls.__threading_lock:
@@ -29,36 +178,105 @@ class Database:
             return cls.__instance
 
     def __init__(self):
-        if not hasattr(self, "_initialized"):  # Чтобы не инициализировать повторно
-            logging.basicConfig()
-            logging.getLogger("sqlalchemy.engine").setLevel(logging.DEBUG)
-
-            self.__engine = create_engine(DATABASE_URL, echo=True, pool_recycle=1800)
+        if not hasattr(self, "_Database__initialized"):  # Чтобы не инициализировать повторно
+            self.__engine = create_engine(DATABASE_URL, **ENGINE_OPTIONS)
+            self.__register_tracing(self.__engine)
             self.__session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.__engine)
+            event.listen(self.__session_factory, "after_commit", self.__remember_write)
             self.__session = None
+            self.__is_healthy = False
+            self.__reconnect_task: asyncio.Task | None = None
+            self.__replicas = [Replica(url) for url in DATABASE_REPLICA_URLS]
+            self.__next_replica = 0
+            self.__written_at: OrderedDict[str, float] = OrderedDict()
+            self.__replica_monitor_task: asyncio.Task | None = None
+
+            for replica in self.__replicas:
+                self.__register_tracing(replica.engine)
+
             self.__initialized = True  # Флаг, что объект уже инициализирован
 
+    @property
+    def is_healthy(self) -> bool:
+        return self.__is_healthy
+
     async def connect(self):
-        """Запуск процесса подключения к БД"""
-        await self.__reconnect()
+        """
+        Запуск процесса подключения к БД.
+        Если за 10 минут подключение не установлено, выбрасывает исключение.
+        """
+        self.__start_reconnect()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self.__reconnect_task), self.__MAX_WAITING_CONNECT_TIME)
+        except asyncio.TimeoutError:
+            self.__reconnect_task.cancel()
+            logger.error("❌ Не удалось подключиться к базе данных за 10 минут. Завершаем попытки.")
+            raise RuntimeError("Не удалось подключиться к базе данных")
 
     async def get_session(self) -> Session:
         """
         Возвращает текущую сессию SQLAlchemy. Если сессия закрыта — создаем новую.
+
+        :raises DatabaseUnavailableError: Идёт переподключение к БД.
         """
+        if not self.__is_healthy:
+            raise DatabaseUnavailableError("База данных недоступна, идёт переподключение")
+
         if self.__session is None or not self.__session.is_active:
-            logger.info("⚠ Сессия закрыта. Создаем новую.")
-            await self.__reconnect()
+            sampled_logger.info("⚠ Сессия закрыта. Создаем новую.")
+            self.__session = self.__session_factory()
 
         return self.__session
 
+    async def get_read_session(self) -> Session:
+        """
+        Сессия для чтения, допускающего небольшое отставание: реплика, если она пригодна,
+        иначе основная БД. Закрывается тем же ``close_session``.
+
+        :raises DatabaseUnavailableError: Основная БД недоступна.
+        """
+        if not self.__is_healthy:
+            raise DatabaseUnavailableError("База данных недоступна, идёт переподключение")
+
+        replica, reason = self.__choose_replica()
+
+        if replica is None:
+            DB_READ_ROUTES.inc(target="primary", reason=reason)
+            return await self.get_session()
+
+        DB_READ_ROUTES.inc(target="replica", reason=reason)
+
+        if replica.session is None or not replica.session.is_active:
+            replica.session = replica.session_factory()
+
+        _current_replica.set(replica)
+        return replica.session
+
     async def close_session(self):
         """
         Закрывает текущую сессию.
         """
         if self.__session:
             self.__session.close()
-            logger.info("🔴 Сессия базы данных закрыта.")
+            logger.debug("🔴 Сессия базы данных закрыта.")
+
+        replica = _current_replica.get()
+
+        if replica is not None and replica.session is not None:
+            replica.session.close()
+
+    async def start_replica_monitor(self) -> None:
+        """
+        Запускает периодический замер отставания реплик. Без него реплики не используются.
+        """
+        if self.__replicas and self.__replica_monitor_task is None:
+            self.__replica_monitor_task = asyncio.create_task(self.__monitor_replicas())
+
+    async def stop_replica_monitor(self) -> None:
+        if self.__replica_monitor_task is not None:
+            self.__replica_monitor_task.cancel()
+            self.__replica_monitor_task = None
 
     async def rollback(self):
         """
@@ -66,48 +284,230 @@ class Database:
         """
         if self.__session:
             logger.warning("⏪ Откат транзакции из-за ошибки")
-            self.__session.rollback()
+
+            try:
+                self.__session.rollback()
+            except SQLAlchemyError as exception:
+                logger.warning("Не удалось откатить транзакцию: %s", exception)
+                self.__session = None
 
     async def execute_with_retry(self, function, *args, **kwargs):
         """
-        Выполняет переданную функцию с автоматическим повтором в случае потери соединения.
+        Выполняет переданную функцию с повторами по классу ошибки в пределах общего срока.
+
+        Потеря соединения запускает общее переподключение, и запрос ждёт его не дольше
+        оставшегося срока. Временные ошибки повторяются с экспоненциальной задержкой и джиттером.
+        Ошибки запроса не повторяются: транзакция откатывается и возвращается None.
+
+        :raises DatabaseUnavailableError: БД недоступна или срок истёк.
         """
+        operation = self.__get_operation_name(function)
+        deadline = time.monotonic() + DB_REQUEST_DEADLINE_SECONDS
+
+        if not self.__is_healthy:
+            DB_ERRORS.inc(operation=operation, error=DatabaseUnavailableError.__name__)
+            raise DatabaseUnavailableError("База данных недоступна, идёт переподключение")
+
+        with DB_QUERY_DURATION.time(operation=operation), tracer.span(f"db.{operation}"):
+            for attempt in range(1, DB_MAX_ATTEMPTS + 1):
+                _current_replica.set(None)
+
+                try:
+                    return await function(*args, **kwargs)
+                except SQLAlchemyError as exception:
+                    DB_ERRORS.inc(operation=operation, error=type(exception).__name__)
+                    replica = _current_replica.get()
+
+                    if replica is not None:
+                        # Ошибка реплики не говорит о здоровье основной БД: повторяем чтение на ней.
+                        self.__mark_replica_down(replica, exception)
+
+                        if attempt == DB_MAX_ATTEMPTS:
+                            raise DatabaseUnavailableError(f"{operation}: исчерпаны попытки") from exception
+
+                        continue
+
+                    kind = classify_error(exception)
+                    await self.rollback()
+
+                    if kind == ErrorKind.FATAL:
+                        logger.error("❌ Ошибка при выполнении запроса %s: %s", operation, exception)
+                        return None
+
+                    if kind == ErrorKind.CONNECTION:
+                        logger.warning("⚠ Потеряно соединение с БД (%s). Переподключаемся...", operation)
+                        self.__session = None
+                        self.__start_reconnect()
+
+                    if attempt == DB_MAX_ATTEMPTS:
+                        raise DatabaseUnavailableError(f"{operation}: исчерпаны попытки") from exception
+
+                    await self.__wait_before_retry(attempt, deadline, operation, exception)
+
+    async def __wait_before_retry(self, attempt: int, deadline: float, operation: str, exception: Exception):
+        delay = backoff_delay(attempt, DB_RETRY_BASE_DELAY_SECONDS, DB_RETRY_MAX_DELAY_SECONDS)
+
+        if time.monotonic() + delay >= deadline:
+            raise DatabaseUnavailableError(f"{operation}: истёк срок запроса") from exception
+
+        await asyncio.sleep(delay)
+
+        if self.__is_healthy:
+            return
+
         try:
-            return await function(*args, **kwargs)
-        except OperationalError:
-            logger.warning("⚠ Потеряно соединение с БД. Переподключаемся...")
-            await self.__reconnect()
-            return await function(*args, **kwargs)
-        except SQLAlchemyError as exception:
-            await self.rollback()
-            logger.error(f"❌ Ошибка при выполнении запроса: {exception}")
-            return None
+            await asyncio.wait_for(asyncio.shield(self.__reconnect_task), deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            raise DatabaseUnavailableError(f"{operation}: БД не восстановилась за срок запроса") from exception
 
-    async def __reconnect(self):
+    def __choose_replica(self) -> tuple[Replica | None, str]:
+        """
+        Выбирает реплику по кругу среди пригодных.
+
+        :return: Реплика (или None для основной БД) и причина выбора для метрик.
+        """
+        if not self.__replicas:
+            return None, "no_replicas"
+
+        now = time.monotonic()
+        key = _consistency_key.get()
+
+        if key is not None and now - self.__written_at.get(key, float("-inf")) < DB_READ_YOUR_WRITES_SECONDS:
+            return None, "read_your_writes"
+
+        for offset in range(len(self.__replicas)):
+            replica = self.__replicas[(self.__next_replica + offset) % len(self.__replicas)]
+
+            if replica.is_usable(now):
+                self.__next_replica = (self.__next_replica + offset + 1) % len(self.__replicas)
+                return replica, "healthy"
+
+        return None, "replicas_unusable"
+
+    def __remember_write(self, session: Session) -> None:
+        """
+        Запоминает время записи для ключа текущего апдейта и вычищает истёкшие окна.
+        """
+        key = _consistency_key.get()
+
+        if key is None or not self.__replicas:
+            return
+
+        now = time.monotonic()
+        self.__written_at.pop(key, None)
+        self.__written_at[key] = now
+
+        while self.__written_at:
+            oldest_key, written_at = next(iter(self.__written_at.items()))
+
+            if now - written_at < DB_READ_YOUR_WRITES_SECONDS:
+                break
+
+            del self.__written_at[oldest_key]
+
+    def __mark_replica_down(self, replica: Replica, exception: Exception) -> None:
+        logger.warning("⚠ Реплика %s недоступна, читаем из основной БД: %s", replica.name, exception)
+        replica.down_until = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+
+        if replica.session is not None:
+            try:
+                replica.session.close()
+            except SQLAlchemyError:
+                pass
+
+            replica.session = None
+
+    async def __monitor_replicas(self) -> None:
+        while True:
+            for replica in self.__replicas:
+                try:
+                    lag = await asyncio.to_thread(replica.measure_lag)
+                except SQLAlchemyError as exception:
+                    self.__mark_replica_down(replica, exception)
+                    continue
+
+                was_lagging = replica.lag is None or replica.lag > DB_REPLICA_MAX_LAG_SECONDS
+                is_lagging = lag is None or lag > DB_REPLICA_MAX_LAG_SECONDS
+
+                if is_lagging and not was_lagging:
+                    logger.warning("⚠ Реплика %s отстаёт (%s с), чтения идут в основную БД", replica.name, lag)
+
+                replica.lag = lag
+                replica.checked_at = time.monotonic()
+
+            await asyncio.sleep(DB_REPLICA_CHECK_INTERVAL_SECONDS)
+
+    def __start_reconnect(self) -> None:
         """
-        Попытка установить соединение с базой данных.
-        Если соединение не удается, повторяем попытку каждые 30 секунд асинхронно.
-        Если за 10 минут подключение не установлено, выбрасываем исключение.
+        Помечает БД недоступной и запускает переподключение, если оно ещё не идёт.
         """
+        self.__is_healthy = False
 
-        start_time = time.time()
-        is_database_connect = False
+        if self.__reconnect_task is None or self.__reconnect_task.done():
+            self.__reconnect_task = asyncio.get_running_loop().create_task(self.__reconnect())
 
-        while not is_database_connect:
+    @staticmethod
+    def __register_tracing(engine) -> None:
+        """
+        Открывает спан на каждый SQL-запрос, выполненный внутри трассируемого апдейта.
+        """
+
+        def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+            context._trace_span = tracer.start_detached("sql", statement=statement[:500])
+
+        def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+            span = getattr(context, "_trace_span", None)
+
+            if span is not None:
+                tracer.finish(span)
+
+        def handle_error(exception_context):
+            span = getattr(exception_context.execution_context, "_trace_span", None)
+
+            if span is not None:
+                span.set_error(exception_context.original_exception)
+                tracer.finish(span)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", handle_error)
+
+    @staticmethod
+    def __get_operation_name(function) -> str:
+        """
+        Имя операции для метрик: ``UserService.get_user_by_id`` вместо ``...<locals>.query``.
+        """
+        return getattr(function, "__qualname__", repr(function)).split(".<locals>", 1)[0]
+
+    async def __reconnect(self):
+        """
+        Переподключается к БД с экспоненциальной задержкой и джиттером, пока не получится.
+        """
+        attempt = 0
+
+        while True:
             try:
                 self.__session = self.__session_factory()
                 await self.__execute('SELECT 1')
+                self.__is_healthy = True
                 logger.info('✅ Успешное подключение к базе данных')
-                is_database_connect = True
-            except OperationalError as exception:
-                elapsed_time = time.time() - start_time
+                return
+            except Exception as exception:
+                # Любая ошибка (InterfaceError, разрыв соединения, сбой session_factory) не должна
+                # завершать единственную задачу переподключения: иначе БД останется недоступной до перезапуска.
+                attempt += 1
+                delay = backoff_delay(attempt, DB_RECONNECT_BASE_DELAY_SECONDS, DB_RECONNECT_MAX_DELAY_SECONDS)
+                logger.warning("⚠ Ошибка подключения к БД: %s. Повторная попытка через %.1f с...", exception, delay)
+
+                if self.__session is not None:
+                    try:
+                        self.__session.close()
+                    except Exception:
+                        pass
 
-                if elapsed_time > self.__MAX_WAITING_CONNECT_TIME:
-                    logger.error("❌ Не удалось подключиться к базе данных за 10 минут. Завершаем попытки.")
-                    raise RuntimeError("Не удалось подключиться к базе данных")
+                    self.__session = None
 
-                logger.warning(f"⚠ Ошибка подключения к БД: {exception}. Повторная попытка через 30 секунд...")
-                await asyncio.sleep(self.__WAITING_CONNECT_TIME)
+                await asyncio.sleep(delay)
 
     async def __execute(self, query: str):
         """
@@ -0,0 +1,143 @@
+"""
+Массовый перенос идентичностей Telegram из users.telegram_id в user_identities.
+
+Запуск (повторный запуск продолжает с последней контрольной точки):
+    python -m bots.models.identity_backfill [--batch-size 1000] [--checkpoint PATH] [--restart]
+
+Пользователи читаются пачками по первичному ключу (keyset, без OFFSET), идентичности
+вставляются одним многострочным INSERT IGNORE на пачку. После успешного завершения
+ленивый перенос можно отключить: LEGACY_IDENTITY_FALLBACK=0.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from sqlalchemy import bindparam, create_engine, func, insert, select
+
+from bots.config.identity_config import (IDENTITY_BACKFILL_BATCH_SIZE,
+                                         IDENTITY_BACKFILL_CHECKPOINT_PATH)
+from bots.config.platforms import Platforms
+from bots.models.database import DATABASE_URL
+from bots.models.models import User, UserIdentity
+
+USERS = User.__table__
+IDENTITIES = UserIdentity.__table__
+
+LEGACY_USERS = USERS.c.telegram_id.is_not(None) & (USERS.c.id > bindparam("after_id"))
+
+SELECT_LEGACY_USERS_BATCH = (
+    select(USERS.c.id, USERS.c.telegram_id)
+    .where(LEGACY_USERS)
+    .order_by(USERS.c.id)
+    .limit(bindparam("batch_size"))
+)
+COUNT_LEGACY_USERS = select(func.count()).select_from(USERS).where(LEGACY_USERS)
+# Уже существующие идентичности (в том числе созданные ленивым переносом) пропускаются по уникальному индексу.
+INSERT_IDENTITIES = insert(IDENTITIES).prefix_with("IGNORE")
+
+
+def load_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"last_user_id": 0, "migrated": 0, "completed": False}
+
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_checkpoint(path: str, checkpoint: dict) -> None:
+    """
+    Атомарно перезаписывает контрольную точку, чтобы прерванный запуск не оставил битый файл.
+    """
+    directory = os.path.dirname(path)
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temporary_path = f"{path}.tmp"
+
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file)
+
+    os.replace(temporary_path, path)
+
+
+def backfill(connection, checkpoint: dict, batch_size: int, checkpoint_path: str) -> dict:
+    """
+    Переносит идентичности пачками, фиксируя каждую пачку и контрольную точку после неё.
+
+    :return: Итоговая контрольная точка.
+    """
+    total = connection.execute(COUNT_LEGACY_USERS, {"after_id": checkpoint["last_user_id"]}).scalar()
+    processed = 0
+    started_at = time.monotonic()
+
+    print(f"Осталось перенести пользователей: {total} (начиная после id={checkpoint['last_user_id']})")
+
+    while True:
+        rows = connection.execute(
+            SELECT_LEGACY_USERS_BATCH,
+            {"after_id": checkpoint["last_user_id"], "batch_size": batch_size},
+        ).all()
+
+        if not rows:
+            break
+
+        # Идентичности шифруются тем же ключом и форматом, что и users.telegram_id: шифртекст копируется как есть.
+        result = connection.execute(
+            INSERT_IDENTITIES,
+            [
+                {"user_id": user_id, "platform": Platforms.TELEGRAM, "platform_user_id": telegram_id}
+                for user_id, telegram_id in rows
+            ],
+        )
+        connection.commit()
+
+        processed += len(rows)
+        checkpoint["last_user_id"] = rows[-1].id
+        checkpoint["migrated"] += max(result.rowcount, 0)
+        save_checkpoint(checkpoint_path, checkpoint)
+
+        elapsed = time.monotonic() - started_at
+        print(
+            f"{processed}/{total} пользователей, создано идентичностей: {checkpoint['migrated']}, "
+            f"last_user_id={checkpoint['last_user_id']}, {processed / elapsed:.0f} строк/с"
+        )
+
+    checkpoint["completed"] = True
+    save_checkpoint(checkpoint_path, checkpoint)
+
+    return checkpoint
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Перенос идентичностей Telegram в user_identities")
+    parser.add_argument("--batch-size", type=int, default=IDENTITY_BACKFILL_BATCH_SIZE)
+    parser.add_argument("--checkpoint", default=IDENTITY_BACKFILL_CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="начать с начала, игнорируя контрольную точку")
+    arguments = parser.parse_args()
+
+    checkpoint = load_checkpoint(arguments.checkpoint)
+
+    if arguments.restart:
+        checkpoint = {"last_user_id": 0, "migrated": 0, "completed": False}
+
+    engine = create_engine(DATABASE_URL)
+
+    try:
+        with engine.connect() as connection:
+            checkpoint = backfill(connection, checkpoint, arguments.batch_size, arguments.checkpoint)
+    finally:
+        engine.dispose()
+
+    print(
+        f"✅ Перенос завершён, создано идентичностей: {checkpoint['migrated']}. "
+        "Ленивый перенос можно отключить: LEGACY_IDENTITY_FALLBACK=0"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
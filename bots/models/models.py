@@ -1,14 +1,25 @@
-from sqlalchemy import TIMESTAMP, Boolean, Column, Integer, String
-from sqlalchemy.sql import func
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import (JSON, TIMESTAMP, BigInteger, Boolean, Column, DateTime,
+                        ForeignKey, Index, Integer, String, UniqueConstraint)
+from sqlalchemy.sql import func, text
 
 from bots.models.base import Base
 
+# Зашифрованный id платформы: base64 от одного или двух блоков AES (24 или 44 символа).
+ENCRYPTED_ID_LENGTH = 64
+PLATFORM_LENGTH = 16
+CALDAV_UID_LENGTH = 255
+CALDAV_HREF_LENGTH = 512
+CALDAV_ETAG_LENGTH = 255
+
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
-    telegram_id = Column(String, unique=True, nullable=True)
+    id = Column(Integer, primary_key=True)
+    telegram_id = Column(String(ENCRYPTED_ID_LENGTH), nullable=True)
     name = Column(String(255), nullable=True)
     surname = Column(String(255), nullable=True)
     language = Column(String(50), nullable=True)
@@ -16,25 +27,167 @@ class User(Base):
     created_at = Column(TIMESTAMP, server_default=func.now())
     is_banned = Column(Boolean, nullable=False, default=False)
     hour_rate = Column(Integer, nullable=False, default=1500)
+    # Выбранный преподаватель; NULL — преподаватель по умолчанию.
+    teacher_id = Column(Integer, ForeignKey("teachers.id", ondelete="SET NULL"), nullable=True)
+    # Меняется при любом обновлении строки; по нему реестр банов подтягивает изменения.
+    updated_at = Column(
+        TIMESTAMP,
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+    )
+
+    __table_args__ = (
+        UniqueConstraint("telegram_id", name="ux_users_telegram_id"),
+        Index("ix_users_updated_at", "updated_at"),
+    )
+
+
+class Teacher(Base):
+    __tablename__ = "teachers"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    caldav_url = Column(String(CALDAV_HREF_LENGTH), nullable=False)
+    caldav_username = Column(String(255), nullable=False)
+    # Пароль приложения не хранится в БД: здесь имя переменной окружения, из которой он читается.
+    caldav_password_env = Column(String(64), nullable=False)
+    # Стоимость часа; NULL — используется ставка ученика из users.hour_rate.
+    hour_rate = Column(Integer, nullable=True)
+    # Переопределения AvailabilityDaysConfig: timezone, working_hours, breaks, blocked_weekdays, horizon_days.
+    availability = Column(JSON, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+
+class TeacherCalendar(Base):
+    __tablename__ = "teacher_calendars"
+
+    id = Column(Integer, primary_key=True)
+    teacher_id = Column(Integer, ForeignKey("teachers.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(255), nullable=False)
+    cal_id = Column(String(255), nullable=True)
+    url = Column(String(CALDAV_HREF_LENGTH), nullable=True)
+    # Календарь, в который записываются бронирования; занятость читается из всех календарей преподавателя.
+    is_booking_target = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        UniqueConstraint("teacher_id", "name", name="ux_teacher_calendars_teacher_name"),
+    )
+
+
+class UserIdentity(Base):
+    __tablename__ = "user_identities"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    platform = Column(String(PLATFORM_LENGTH), nullable=False)
+    platform_user_id = Column(String(ENCRYPTED_ID_LENGTH), nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # Поиск по идентичности: одна строка по уникальному ключу, затем users по первичному ключу.
+        UniqueConstraint("platform", "platform_user_id", name="ux_user_identities_platform_user"),
+        Index("ix_user_identities_user_id", "user_id"),
+    )
+
+
+class UserSession(Base):
+    __tablename__ = "user_sessions"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    platform = Column(String(PLATFORM_LENGTH), nullable=False)
+    state = Column(String(255), nullable=True)
+    state_payload = Column(JSON, nullable=True)
+    updated_at = Column(
+        TIMESTAMP,
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+    )
+
+    __table_args__ = (
+        # Нужен для INSERT ... ON DUPLICATE KEY UPDATE в SessionService.set_state.
+        UniqueConstraint("user_id", "platform", name="ux_user_sessions_user_platform"),
+    )
+
+
+class FsmState(Base):
+    __tablename__ = "fsm_states"
+
+    storage_key = Column(String(255), primary_key=True)
+    state = Column(String(255), nullable=True)
+    data = Column(JSON, nullable=False)
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    topic = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False)
+
+
+class Booking(Base):
+    __tablename__ = "bookings"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # NULL — преподаватель по умолчанию (записи, созданные до появления реестра преподавателей).
+    teacher_id = Column(Integer, ForeignKey("teachers.id", ondelete="SET NULL"), nullable=True)
+    # Время в UTC без часового пояса.
+    start_at = Column(DateTime, nullable=False)
+    end_at = Column(DateTime, nullable=False)
+    caldav_uid = Column(String(CALDAV_UID_LENGTH), nullable=False)
+    caldav_href = Column(String(CALDAV_HREF_LENGTH), nullable=False)
+    # ETag из ответа на PUT: отмена удаляет событие, только если его не меняли в календаре.
+    caldav_etag = Column(String(CALDAV_ETAG_LENGTH), nullable=True)
+    # Начало вхождения (UTC) для занятий еженедельной серии: у всех вхождений общие UID, адрес и ETag.
+    recurrence_id = Column(DateTime, nullable=True)
+    # Ставка на момент бронирования для отчётов о выручке; NULL у записей до миграции 0009.
+    hour_rate = Column(Integer, nullable=True)
+    cancelled_at = Column(DateTime, nullable=True)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("caldav_uid", "recurrence_id", name="ux_bookings_caldav_uid_recurrence"),
+        # Keyset-пагинация «Моих записей»: WHERE user_id = ? AND start_at >= ? AND (start_at > ? OR id > ?)
+        # ORDER BY start_at, id.
+        Index("ix_bookings_user_start", "user_id", "start_at", "id"),
+        # Планировщик напоминаний: предстоящие записи при запуске и новые записи при догрузке.
+        Index("ix_bookings_start_at", "start_at"),
+        Index("ix_bookings_created_at", "created_at"),
+    )
+
+
+class BookingReminder(Base):
+    __tablename__ = "booking_reminders"
+
+    # Отметка об отправке: первичный ключ не даёт отправить одно напоминание дважды — ни после
+    # перезапуска, ни из нескольких воркеров.
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"), primary_key=True)
+    offset_minutes = Column(Integer, primary_key=True)
+    sent_at = Column(DateTime, nullable=False)
+
+
+@dataclass(frozen=True, slots=True)
+class BookingDTO:
+    id: int
+    start_at: datetime
+    end_at: datetime
+    caldav_uid: str
+    caldav_href: str
+    caldav_etag: str | None = None
+    recurrence_id: datetime | None = None
+    teacher_id: int | None = None
 
 
+@dataclass(frozen=True, slots=True)
 class UserDTO:
-    def __init__(
-        self,
-        id: int,
-        telegram_id: int | None = None,
-        name: str | None = None,
-        surname: str | None = None,
-        language: str | None = None,
-        state: str | None = None,
-        hour_rate: int | None = None,
-        is_banned: bool = False,
-    ):
-        self.id = id
-        self.telegram_id = telegram_id
-        self.name = name
-        self.surname = surname
-        self.language = language
-        self.state = state
-        self.hour_rate = hour_rate
-        self.is_banned = is_banned
\ No newline at end of file
+    id: int
+    telegram_id: int | None = None
+    name: str | None = None
+    surname: str | None = None
+    language: str | None = None
+    state: str | None = None
+    hour_rate: int | None = None
+    is_banned: bool = False
+    teacher_id: int | None = None
@@ -0,0 +1,108 @@
+"""
+Проверка планов горячих запросов через EXPLAIN.
+
+Запуск после миграций (желательно на базе с реалистичным объёмом данных):
+    python -m bots.models.query_plans
+
+Код возврата 1, если хотя бы один запрос читает таблицу или индекс целиком.
+"""
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine
+
+from bots.config.platforms import Platforms
+from bots.models.database import DATABASE_URL
+from bots.services.analytics_service import SELECT_PERIOD_BOOKINGS
+from bots.services.ban_registry import SELECT_CHANGED_USERS
+from bots.services.booking_service import SELECT_BOOKINGS_PAGE, SELECT_USER_BOOKING
+from bots.services.identity_service import SELECT_IDENTITY, SELECT_USER_BY_IDENTITY, UPDATE_IDENTITY_USER
+from bots.services.reminder_scheduler import SELECT_ACTIVE_START, SELECT_CREATED_SINCE
+from bots.services.session_service import SELECT_SESSION
+from bots.services.shared_state import SELECT_FSM_STATE
+from bots.services.user_service import SELECT_USER_BY_ID, SELECT_USER_BY_TELEGRAM_ID
+
+# Типы доступа MySQL, означающие полный просмотр таблицы или индекса.
+FULL_SCAN_TYPES = {"ALL", "index"}
+
+PAST = datetime(2000, 1, 1)
+FUTURE = datetime(2100, 1, 1)
+
+# Те же объекты запросов, что выполняют сервисы, с примерами параметров: план проверяется
+# у настоящего SQL, а не у копии, которая может разойтись с кодом.
+HOT_QUERIES = {
+    "identity_by_platform_user": (
+        SELECT_IDENTITY,
+        {"platform": Platforms.TELEGRAM, "platform_user_id": "explain"},
+    ),
+    "user_by_identity": (
+        SELECT_USER_BY_IDENTITY,
+        {"platform": Platforms.TELEGRAM, "platform_user_id": "explain"},
+    ),
+    "identity_rebind": (
+        UPDATE_IDENTITY_USER,
+        {"new_user_id": 0, "platform": Platforms.TELEGRAM, "platform_user_id": "explain"},
+    ),
+    "user_by_id": (SELECT_USER_BY_ID, {"user_id": 0}),
+    "user_by_telegram_id": (SELECT_USER_BY_TELEGRAM_ID, {"encrypted_id": "explain"}),
+    "changed_users": (SELECT_CHANGED_USERS, {"watermark": FUTURE}),
+    "session_by_user_platform": (SELECT_SESSION, {"user_id": 0, "platform": Platforms.TELEGRAM}),
+    "bookings_page": (SELECT_BOOKINGS_PAGE, {"user_id": 0, "after_start": PAST, "after_id": 0}),
+    "user_booking": (SELECT_USER_BOOKING, {"booking_id": 0, "user_id": 0}),
+    "bookings_created_since": (SELECT_CREATED_SINCE, {"since": FUTURE, "now": PAST}),
+    "active_booking_start": (SELECT_ACTIVE_START, {"booking_id": 0}),
+    "period_bookings": (SELECT_PERIOD_BOOKINGS, {"start": FUTURE, "end": FUTURE}),
+    "fsm_state_by_key": (SELECT_FSM_STATE, {"storage_key": "explain"}),
+}
+
+
+def find_full_scans(connection) -> list[str]:
+    """
+    Выполняет EXPLAIN для каждого горячего запроса, скомпилированного диалектом подключения (MySQL).
+
+    :return: Описания запросов, в плане которых есть полный просмотр.
+    """
+    problems = []
+
+    for name, (statement, parameters) in HOT_QUERIES.items():
+        for row in _explain(connection, statement, parameters).mappings():
+            if row["type"] in FULL_SCAN_TYPES:
+                problems.append(
+                    f"{name}: полный просмотр {row['table']} "
+                    f"(type={row['type']}, key={row['key']}, rows={row['rows']})"
+                )
+
+    return problems
+
+
+def _explain(connection, statement, parameters: dict):
+    compiled = statement.compile(dialect=connection.dialect)
+    driver_parameters = compiled.construct_params(parameters)
+
+    # У pymysql и mysqlclient позиционный paramstyle: значения передаются в порядке плейсхолдеров.
+    if compiled.positional:
+        driver_parameters = tuple(driver_parameters[name] for name in compiled.positiontup)
+
+    return connection.exec_driver_sql(f"EXPLAIN {compiled}", driver_parameters)
+
+
+def main() -> int:
+    engine = create_engine(DATABASE_URL)
+
+    try:
+        with engine.connect() as connection:
+            problems = find_full_scans(connection)
+    finally:
+        engine.dispose()
+
+    for problem in problems:
+        print(f"❌ {problem}")
+
+    if not problems:
+        print(f"✅ Все горячие запросы ({len(HOT_QUERIES)}) используют индексы")
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from bots.config.logging_config import get_logger
+from bots.utils.metrics import HANDLER_DURATION, HANDLER_ERRORS
+from bots.utils.tracing import tracer
+
+logger = get_logger(__name__)
+
+CallbackHandler = Callable[..., Awaitable[Any]]
+PayloadParser = Callable[[str], Any]
+
+
+@dataclass(frozen=True, slots=True)
+class CallbackRoute:
+    """Зарегистрированный обработчик callback_data."""
+    key: str
+    handler: CallbackHandler
+    parser: PayloadParser | None = None
+    state: str | None = None
+
+
+class CallbackDispatcher:
+    """
+    Маршрутизатор callback-запросов по индексу префиксов.
+
+    Вместо цепочки фильтров, которые aiogram проверяет по очереди для каждого запроса,
+    обработчики хранятся в словарях: точные значения callback_data и префиксы вида ``d_``.
+    Поиск обработчика — один-два обращения к словарю, а обработчик получает уже разобранный payload.
+    """
+
+    def __init__(self, separator: str = "_"):
+        self.__separator = separator
+        self.__exact_routes: dict[str, list[CallbackRoute]] = {}
+        self.__prefix_routes: dict[str, list[CallbackRoute]] = {}
+
+    def exact(self, data: str, state=None):
+        """
+        Регистрирует обработчик для точного значения callback_data.
+
+        :param data: Значение callback_data.
+        :param state: Состояние FSM, в котором обработчик доступен (по умолчанию — любое).
+        """
+
+        def decorator(handler: CallbackHandler) -> CallbackHandler:
+            self.__add_route(self.__exact_routes, CallbackRoute(data, handler, None, self.__state_name(state)))
+            return handler
+
+        return decorator
+
+    def prefix(self, prefix: str, parser: PayloadParser, state=None):
+        """
+        Регистрирует обработчик для всех callback_data, начинающихся с префикса.
+
+        :param prefix: Префикс callback_data, заканчивающийся разделителем (например, ``d_``).
+        :param parser: Функция, превращающая callback_data в типизированный payload.
+        :param state: Состояние FSM, в котором обработчик доступен (по умолчанию — любое).
+        """
+        if not prefix.endswith(self.__separator):
+            raise ValueError(f"Префикс {prefix!r} должен заканчиваться на {self.__separator!r}")
+
+        def decorator(handler: CallbackHandler) -> CallbackHandler:
+            self.__add_route(self.__prefix_routes, CallbackRoute(prefix, handler, parser, self.__state_name(state)))
+            return handler
+
+        return decorator
+
+    def candidates(self, data: str) -> list[CallbackRoute]:
+        """
+        Возвращает маршруты, подходящие под callback_data без учёта состояния FSM.
+        """
+        routes = self.__exact_routes.get(data)
+
+        if routes is not None:
+            return routes
+
+        head, separator, _ = data.partition(self.__separator)
+
+        if not separator:
+            return []
+
+        return self.__prefix_routes.get(head + separator, [])
+
+    async def resolve(self, data: str, state) -> tuple[CallbackRoute, Any] | None:
+        """
+        Находит обработчик и разбирает payload.
+
+        :param data: callback_data запроса.
+        :param state: FSMContext пользователя; запрашивается только если маршрут привязан к состоянию.
+        :return: Пара (маршрут, payload) или None, если обработчик не найден.
+        """
+        routes = self.candidates(data)
+
+        if not routes:
+            return None
+
+        current_state = None
+        is_state_loaded = False
+
+        for route in routes:
+            if route.state is not None:
+                if not is_state_loaded:
+                    current_state = await state.get_state() if state is not None else None
+                    is_state_loaded = True
+
+                if route.state != current_state:
+                    continue
+
+            if route.parser is None:
+                return route, None
+
+            try:
+                return route, route.parser(data)
+            except (TypeError, ValueError) as exception:
+                logger.warning("Некорректные callback_data %r: %s", data, exception)
+                return None
+
+        return None
+
+    async def dispatch(self, callback_query, state, **kwargs) -> bool:
+        """
+        Вызывает обработчик для callback-запроса.
+
+        :return: True, если обработчик найден и вызван, иначе False.
+        """
+        resolved = await self.resolve(callback_query.data or "", state)
+
+        if resolved is None:
+            return False
+
+        route, payload = resolved
+        handler_name = route.handler.__name__
+
+        try:
+            with HANDLER_DURATION.time(handler=handler_name, route=route.key), \
+                    tracer.span(f"handler.{handler_name}", route=route.key):
+                await route.handler(callback_query, state=state, payload=payload, **kwargs)
+        except Exception as exception:
+            HANDLER_ERRORS.inc(handler=handler_name, route=route.key, error=type(exception).__name__)
+            raise
+
+        return True
+
+    @staticmethod
+    def __state_name(state) -> str | None:
+        if state is None:
+            return None
+
+        return getattr(state, "state", state)
+
+    @staticmethod
+    def __add_route(routes: dict[str, list[CallbackRoute]], route: CallbackRoute) -> None:
+        routes.setdefault(route.key, []).append(route)
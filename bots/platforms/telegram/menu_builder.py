@@ -1,13 +1,15 @@
-from calendar import monthrange
-from datetime import date, timedelta
+from calendar import monthrange, timegm
+from datetime import date, datetime
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from pytz import utc
 
-from bots.config.availability_days_config import AvailabilityDaysConfig
+from bots.config.availability_days_config import TimeOfDay, Weekday
+from bots.models.models import BookingDTO
+from bots.services.availability_service import FreeSlotMatrix
+from bots.services.teacher_registry import TeacherContext
 from bots.utils.callback_data import CallbackData
 
-availability_config = AvailabilityDaysConfig()
-
 
 class MenuBuilder:
     """
@@ -15,6 +17,22 @@ class MenuBuilder:
     """
     __BOOK_EVENT_TEXT = "Бронировать событие"
     __UPDATE_DATA_TEXT = "Изменить данные"
+    __NEXT_SLOTS_TEXT = "Ближайшие свободные слоты"
+    __MY_BOOKINGS_TEXT = "Мои записи"
+    __CHOOSE_TEACHER_TEXT = "Выбрать преподавателя"
+    __TEACHER_RATE_TEXT = "{name} — {rate} ₽/ч"
+    __FIRST_PAGE_TEXT = "⏮ В начало"
+    __NEXT_PAGE_TEXT = "Дальше ➡️"
+    __CANCEL_BOOKING_SYMBOL = "❌"
+    __WEEKLY_SERIES_TEXT = "🔁 {weeks} нед."
+    __BACK_TO_MENU_TEXT = "В главное меню"
+    __SELECTED_FILTER_SYMBOL = "✅"
+    __TIME_OF_DAY_TEXTS = {
+        TimeOfDay.ANY: "Любое",
+        TimeOfDay.MORNING: "Утро",
+        TimeOfDay.AFTERNOON: "День",
+        TimeOfDay.EVENING: "Вечер",
+    }
     __FINISH_BOOKING_TEXT = "Закончить бронирование на этот день"
     __BACK_BUTTON_TEXT = "⬅️"
     __FORWARD_BUTTON_TEXT = "➡️"
@@ -24,9 +42,8 @@ class MenuBuilder:
     __AVAILABLE_SYMBOL = "🟢"
     __BUSY_SYMBOL = "🔴"
 
-    __START_DAY_HOUR = 10
-    __END_DAY_HOUR = 18
     __PER_ROW_BUTTONS_COUNT = 4
+    __PER_ROW_SLOT_BUTTONS_COUNT = 2
 
     __IN_WEEK_DAYS_COUNT = 7
     __FIRST_MONTH_NUMBER = 1
@@ -35,16 +52,53 @@ class MenuBuilder:
     __IN_BUTTON_SYMBOL_COUNT = 4
 
     @staticmethod
-    def generate_main_menu() -> InlineKeyboardMarkup:
-        """Создаёт главное меню."""
-        return InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text=MenuBuilder.__BOOK_EVENT_TEXT, callback_data=CallbackData.BOOK_EVENT.value)],
-                [InlineKeyboardButton(text=MenuBuilder.__UPDATE_DATA_TEXT,
-                                      callback_data=CallbackData.UPDATE_DATA.value)],
-            ]
+    def generate_main_menu(show_teachers: bool = False) -> InlineKeyboardMarkup:
+        """
+        Создаёт главное меню.
+
+        :param show_teachers: Показывать выбор преподавателя (если преподавателей больше одного).
+        """
+        inline_keyboard = [
+            [InlineKeyboardButton(text=MenuBuilder.__BOOK_EVENT_TEXT, callback_data=CallbackData.BOOK_EVENT.value)],
+            [InlineKeyboardButton(text=MenuBuilder.__NEXT_SLOTS_TEXT, callback_data=CallbackData.next_slots())],
+            [InlineKeyboardButton(text=MenuBuilder.__MY_BOOKINGS_TEXT,
+                                  callback_data=CallbackData.bookings_page())],
+        ]
+
+        if show_teachers:
+            inline_keyboard.append([InlineKeyboardButton(text=MenuBuilder.__CHOOSE_TEACHER_TEXT,
+                                                         callback_data=CallbackData.CHOOSE_TEACHER.value)])
+
+        inline_keyboard.append([InlineKeyboardButton(text=MenuBuilder.__UPDATE_DATA_TEXT,
+                                                     callback_data=CallbackData.UPDATE_DATA.value)])
+
+        return InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+
+    @staticmethod
+    def generate_teachers_keyboard(teachers: list[TeacherContext], selected_id: int | None) -> InlineKeyboardMarkup:
+        """
+        Создаёт клавиатуру выбора преподавателя; текущий выбор отмечен.
+        """
+        inline_keyboard = []
+
+        for teacher in teachers:
+            text = teacher.name
+
+            if teacher.hour_rate:
+                text = MenuBuilder.__TEACHER_RATE_TEXT.format(name=teacher.name, rate=teacher.hour_rate)
+
+            inline_keyboard.append([InlineKeyboardButton(
+                text=MenuBuilder.__mark_selected(text, teacher.id == selected_id),
+                callback_data=CallbackData.teacher(teacher.id),
+            )])
+
+        inline_keyboard.append(
+            [InlineKeyboardButton(text=MenuBuilder.__BACK_TO_MENU_TEXT,
+                                  callback_data=CallbackData.FINISH_BOOKING.value)]
         )
 
+        return InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+
     @staticmethod
     def generate_language_keyboard() -> InlineKeyboardMarkup:
         """Создаёт клавиатуру для выбора языка программирования."""
@@ -64,23 +118,25 @@ class MenuBuilder:
         return InlineKeyboardMarkup(
             inline_keyboard=[
                 [
-                    InlineKeyboardButton(text="✅ Да, сохранить", callback_data="confirm_changes"),
-                    InlineKeyboardButton(text="❌ Нет, изменить", callback_data="reject_changes"),
+                    InlineKeyboardButton(text="✅ Да, сохранить", callback_data=CallbackData.CONFIRM_CHANGES.value),
+                    InlineKeyboardButton(text="❌ Нет, изменить", callback_data=CallbackData.REJECT_CHANGES.value),
                 ]
             ]
         )
 
     @staticmethod
-    def generate_hours_keyboard(events: list[int]) -> InlineKeyboardMarkup:
-        """Создаёт клавиатуру для выбора времени."""
-        hours = range(MenuBuilder.__START_DAY_HOUR, MenuBuilder.__END_DAY_HOUR)
+    def generate_hours_keyboard(matrix: FreeSlotMatrix, selected_date: date) -> InlineKeyboardMarkup:
+        """
+        Создаёт клавиатуру для выбора времени по рабочим часам выбранного дня.
+        Выбранная дата упаковывается в callback_data каждой кнопки.
+        """
         buttons = []
 
-        for hour in hours:
+        for hour in matrix.working_hours(selected_date):
             time_str = f"{hour}:00"
-            is_available = hour not in events
+            is_available = matrix.is_slot_free(selected_date, hour)
             button_text = f"{MenuBuilder.__AVAILABLE_SYMBOL} {time_str}" if is_available else f"{MenuBuilder.__BUSY_SYMBOL} {time_str}"
-            callback_data = CallbackData.time(hour) if is_available else CallbackData.IGNORE.value
+            callback_data = CallbackData.time(selected_date, hour) if is_available else CallbackData.IGNORE.value
             buttons.append(InlineKeyboardButton(text=button_text, callback_data=callback_data))
 
         inline_keyboard = [buttons[i:i + MenuBuilder.__PER_ROW_BUTTONS_COUNT] for i in
@@ -94,13 +150,123 @@ class MenuBuilder:
         return InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
 
     @staticmethod
-    def generate_calendar_keyboard(year: int, month: int) -> InlineKeyboardMarkup:
+    def generate_next_slots_keyboard(
+        slots: list[datetime],
+        weekday: Weekday | None,
+        time_of_day: TimeOfDay,
+    ) -> InlineKeyboardMarkup:
+        """
+        Создаёт клавиатуру ближайших свободных слотов: одно нажатие бронирует слот.
+        Ниже — фильтры по времени суток и дню недели.
+        """
+        weekday_value = weekday.value if weekday else 0
+        buttons = [
+            InlineKeyboardButton(
+                text=f"{MenuBuilder.__WEEK_DAYS[slot.weekday()]} {slot:%d.%m} {slot.hour}:00",
+                callback_data=CallbackData.slot(slot.date(), slot.hour),
+            )
+            for slot in slots
+        ]
+
+        inline_keyboard = [buttons[i:i + MenuBuilder.__PER_ROW_SLOT_BUTTONS_COUNT] for i in
+                           range(0, len(buttons), MenuBuilder.__PER_ROW_SLOT_BUTTONS_COUNT)]
+
+        inline_keyboard.append([
+            InlineKeyboardButton(
+                text=MenuBuilder.__mark_selected(text, option == time_of_day),
+                callback_data=CallbackData.next_slots(weekday_value, option.value),
+            )
+            for option, text in MenuBuilder.__TIME_OF_DAY_TEXTS.items()
+        ])
+        inline_keyboard.append([
+            InlineKeyboardButton(
+                text=MenuBuilder.__mark_selected(text, index + 1 == weekday_value),
+                callback_data=CallbackData.next_slots(0 if index + 1 == weekday_value else index + 1,
+                                                      time_of_day.value),
+            )
+            for index, text in enumerate(MenuBuilder.__WEEK_DAYS)
+        ])
+        inline_keyboard.append(
+            [InlineKeyboardButton(text=MenuBuilder.__BACK_TO_MENU_TEXT,
+                                  callback_data=CallbackData.FINISH_BOOKING.value)]
+        )
+
+        return InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+
+    @staticmethod
+    def generate_weekly_offer_keyboard(first_date: date, hour: int, weeks_options: tuple[int, ...]) -> InlineKeyboardMarkup:
+        """
+        Создаёт предложение повторять занятие еженедельно: серия начинается с ``first_date``.
+        """
+        return InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text=MenuBuilder.__WEEKLY_SERIES_TEXT.format(weeks=weeks),
+                        callback_data=CallbackData.weekly(first_date, hour, weeks),
+                    )
+                    for weeks in weeks_options
+                ]
+            ]
+        )
+
+    @staticmethod
+    def generate_bookings_keyboard(
+        bookings: list[BookingDTO],
+        has_next: bool,
+        is_first_page: bool,
+        local_tz,
+    ) -> InlineKeyboardMarkup:
+        """
+        Создаёт клавиатуру «Моих записей»: кнопка отмены для каждой записи и навигация,
+        где курсор следующей страницы — последняя показанная запись.
+        """
+        buttons = []
+
+        for booking in bookings:
+            start = utc.localize(booking.start_at).astimezone(local_tz)
+            buttons.append(InlineKeyboardButton(
+                text=f"{MenuBuilder.__CANCEL_BOOKING_SYMBOL} {start:%d.%m %H:%M}",
+                callback_data=CallbackData.cancel_booking(booking.id),
+            ))
+
+        inline_keyboard = [buttons[i:i + MenuBuilder.__PER_ROW_SLOT_BUTTONS_COUNT] for i in
+                           range(0, len(buttons), MenuBuilder.__PER_ROW_SLOT_BUTTONS_COUNT)]
+        navigation = []
+
+        if not is_first_page:
+            navigation.append(InlineKeyboardButton(text=MenuBuilder.__FIRST_PAGE_TEXT,
+                                                   callback_data=CallbackData.bookings_page()))
+
+        if has_next and bookings:
+            last = bookings[-1]
+            navigation.append(InlineKeyboardButton(
+                text=MenuBuilder.__NEXT_PAGE_TEXT,
+                callback_data=CallbackData.bookings_page(timegm(last.start_at.timetuple()), last.id),
+            ))
+
+        if navigation:
+            inline_keyboard.append(navigation)
+
+        inline_keyboard.append(
+            [InlineKeyboardButton(text=MenuBuilder.__BACK_TO_MENU_TEXT,
+                                  callback_data=CallbackData.FINISH_BOOKING.value)]
+        )
+
+        return InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+
+    @staticmethod
+    def __mark_selected(text: str, is_selected: bool) -> str:
+        return f"{MenuBuilder.__SELECTED_FILTER_SYMBOL}{text}" if is_selected else text
+
+    @staticmethod
+    def generate_calendar_keyboard(year: int, month: int, matrix: FreeSlotMatrix) -> InlineKeyboardMarkup:
         """
-        Создаёт календарь для выбора даты с ограничением: текущая дата + 1 месяц.
-        Недоступные даты отображаются с красным крестом (❌).
+        Создаёт календарь для выбора даты в пределах окна бронирования.
+        Недоступные и полностью занятые даты отображаются с красным крестом (❌).
         """
-        start_available_date = date.today() + timedelta(days=1)
-        end_available_date = start_available_date + timedelta(days=30)  # Ограничение в месяц вперёд
+        start_available_date = matrix.start_date
+        end_available_date = matrix.end_date
 
         inline_keyboard = [[InlineKeyboardButton(
             text=day.center(MenuBuilder.__IN_BUTTON_SYMBOL_COUNT),
@@ -115,8 +281,7 @@ class MenuBuilder:
         for day in range(1, days_in_month + 1):
             current_date = date(year, month, day)
 
-            if start_available_date <= current_date <= end_available_date and not availability_config.is_date_blocked(
-                    current_date):
+            if matrix.is_date_available(current_date):
                 callback_data = CallbackData.date(year, month, day)
                 buttons.append(InlineKeyboardButton(
                     text=f"{day:2}".center(MenuBuilder.__IN_BUTTON_SYMBOL_COUNT),
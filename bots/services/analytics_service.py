@@ -0,0 +1,258 @@
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+import numpy as np
+from pytz import utc
+from sqlalchemy import bindparam, func, select
+
+from bots.config.analytics_config import ANALYTICS_CACHE_TTL_SECONDS
+from bots.config.availability_days_config import AvailabilityDaysConfig
+from bots.config.logging_config import get_logger
+from bots.models.database import Database
+from bots.models.models import Booking, Teacher, User
+
+logger = get_logger(__name__)
+
+BOOKINGS = Booking.__table__
+USERS = User.__table__
+TEACHERS = Teacher.__table__
+
+# Ставка записи; у записей до миграции 0009 — текущая ставка преподавателя или ученика.
+SELECT_PERIOD_BOOKINGS = (
+    select(
+        BOOKINGS.c.start_at,
+        BOOKINGS.c.end_at,
+        func.coalesce(BOOKINGS.c.hour_rate, TEACHERS.c.hour_rate, USERS.c.hour_rate).label("hour_rate"),
+        USERS.c.language,
+    )
+    .select_from(
+        BOOKINGS
+        .join(USERS, USERS.c.id == BOOKINGS.c.user_id)
+        .outerjoin(TEACHERS, TEACHERS.c.id == BOOKINGS.c.teacher_id)
+    )
+    .where(
+        BOOKINGS.c.start_at >= bindparam("start"),
+        BOOKINGS.c.start_at < bindparam("end"),
+        BOOKINGS.c.cancelled_at.is_(None),
+    )
+)
+
+HOURS = np.arange(24)
+UNKNOWN_LANGUAGE = "—"
+
+
+@dataclass(slots=True)
+class PeriodStats:
+    """
+    Агрегаты за период. Матрицы 7×24 — часы занятий и рабочие часы по дню недели (Пн = 0) и часу начала.
+    """
+    lessons: int = 0
+    revenue: float = 0.0
+    booked_hours: np.ndarray = field(default_factory=lambda: np.zeros((7, 24)))
+    capacity_hours: np.ndarray = field(default_factory=lambda: np.zeros((7, 24)))
+    languages: dict[str, tuple[int, float]] = field(default_factory=dict)
+
+    def __add__(self, other: "PeriodStats") -> "PeriodStats":
+        languages = dict(self.languages)
+
+        for language, (lessons, revenue) in other.languages.items():
+            current_lessons, current_revenue = languages.get(language, (0, 0.0))
+            languages[language] = (current_lessons + lessons, current_revenue + revenue)
+
+        return PeriodStats(
+            lessons=self.lessons + other.lessons,
+            revenue=self.revenue + other.revenue,
+            booked_hours=self.booked_hours + other.booked_hours,
+            capacity_hours=self.capacity_hours + other.capacity_hours,
+            languages=languages,
+        )
+
+    @property
+    def utilization(self) -> float:
+        capacity = self.capacity_hours.sum()
+        return float(self.booked_hours.sum() / capacity) if capacity else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class AnalyticsReport:
+    """Итог за период и выручка по месяцам в хронологическом порядке."""
+    start: date
+    end: date
+    total: PeriodStats
+    monthly_revenue: list[tuple[date, float]]
+
+
+def to_local(starts_utc: np.ndarray, local_tz) -> np.ndarray:
+    """
+    Переводит массив datetime64 (UTC) в местное время. Смещение пояса вычисляется по одному разу
+    на каждый уникальный час, а не на каждую запись.
+    """
+    if not len(starts_utc):
+        return starts_utc
+
+    hours, inverse = np.unique(starts_utc.astype("datetime64[h]"), return_inverse=True)
+    offsets = np.array(
+        [int(utc.localize(hour).astimezone(local_tz).utcoffset().total_seconds()) for hour in hours.astype(datetime)],
+        dtype="timedelta64[s]",
+    )
+
+    return starts_utc + offsets[inverse]
+
+
+def aggregate_period(
+    starts_local: np.ndarray,
+    durations_hours: np.ndarray,
+    rates: np.ndarray,
+    language_codes: np.ndarray,
+    language_names: list[str],
+) -> PeriodStats:
+    """
+    Агрегирует записи периода векторными операциями NumPy.
+
+    :param starts_local: Начала занятий в местном времени (datetime64[s]).
+    :param durations_hours: Длительности в часах.
+    :param rates: Ставки за час.
+    :param language_codes: Индексы языков в ``language_names``.
+    """
+    days = starts_local.astype("datetime64[D]")
+    # 1970-01-01 — четверг: сдвиг на 3 даёт Пн = 0.
+    weekdays = (days.view("int64") + 3) % 7
+    hours = (starts_local - days).astype("timedelta64[h]").astype("int64")
+    revenue = rates * durations_hours
+
+    booked_hours = np.bincount(weekdays * 24 + hours, weights=durations_hours, minlength=7 * 24).reshape(7, 24)
+    language_lessons = np.bincount(language_codes, minlength=len(language_names))
+    language_revenue = np.bincount(language_codes, weights=revenue, minlength=len(language_names))
+
+    return PeriodStats(
+        lessons=len(starts_local),
+        revenue=float(revenue.sum()),
+        booked_hours=booked_hours,
+        languages={
+            str(language_names[code]): (int(language_lessons[code]), float(language_revenue[code]))
+            for code in np.flatnonzero(language_lessons)
+        },
+    )
+
+
+def capacity_hours(configs: list[AvailabilityDaysConfig], start: date, end: date) -> np.ndarray:
+    """
+    Рабочие часы всех преподавателей за [start, end) в виде матрицы 7×24 по дню недели и часу.
+    """
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D"))
+    weekdays = (days.view("int64") + 3) % 7
+    capacity = np.zeros((7, 24))
+
+    for config in configs:
+        masks = np.array([config.get_working_mask(day) for day in days.astype(date)], dtype=np.int64)
+        np.add.at(capacity, weekdays, (masks[:, None] >> HOURS) & 1)
+
+    return capacity
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+class AnalyticsService:
+    """
+    Загрузка, выручка и разбивка по языкам по локальной истории бронирований (без запросов к CalDAV).
+
+    Агрегаты считаются и кэшируются помесячно: завершённые месяцы не меняются (записывать и
+    отменять можно только будущие занятия) и хранятся бессрочно, текущий и будущие — с TTL.
+    Отчёт за год складывает не более 12 готовых агрегатов.
+    """
+
+    def __init__(self, database: Database, configs: list[AvailabilityDaysConfig], local_tz):
+        self.__database = database
+        self.__configs = configs
+        self.__local_tz = local_tz
+        self.__cache: dict[date, tuple[PeriodStats, float | None]] = {}
+
+    async def get_report(self, start: date, end: date) -> AnalyticsReport:
+        """
+        Отчёт за месяцы, пересекающие [start, end), в местном часовом поясе.
+        """
+        months = []
+        month = _month_start(start)
+
+        while month < end:
+            months.append(month)
+            month = _next_month(month)
+
+        missing = [month for month in months if not self.__is_cached(month)]
+
+        if missing:
+            await self.__load(missing[0], _next_month(missing[-1]), missing)
+
+        stats = [self.__cache[month][0] for month in months]
+        total = sum(stats, PeriodStats())
+
+        return AnalyticsReport(months[0], _next_month(months[-1]), total,
+                               [(month, month_stats.revenue) for month, month_stats in zip(months, stats)])
+
+    def __is_cached(self, month: date) -> bool:
+        cached = self.__cache.get(month)
+
+        if cached is None:
+            return False
+
+        _, expires_at = cached
+        return expires_at is None or time.monotonic() < expires_at
+
+    async def __load(self, start: date, end: date, months: list[date]) -> None:
+        """
+        Читает записи за [start, end) одним запросом и агрегирует каждый из ``months``.
+        """
+        parameters = {"start": self.__to_utc_naive(start), "end": self.__to_utc_naive(end)}
+
+        async def query():
+            session = await self.__database.get_read_session()
+
+            try:
+                return session.execute(SELECT_PERIOD_BOOKINGS, parameters).all()
+            finally:
+                await self.__database.close_session()
+
+        rows = await self.__database.execute_with_retry(query) or []
+        started_at = time.perf_counter()
+
+        if rows:
+            start_column, end_column, rate_column, language_column = zip(*rows)
+        else:
+            start_column = end_column = rate_column = language_column = ()
+
+        starts_utc = np.array(start_column, dtype="datetime64[s]")
+        durations_hours = (np.array(end_column, dtype="datetime64[s]") - starts_utc).astype("float64") / 3600
+        rates = np.array(rate_column, dtype="float64")
+        languages = np.array(language_column, dtype=object)
+        languages[np.equal(languages, None)] = UNKNOWN_LANGUAGE
+        language_names, language_codes = np.unique(languages.astype(str), return_inverse=True)
+        starts_local = to_local(starts_utc, self.__local_tz)
+        row_months = starts_local.astype("datetime64[M]")
+        today = datetime.now(self.__local_tz).date()
+
+        for month in months:
+            selected = row_months == np.datetime64(month, "M")
+            stats = aggregate_period(
+                starts_local[selected],
+                durations_hours[selected],
+                rates[selected],
+                language_codes[selected],
+                language_names.tolist(),
+            )
+            stats.capacity_hours = capacity_hours(self.__configs, month, _next_month(month))
+            is_closed = _next_month(month) <= today
+            self.__cache[month] = (stats, None if is_closed else time.monotonic() + ANALYTICS_CACHE_TTL_SECONDS)
+
+        logger.info("Аналитика за %s - %s: записей %s, месяцев %s, расчёт %.1f мс",
+                    start, end, len(rows), len(months), (time.perf_counter() - started_at) * 1000)
+
+    def __to_utc_naive(self, value: date) -> datetime:
+        local_midnight = self.__local_tz.localize(datetime.combine(value, datetime.min.time()))
+        return local_midnight.astimezone(utc).replace(tzinfo=None)
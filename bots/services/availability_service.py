@@ -0,0 +1,283 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+from pytz import timezone
+
+from bots.config.availability_days_config import (AvailabilityDaysConfig,
+                                                  TimeOfDay, Weekday)
+from bots.config.caldav_config import CALDAV_READ_DEADLINE_SECONDS
+from bots.config.logging_config import get_logger, get_sampled_logger
+from bots.services.cal_dav_service import CalDavService, CalDavUnavailableError
+
+logger = get_logger(__name__)
+sampled_logger = get_sampled_logger(__name__)
+
+
+class FreeSlotMatrix:
+    """
+    Матрица свободных часов на всё окно бронирования.
+
+    Каждый день хранится как битовая маска: бит N установлен, если час N (местное время)
+    рабочий и свободен. Занятые интервалы вычитаются из масок побитовыми операциями.
+    """
+
+    def __init__(self, start_date: date, working_masks: list[int]):
+        self.start_date = start_date
+        self.end_date = start_date + timedelta(days=len(working_masks) - 1)
+        self.__working_masks = working_masks
+        self.__free_masks = list(working_masks)
+        # Матрица построена по последним известным данным, а CalDAV сейчас недоступен.
+        self.is_stale = False
+
+    @classmethod
+    def build(
+        cls,
+        config: AvailabilityDaysConfig,
+        start_date: date,
+        busy_intervals: list[tuple[datetime, datetime]],
+    ) -> "FreeSlotMatrix":
+        """
+        Строит матрицу за один проход по занятым интервалам.
+
+        :param config: Настройки доступности (рабочие часы, перерывы, блокировки, горизонт).
+        :param start_date: Первый день окна бронирования.
+        :param busy_intervals: Занятые интервалы в местном часовом поясе.
+        """
+        working_masks = [
+            config.get_working_mask(start_date + timedelta(days=offset))
+            for offset in range(config.horizon_days + 1)
+        ]
+        matrix = cls(start_date, working_masks)
+
+        for start, end in busy_intervals:
+            matrix.mark_busy(start, end)
+
+        return matrix
+
+    def mark_busy(self, start: datetime, end: datetime) -> None:
+        """
+        Вычитает занятый интервал из матрицы.
+
+        :param start: Начало интервала (местное время).
+        :param end: Конец интервала (местное время).
+        """
+        for day_index, busy_mask in self.__interval_masks(start, end):
+            self.__free_masks[day_index] &= ~busy_mask
+
+    def mark_free(self, start: datetime, end: datetime) -> None:
+        """
+        Возвращает освободившийся интервал в матрицу в пределах рабочих часов.
+
+        :param start: Начало интервала (местное время).
+        :param end: Конец интервала (местное время).
+        """
+        for day_index, freed_mask in self.__interval_masks(start, end):
+            self.__free_masks[day_index] |= freed_mask & self.__working_masks[day_index]
+
+    def __interval_masks(self, start: datetime, end: datetime):
+        """
+        Раскладывает интервал по дням окна: пары (индекс дня, маска затронутых часов).
+        """
+        current_day = max(start.date(), self.start_date)
+        last_day = min(end.date(), self.end_date)
+
+        while current_day <= last_day:
+            first_hour = start.hour if current_day == start.date() else 0
+
+            if current_day == end.date():
+                last_hour = end.hour + (1 if (end.minute or end.second) else 0)
+            else:
+                last_hour = 24
+
+            if last_hour > first_hour:
+                yield (current_day - self.start_date).days, ((1 << last_hour) - 1) ^ ((1 << first_hour) - 1)
+
+            current_day += timedelta(days=1)
+
+    def is_date_available(self, target_date: date) -> bool:
+        """
+        Дата входит в окно бронирования и на неё остался хотя бы один свободный час.
+        """
+        return self.__free_mask(target_date) != 0
+
+    def is_slot_free(self, target_date: date, hour: int) -> bool:
+        return bool(self.__free_mask(target_date) >> hour & 1)
+
+    def working_hours(self, target_date: date) -> list[int]:
+        return self.__hours(self.__working_mask(target_date))
+
+    def free_hours(self, target_date: date) -> list[int]:
+        return self.__hours(self.__free_mask(target_date))
+
+    def busy_hours(self, target_date: date) -> set[int]:
+        return set(self.__hours(self.__working_mask(target_date) & ~self.__free_mask(target_date)))
+
+    def find_free_slots(
+        self,
+        count: int,
+        weekday: Weekday | None = None,
+        time_of_day: TimeOfDay = TimeOfDay.ANY,
+    ) -> list[tuple[date, int]]:
+        """
+        Ищет ближайшие свободные слоты по всему окну бронирования.
+
+        :param count: Максимальное количество слотов.
+        :param weekday: Только указанный день недели (None — любой).
+        :param time_of_day: Только указанное время суток.
+        :return: Пары (дата, час) в хронологическом порядке.
+        """
+        slots = []
+
+        for offset, free_mask in enumerate(self.__free_masks):
+            current_date = self.start_date + timedelta(days=offset)
+            mask = free_mask & time_of_day.mask
+
+            if not mask or (weekday is not None and current_date.isoweekday() != weekday.value):
+                continue
+
+            for hour in self.__hours(mask):
+                slots.append((current_date, hour))
+
+                if len(slots) >= count:
+                    return slots
+
+        return slots
+
+    def __free_mask(self, target_date: date) -> int:
+        if not self.start_date <= target_date <= self.end_date:
+            return 0
+
+        return self.__free_masks[(target_date - self.start_date).days]
+
+    def __working_mask(self, target_date: date) -> int:
+        if not self.start_date <= target_date <= self.end_date:
+            return 0
+
+        return self.__working_masks[(target_date - self.start_date).days]
+
+    @staticmethod
+    def __hours(mask: int) -> list[int]:
+        return [hour for hour in range(24) if mask >> hour & 1]
+
+
+class AvailabilityService:
+    """
+    Единый источник доступности: рабочие часы, перерывы, блокировки и занятость из CalDAV.
+
+    Занятость за всё окно загружается одним запросом и кэшируется; клавиатуры и проверки
+    бронирования читают готовую матрицу свободных часов. Если CalDAV недоступен,
+    продолжает отдавать последнюю построенную матрицу с пометкой ``is_stale``.
+    """
+    INVALIDATION_TOPIC = "availability"
+
+    def __init__(self, cal_dav_service: CalDavService, config: AvailabilityDaysConfig, cache_ttl_seconds: float = 60.0):
+        self.__cal_dav_service = cal_dav_service
+        self.__config = config
+        self.__cache_ttl_seconds = cache_ttl_seconds
+        self.__local_tz = timezone(config.timezone)
+        self.__matrix: FreeSlotMatrix | None = None
+        self.__loaded_at = 0.0
+        self.__lock = asyncio.Lock()
+
+    @property
+    def local_tz(self):
+        return self.__local_tz
+
+    async def get_matrix(self) -> FreeSlotMatrix:
+        """
+        Возвращает актуальную матрицу, перестраивая её при устаревании кэша или смене дня.
+        Одновременные запросы ждут одного обновления вместо параллельных запросов к CalDAV.
+
+        :raises CalDavUnavailableError: CalDAV недоступен и ранее построенной матрицы нет.
+        """
+        if self.__is_fresh():
+            return self.__matrix
+
+        async with self.__lock:
+            if not self.__is_fresh():
+                await self.__refresh()
+
+        return self.__matrix
+
+    async def find_next_free_slots(
+        self,
+        count: int,
+        weekday: Weekday | None = None,
+        time_of_day: TimeOfDay = TimeOfDay.ANY,
+    ) -> list[datetime]:
+        """
+        Возвращает ближайшие свободные слоты по всему окну бронирования.
+        Используется та же матрица, что и для клавиатур, поэтому поиск не делает
+        отдельных запросов к CalDAV на каждую дату.
+
+        :param count: Максимальное количество слотов.
+        :param weekday: Только указанный день недели (None — любой).
+        :param time_of_day: Только указанное время суток.
+        :return: Начала слотов в местном часовом поясе.
+        """
+        matrix = await self.get_matrix()
+
+        return [
+            self.__local_tz.localize(datetime.combine(slot_date, datetime.min.time()).replace(hour=hour))
+            for slot_date, hour in matrix.find_free_slots(count, weekday, time_of_day)
+        ]
+
+    def mark_busy(self, start: datetime, end: datetime) -> None:
+        """
+        Сразу отражает новое бронирование в матрице, не дожидаясь перезагрузки из CalDAV.
+        """
+        if self.__matrix is not None:
+            self.__matrix.mark_busy(start.astimezone(self.__local_tz), end.astimezone(self.__local_tz))
+
+    def mark_free(self, start: datetime, end: datetime) -> None:
+        """
+        Сразу возвращает отменённый слот в матрицу. Если час занят чем-то ещё, это исправит
+        следующая загрузка из CalDAV, а book_slot всё равно проверяет пересечения на сервере.
+        """
+        if self.__matrix is not None:
+            self.__matrix.mark_free(start.astimezone(self.__local_tz), end.astimezone(self.__local_tz))
+
+    def invalidate(self) -> None:
+        self.__loaded_at = 0.0
+
+    def __is_fresh(self) -> bool:
+        return (
+            self.__matrix is not None
+            and (self.__matrix.start_date == self.__window_start() or self.__matrix.is_stale)
+            and time.monotonic() - self.__loaded_at < self.__cache_ttl_seconds
+        )
+
+    def __window_start(self) -> date:
+        return datetime.now(self.__local_tz).date() + timedelta(days=1)
+
+    async def __refresh(self) -> None:
+        start_date = self.__window_start()
+        start_datetime = self.__local_tz.localize(datetime.combine(start_date, datetime.min.time()))
+        end_datetime = self.__local_tz.localize(
+            datetime.combine(start_date + timedelta(days=self.__config.horizon_days + 1), datetime.min.time())
+        )
+
+        try:
+            busy_intervals = await asyncio.wait_for(
+                asyncio.to_thread(
+                    self.__cal_dav_service.get_busy_intervals, start_datetime, end_datetime, self.__local_tz
+                ),
+                CALDAV_READ_DEADLINE_SECONDS,
+            )
+        except (CalDavUnavailableError, asyncio.TimeoutError) as exception:
+            if self.__matrix is None:
+                raise CalDavUnavailableError("Нет данных о занятости: CalDAV недоступен") from exception
+
+            # Следующая попытка — после TTL; пока отдаём последнюю известную занятость.
+            self.__matrix.is_stale = True
+            self.__loaded_at = time.monotonic()
+            logger.warning("CalDAV недоступен, отдаём устаревшую матрицу от %s: %s",
+                           self.__matrix.start_date, exception)
+            return
+
+        self.__matrix = FreeSlotMatrix.build(self.__config, start_date, busy_intervals)
+        self.__loaded_at = time.monotonic()
+
+        sampled_logger.info("Матрица свободных слотов обновлена: %s - %s, занятых интервалов: %s",
+                            start_date, self.__matrix.end_date, len(busy_intervals))
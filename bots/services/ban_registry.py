@@ -0,0 +1,152 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import bindparam, func, select
+
+from bots.config.logging_config import get_logger
+from bots.config.platforms import Platforms
+from bots.models.database import Database
+from bots.models.models import User, UserIdentity
+from bots.utils.cryptographer import decrypt_platform_user_id
+
+logger = get_logger(__name__)
+
+USERS = User.__table__
+IDENTITIES = UserIdentity.__table__
+
+BAN_COLUMNS = (
+    USERS.c.id,
+    USERS.c.is_banned,
+    USERS.c.telegram_id,
+    USERS.c.updated_at,
+    IDENTITIES.c.platform,
+    IDENTITIES.c.platform_user_id,
+)
+BAN_SOURCE = USERS.outerjoin(IDENTITIES, IDENTITIES.c.user_id == USERS.c.id)
+
+SELECT_DATABASE_NOW = select(func.now())
+SELECT_BANNED_USERS = select(*BAN_COLUMNS).select_from(BAN_SOURCE).where(USERS.c.is_banned.is_(True))
+# Нестрогое сравнение: строки, изменённые в ту же секунду, что и прошлый водяной знак, не теряются.
+SELECT_CHANGED_USERS = (
+    select(*BAN_COLUMNS)
+    .select_from(BAN_SOURCE)
+    .where(USERS.c.updated_at >= bindparam("watermark"))
+)
+
+
+class BanRegistry:
+    """
+    Реестр заблокированных пользователей в памяти.
+
+    При старте загружает все баны, затем раз в ``refresh_interval`` секунд подтягивает
+    строки users, изменённые после водяного знака ``updated_at``. Проверка бана —
+    поиск в множестве без обращения к БД.
+    """
+
+    INVALIDATION_TOPIC = "bans"
+
+    def __init__(self, database: Database, refresh_interval: float = 30.0):
+        self.__database = database
+        self.__refresh_interval = refresh_interval
+        self.__banned: set[tuple[str, int]] = set()
+        self.__identities_by_user: dict[int, set[tuple[str, int]]] = {}
+        self.__watermark: datetime | None = None
+        self.__refresh_lock = asyncio.Lock()
+        self.__task: asyncio.Task | None = None
+
+    def is_banned(self, platform: str, platform_user_id: int) -> bool:
+        return (platform, platform_user_id) in self.__banned
+
+    async def start(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as exception:
+            logger.error("Не удалось загрузить реестр банов: %s", exception)
+
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__refresh_loop())
+
+    async def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+    def request_refresh(self) -> None:
+        """
+        Внеочередное обновление (например, после /ban или инвалидации от другого процесса).
+        """
+        asyncio.get_running_loop().create_task(self.refresh())
+
+    async def refresh(self) -> None:
+        async with self.__refresh_lock:
+            if self.__watermark is None:
+                statement, parameters = SELECT_BANNED_USERS, {}
+            else:
+                statement, parameters = SELECT_CHANGED_USERS, {"watermark": self.__watermark}
+
+            async def query():
+                session = await self.__database.get_session()
+
+                try:
+                    # Время БД до чтения: дальше отслеживаем изменения с начала первой загрузки.
+                    loaded_at = session.execute(SELECT_DATABASE_NOW).scalar()
+                    return session.execute(statement, parameters).all(), loaded_at
+                finally:
+                    await self.__database.close_session()
+
+            result = await self.__database.execute_with_retry(query)
+
+            if result is None:
+                return
+
+            rows, loaded_at = result
+
+            if self.__watermark is None:
+                self.__watermark = loaded_at
+
+            self.__apply(rows)
+
+    def __apply(self, rows) -> None:
+        changes: dict[int, tuple[bool, set[tuple[str, int]]]] = {}
+
+        for row in rows:
+            is_banned, identities = changes.setdefault(row.id, (bool(row.is_banned), set()))
+
+            if row.telegram_id:
+                self.__add_identity(identities, Platforms.TELEGRAM, row.telegram_id)
+
+            if row.platform and row.platform_user_id:
+                self.__add_identity(identities, row.platform, row.platform_user_id)
+
+            if row.updated_at > self.__watermark:
+                self.__watermark = row.updated_at
+
+        for user_id, (is_banned, identities) in changes.items():
+            self.__banned.difference_update(self.__identities_by_user.pop(user_id, ()))
+
+            if is_banned:
+                self.__identities_by_user[user_id] = identities
+                self.__banned.update(identities)
+
+        if changes:
+            logger.info("Реестр банов обновлён: изменено пользователей %s, заблокировано идентичностей %s",
+                        len(changes), len(self.__banned))
+
+    @staticmethod
+    def __add_identity(identities: set[tuple[str, int]], platform: str, encrypted_id: str) -> None:
+        try:
+            identities.add((platform, decrypt_platform_user_id(encrypted_id)))
+        except ValueError as exception:
+            logger.warning("Не удалось расшифровать идентичность %s: %s", platform, exception)
+
+    async def __refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.__refresh_interval)
+
+            if not self.__database.is_healthy:
+                continue
+
+            try:
+                await self.refresh()
+            except Exception as exception:
+                logger.warning("Не удалось обновить реестр банов: %s", exception)
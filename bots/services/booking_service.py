@@ -0,0 +1,204 @@
+from datetime import datetime, timedelta
+
+from pytz import utc
+from sqlalchemy import bindparam, insert, or_, select, update
+
+from bots.config.logging_config import get_logger
+from bots.models.database import Database
+from bots.models.models import Booking, BookingDTO
+from bots.services.cal_dav_service import BookedEvent, WeeklyBooking
+
+logger = get_logger(__name__)
+
+BOOKINGS = Booking.__table__
+BOOKING_COLUMNS = (BOOKINGS.c.id, BOOKINGS.c.start_at, BOOKINGS.c.end_at, BOOKINGS.c.caldav_uid,
+                   BOOKINGS.c.caldav_href, BOOKINGS.c.caldav_etag, BOOKINGS.c.recurrence_id, BOOKINGS.c.teacher_id)
+IS_ACTIVE = BOOKINGS.c.cancelled_at.is_(None)
+
+BOOKINGS_PAGE_SIZE = 5
+
+INSERT_BOOKING = insert(BOOKINGS)
+AFTER_START = bindparam("after_start")
+# Keyset-пагинация: следующая страница начинается строго после последней показанной записи.
+# Сравнение кортежей (start_at, id) > (...) MySQL не всегда превращает в диапазон по индексу,
+# поэтому условие развёрнуто, а ведущее start_at >= задаёт диапазон по (user_id, start_at, id).
+# Лишняя строка в LIMIT показывает, есть ли следующая страница.
+SELECT_BOOKINGS_PAGE = (
+    select(*BOOKING_COLUMNS)
+    .where(
+        BOOKINGS.c.user_id == bindparam("user_id"),
+        BOOKINGS.c.start_at >= AFTER_START,
+        or_(BOOKINGS.c.start_at > AFTER_START, BOOKINGS.c.id > bindparam("after_id")),
+        IS_ACTIVE,
+    )
+    .order_by(BOOKINGS.c.start_at, BOOKINGS.c.id)
+    .limit(BOOKINGS_PAGE_SIZE + 1)
+)
+# Запись ищется по первичному ключу; user_id не даёт отменить чужое бронирование.
+SELECT_USER_BOOKING = select(*BOOKING_COLUMNS).where(
+    BOOKINGS.c.id == bindparam("booking_id"),
+    BOOKINGS.c.user_id == bindparam("user_id"),
+    IS_ACTIVE,
+)
+UPDATE_SERIES_ETAG = (
+    update(BOOKINGS)
+    .where(BOOKINGS.c.caldav_uid == bindparam("caldav_uid"))
+    .values(caldav_etag=bindparam("caldav_etag"))
+)
+CANCEL_BOOKING = (
+    update(BOOKINGS)
+    .where(BOOKINGS.c.id == bindparam("booking_id"), IS_ACTIVE)
+    .values(cancelled_at=bindparam("cancelled_at"))
+)
+
+
+def _to_utc_naive(value: datetime) -> datetime:
+    return value.astimezone(utc).replace(tzinfo=None)
+
+
+class BookingService:
+    """
+    Локальная история бронирований: запись после успешного book_slot и постраничный просмотр
+    по индексу (user_id, start_at, id) без обращения к CalDAV.
+    """
+
+    def __init__(self, database: Database):
+        self.__database = database
+
+    async def record_booking(
+        self,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+        event: BookedEvent,
+        teacher_id: int | None = None,
+        hour_rate: int | None = None,
+    ) -> None:
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                session.execute(
+                    INSERT_BOOKING,
+                    {
+                        "user_id": user_id,
+                        "teacher_id": teacher_id,
+                        "hour_rate": hour_rate,
+                        "start_at": _to_utc_naive(start),
+                        "end_at": _to_utc_naive(end),
+                        "caldav_uid": event.uid,
+                        "caldav_href": event.href,
+                        "caldav_etag": event.etag,
+                    },
+                )
+                session.commit()
+            finally:
+                await self.__database.close_session()
+
+        await self.__database.execute_with_retry(query)
+
+    async def record_series(
+        self,
+        user_id: int,
+        series: WeeklyBooking,
+        duration: timedelta,
+        teacher_id: int | None = None,
+        hour_rate: int | None = None,
+    ) -> None:
+        """
+        Записывает каждое забронированное вхождение серии отдельной строкой одним многострочным INSERT.
+        """
+        rows = [
+            {
+                "user_id": user_id,
+                "teacher_id": teacher_id,
+                "hour_rate": hour_rate,
+                "start_at": _to_utc_naive(occurrence),
+                "end_at": _to_utc_naive(occurrence + duration),
+                "caldav_uid": series.event.uid,
+                "caldav_href": series.event.href,
+                "caldav_etag": series.event.etag,
+                "recurrence_id": _to_utc_naive(occurrence),
+            }
+            for occurrence in series.booked
+        ]
+
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                session.execute(INSERT_BOOKING, rows)
+                session.commit()
+            finally:
+                await self.__database.close_session()
+
+        await self.__database.execute_with_retry(query)
+
+    async def update_series_etag(self, caldav_uid: str, etag: str | None) -> None:
+        """
+        Обновляет ETag у всех вхождений серии после изменения общего события.
+        """
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                session.execute(UPDATE_SERIES_ETAG, {"caldav_uid": caldav_uid, "caldav_etag": etag})
+                session.commit()
+            finally:
+                await self.__database.close_session()
+
+        await self.__database.execute_with_retry(query)
+
+    async def get_bookings_page(
+        self,
+        user_id: int,
+        after_start: datetime,
+        after_id: int = 0,
+    ) -> tuple[list[BookingDTO], bool]:
+        """
+        Возвращает страницу записей пользователя, начинающихся после курсора (after_start, after_id).
+
+        :param after_start: Время начала последней показанной записи; для первой страницы — текущее время.
+        :return: Записи страницы (время в UTC без часового пояса) и признак следующей страницы.
+        """
+        parameters = {"user_id": user_id, "after_start": _to_utc_naive(after_start), "after_id": after_id}
+
+        async def query():
+            session = await self.__database.get_read_session()
+
+            try:
+                return [BookingDTO(*row) for row in session.execute(SELECT_BOOKINGS_PAGE, parameters)]
+            finally:
+                await self.__database.close_session()
+
+        bookings = await self.__database.execute_with_retry(query) or []
+
+        return bookings[:BOOKINGS_PAGE_SIZE], len(bookings) > BOOKINGS_PAGE_SIZE
+
+    async def get_booking(self, user_id: int, booking_id: int) -> BookingDTO | None:
+        """
+        Действующее бронирование пользователя по id — с адресом и ETag события для отмены.
+        """
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                row = session.execute(SELECT_USER_BOOKING, {"booking_id": booking_id, "user_id": user_id}).first()
+                return BookingDTO(*row) if row else None
+            finally:
+                await self.__database.close_session()
+
+        return await self.__database.execute_with_retry(query)
+
+    async def mark_cancelled(self, booking_id: int) -> None:
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                session.execute(CANCEL_BOOKING, {"booking_id": booking_id, "cancelled_at": _to_utc_naive(datetime.now(utc))})
+                session.commit()
+            finally:
+                await self.__database.close_session()
+
+        await self.__database.execute_with_retry(query)
+        logger.info("Бронирование %s отменено", booking_id)
@@ -1,71 +1,180 @@
-import logging
+import asyncio
+import contextvars
 import uuid
-from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
 from typing import Set
 
 import caldav
+from dateutil.rrule import rrulestr
 from icalendar import Calendar, Event
 from pytz import timezone
 
+from bots.config.caldav_config import (CALDAV_BREAKER_FAILURE_RATE,
+                                       CALDAV_BREAKER_MINIMUM_CALLS,
+                                       CALDAV_BREAKER_OPEN_SECONDS,
+                                       CALDAV_BREAKER_WINDOW,
+                                       CALDAV_TIMEOUT_SECONDS)
 from bots.config.consts import STUDENT_WORK_CALENDAR, WORK_CALENDAR
+from bots.config.logging_config import get_logger, get_sampled_logger
+from bots.services.apple_calendar import AppleCalendar
+from bots.utils.circuit_breaker import CircuitBreaker
+from bots.utils.metrics import CALDAV_ERRORS, CALDAV_REQUEST_DURATION
+from bots.utils.tracing import traced, tracer
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
+sampled_logger = get_sampled_logger(__name__)
+
+ICALENDAR_CONTENT_TYPE = 'text/calendar; charset="utf-8"'
+
+
+class CalDavUnavailableError(Exception):
+    """CalDAV недоступен: запрос завершился ошибкой или отклонён автоматом."""
+
+
+@dataclass(frozen=True, slots=True)
+class BookedEvent:
+    """Созданное в календаре событие: UID из iCalendar, адрес ресурса и ETag (если сервер его вернул)."""
+    uid: str
+    href: str
+    etag: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class WeeklyBooking:
+    """Результат бронирования серии: созданное событие и занятия, попавшие в серию или исключённые из неё."""
+    event: BookedEvent | None
+    booked: list[datetime] = field(default_factory=list)
+    conflicts: list[datetime] = field(default_factory=list)
+
+
+class CancelResult(Enum):
+    CANCELLED = "cancelled"
+    # Событие изменено в календаре после бронирования: ETag не совпал, удаление не выполнено.
+    MODIFIED = "modified"
+
+
+@contextmanager
+def _observe_request(method: str):
+    """
+    Замеряет запрос к CalDAV в метриках и открывает для него спан.
+    """
+    with CALDAV_REQUEST_DURATION.time(method=method), tracer.span(f"caldav.{method}"):
+        yield
 
 
 class CalDavService:
-    def __init__(self, url: str, username: str, app_password: str):
-        logger.info("Инициализация CalDavService")
+    """
+    Календари одного преподавателя: занятость читается из всех его календарей параллельно
+    (по запросу на календарь), бронирования записываются в календарь ``booking_calendar``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        username: str,
+        app_password: str,
+        calendars: list[AppleCalendar] | None = None,
+        booking_calendar: AppleCalendar | None = None,
+        local_tz_name: str = "Europe/Moscow",
+        name: str = "caldav",
+    ):
+        logger.info("Инициализация CalDavService %s", name)
 
         self.__url = url
         self.__username = username
         self.__app_password = app_password
-
-        self.__client = caldav.DAVClient(self.__url, username=self.__username, password=self.__app_password)
-        self.__principal = self.__client.principal()
-        self.__principal.calendars()
-        self.__calendars = self.__get_calendars()
-
-        logger.info("CalDavService успешно инициализирован")
-
+        self.__calendar_configs = calendars or [WORK_CALENDAR, STUDENT_WORK_CALENDAR]
+        self.__booking_calendar_name = (booking_calendar or STUDENT_WORK_CALENDAR).get_name()
+        self.__local_tz = timezone(local_tz_name)
+
+        self.__client = caldav.DAVClient(
+            self.__url,
+            username=self.__username,
+            password=self.__app_password,
+            timeout=CALDAV_TIMEOUT_SECONDS,
+        )
+        # Отдельный автомат на преподавателя: сбой одного аккаунта не блокирует бронирование у остальных.
+        self.__breaker = CircuitBreaker(
+            name,
+            failure_rate_threshold=CALDAV_BREAKER_FAILURE_RATE,
+            minimum_calls=CALDAV_BREAKER_MINIMUM_CALLS,
+            window_size=CALDAV_BREAKER_WINDOW,
+            open_seconds=CALDAV_BREAKER_OPEN_SECONDS,
+        )
+        # Поток на календарь: время загрузки занятости равно самому медленному календарю, а не сумме.
+        self.__executor = ThreadPoolExecutor(max_workers=len(self.__calendar_configs),
+                                             thread_name_prefix=name)
+
+        with _observe_request("connect"):
+            self.__principal = self.__client.principal()
+            self.__principal.calendars()
+            self.__calendars = self.__get_calendars()
+
+        logger.info("CalDavService %s успешно инициализирован", name)
+
+    @traced("CalDavService.get_events")
     def get_events(self, start_datetime: datetime, end_datetime: datetime, local_tz) -> list:
-        logger.info(f"Получение событий с {start_datetime} по {end_datetime} в timezone: {local_tz}")
-
-        work_calendar = self.__calendars['work']
-        student_work_calendar = self.__calendars['student_work']
+        logger.debug("Получение событий с %s по %s в timezone: %s", start_datetime, end_datetime, local_tz)
 
         start_local = start_datetime.astimezone(local_tz)
         end_local = end_datetime.astimezone(local_tz)
 
-        logger.info(f"Перевод времени в локальную timezone: {start_local} - {end_local}")
+        logger.debug("Перевод времени в локальную timezone: %s - %s", start_local, end_local)
 
-        events = []
+        if len(self.__calendars) == 1:
+            results = [self.__search(calendar, start_local, end_local) for calendar in self.__calendars.values()]
+        else:
+            # Копия контекста на каждый запрос: спаны календарей остаются дочерними для get_events.
+            futures = [
+                self.__executor.submit(contextvars.copy_context().run, self.__search, calendar, start_local, end_local)
+                for calendar in self.__calendars.values()
+            ]
+            results = [future.result() for future in futures]
 
-        try:
-            events += work_calendar.date_search(start=start_local, end=end_local)
-            events += student_work_calendar.date_search(start=start_local, end=end_local)
-            logger.info(f"Получено {len(events)} событий")
-        except Exception as e:
-            logger.error(f"Ошибка при получении событий: {e}")
+        events = [event for calendar_events in results for event in calendar_events]
+        sampled_logger.info("Получено %s событий из %s календарей", len(events), len(results))
 
         return events
 
-    def get_events_time_by_date(self, target_date: date) -> list:
-        logger.info(f"Получение событий на дату: {target_date}")
+    def close(self) -> None:
+        self.__executor.shutdown(wait=False, cancel_futures=True)
 
-        utc = timezone("UTC")
+    def get_busy_intervals(self, start_datetime: datetime, end_datetime: datetime, local_tz) -> list[tuple[datetime, datetime]]:
+        """
+        Возвращает занятые интервалы всех календарей преподавателя за период одним запросом к каждому календарю.
 
-        start_datetime = utc.localize(
-            datetime.combine(target_date, datetime.min.time()).replace(hour=7))
-        end_datetime = utc.localize(
-            datetime.combine(target_date, datetime.min.time()).replace(hour=15))
+        Args:
+            start_datetime: Начало периода (aware datetime).
+            end_datetime: Конец периода (aware datetime).
+            local_tz: Часовой пояс, в который переводятся интервалы.
 
-        logger.info(f"Диапазон времени (UTC): {start_datetime} - {end_datetime}")
+        Returns:
+            list[tuple[datetime, datetime]]: Пары (начало, конец) в часовом поясе local_tz.
+            События на весь день превращаются в интервалы от полуночи до полуночи,
+            повторяющиеся события (RRULE без EXDATE) — в отдельные вхождения внутри периода.
+        """
+        intervals = []
 
-        return self.get_events(start_datetime, end_datetime, timezone("Europe/Moscow"))
+        for event in self.get_events(start_datetime, end_datetime, local_tz):
+            try:
+                for component in Calendar.from_ical(event.data).walk("VEVENT"):
+                    intervals.extend(self.__expand(component, local_tz, start_datetime, end_datetime))
+            except Exception as exception:
+                logger.error("Ошибка при парсинге события: %s", exception)
 
+        logger.debug("Занятых интервалов: %s", len(intervals))
+
+        return intervals
+
+    @traced("CalDavService.book_slot")
     async def book_slot(self, summary, start, end, description=None):
         """
         Создает событие в календаре с использованием библиотеки caldav.
+        Запросы к CalDAV выполняются в отдельном потоке и не блокируют event loop.
 
         Args:
             summary: Название события.
@@ -74,59 +183,221 @@ class CalDavService:
             description: Описание события (по умолчанию None).
 
         Returns:
-            bool: True, если событие успешно создано, иначе False.
+            BookedEvent | None: Созданное событие или None, если слот уже занят.
+
+        Raises:
+            CalDavUnavailableError: CalDAV недоступен, бронирование не выполнено.
         """
 
         logger.info(
-            f"Бронирование слота: summary={summary}, время начало={start}, время конца={end}, описание={description}")
+            "Бронирование слота: summary=%s, время начало=%s, время конца=%s, описание=%s",
+            summary, start, end, description)
+
+        return await asyncio.to_thread(self.__book_slot, summary, start, end, description)
+
+    def __book_slot(self, summary, start, end, description) -> BookedEvent | None:
+        local_tz = self.__local_tz
+
+        local_start = start.astimezone(local_tz)
+        local_end = end.astimezone(local_tz)
+
+        for existing_start, existing_end in self.get_busy_intervals(start, end, local_tz):
+            if existing_start < local_end and existing_end > local_start:
+                logger.warning("Конфликт слотов: %s - %s", existing_start, existing_end)
+
+                return None
 
         try:
-            local_tz = timezone("Europe/Moscow")
+            event = self.__build_event(summary, local_start, local_end, description)
+        except Exception as exception:
+            CALDAV_ERRORS.inc(method="book_slot", error=type(exception).__name__)
+            logger.error("Ошибка при создании события: %s", exception)
 
-            local_start = start.astimezone(local_tz)
-            local_end = end.astimezone(local_tz)
+            return None
 
-            work_calendar = self.__calendars['work']
-            student_work_calendar = self.__calendars['student_work']
+        booked_event = self.__put_event(event)
+        logger.info("Слот успешно забронирован: %s - %s", local_start, local_end)
 
-            events = self.get_events(start, end, local_tz)
+        return booked_event
 
-            for event in events:
-                event_data = Calendar.from_ical(event.data)
+    @traced("CalDavService.book_weekly")
+    async def book_weekly(self, summary, start, end, weeks: int, excluded=(), description=None) -> WeeklyBooking:
+        """
+        Бронирует еженедельную серию одним событием с RRULE.
 
-                for component in event_data.walk("VEVENT"):
-                    existing_start = component.get("DTSTART").dt
-                    existing_end = component.get("DTEND").dt
+        Занятость всех вхождений проверяется одним запросом за весь период серии; занятые
+        вхождения и вхождения из ``excluded`` исключаются из серии через EXDATE.
 
-                    if isinstance(existing_start, datetime) and isinstance(existing_end, datetime):
-                        existing_start = existing_start.astimezone(local_tz)
-                        existing_end = existing_end.astimezone(local_tz)
+        Args:
+            summary: Название события.
+            start: Начало первого занятия (datetime, UTC).
+            end: Окончание первого занятия (datetime, UTC).
+            weeks: Количество недель в серии.
+            excluded: Начала вхождений (aware datetime), которые бронировать нельзя, например вне рабочих часов.
+            description: Описание события (по умолчанию None).
+
+        Returns:
+            WeeklyBooking: Событие (None, если свободных вхождений нет), забронированные
+            и исключённые вхождения в часовом поясе календаря.
 
-                    if existing_start < local_end and existing_end > local_start:
-                        logger.warning(f"Конфликт слотов: {existing_start} - {existing_end}")
+        Raises:
+            CalDavUnavailableError: CalDAV недоступен, бронирование не выполнено.
+        """
+        logger.info("Бронирование серии: summary=%s, начало=%s, недель=%s", summary, start, weeks)
 
-                        return False
+        return await asyncio.to_thread(self.__book_weekly, summary, start, end, weeks, excluded, description)
 
-            event = Event()
-            event.add("summary", summary)
-            event.add("dtstart", local_start)
-            event.add("dtend", local_end)
-            event.add("uid", str(uuid.uuid4()))
+    def __book_weekly(self, summary, start, end, weeks, excluded, description) -> WeeklyBooking:
+        local_tz = self.__local_tz
 
-            if description:
-                event.add("description", description)
+        local_start = start.astimezone(local_tz)
+        duration = end - start
+        naive_start = local_start.replace(tzinfo=None)
+        occurrences = [local_tz.localize(naive_start + timedelta(weeks=week)) for week in range(weeks)]
+        excluded = {value.astimezone(local_tz) for value in excluded}
 
-            calendar_data = Calendar()
-            calendar_data.add_component(event)
+        busy_intervals = self.get_busy_intervals(occurrences[0], occurrences[-1] + duration, local_tz)
+        conflicts = [
+            occurrence for occurrence in occurrences
+            if occurrence in excluded or any(
+                busy_start < occurrence + duration and busy_end > occurrence
+                for busy_start, busy_end in busy_intervals
+            )
+        ]
+        booked = [occurrence for occurrence in occurrences if occurrence not in conflicts]
 
-            student_work_calendar.add_event(calendar_data.to_ical())
-            logger.info(f"Слот успешно забронирован: {local_start} - {local_end}")
+        if not booked:
+            logger.warning("Серия не забронирована: все %s вхождений заняты", weeks)
+            return WeeklyBooking(None, [], conflicts)
 
-            return True
-        except Exception as exception:
-            logger.error(f"Ошибка при создании события: {exception}")
+        first, last = booked[0], booked[-1]
+        # COUNT считает и исключённые вхождения: EXDATE применяется после RRULE.
+        count = occurrences.index(last) - occurrences.index(first) + 1
+        exdates = [occurrence for occurrence in conflicts if first < occurrence < last]
 
-            return False
+        event = self.__build_event(summary, first, first + duration, description)
+        event.add("rrule", {"freq": "weekly", "count": count})
+
+        if exdates:
+            event.add("exdate", exdates)
+
+        booked_event = self.__put_event(event)
+        logger.info("Серия забронирована: %s вхождений, исключено %s", len(booked), len(conflicts))
+
+        return WeeklyBooking(booked_event, booked, conflicts)
+
+    @traced("CalDavService.cancel_occurrence")
+    async def cancel_occurrence(self, href: str, etag: str | None, occurrence_start: datetime) -> tuple[CancelResult, str | None]:
+        """
+        Исключает одно вхождение серии: добавляет EXDATE в событие по сохранённому адресу
+        и сохраняет его условным PUT с If-Match.
+
+        Returns:
+            tuple[CancelResult, str | None]: Результат и новый ETag события серии.
+
+        Raises:
+            CalDavUnavailableError: CalDAV недоступен, отмена не выполнена.
+        """
+        return await asyncio.to_thread(self.__cancel_occurrence, href, etag, occurrence_start)
+
+    def __cancel_occurrence(self, href, etag, occurrence_start) -> tuple[CancelResult, str | None]:
+        local_tz = self.__local_tz
+
+        response = self.__call("get", self.__client.request, href, "GET", "", {})
+
+        if response.status == 404:
+            return CancelResult.CANCELLED, None
+
+        self.__ensure_status("get", response, {200})
+        current_etag = response.headers.get("ETag") or etag
+
+        if etag and current_etag != etag:
+            logger.warning("Серия %s изменена после бронирования, отмена вхождения отклонена", href)
+            return CancelResult.MODIFIED, None
+
+        calendar_data = Calendar.from_ical(response.raw)
+
+        for component in calendar_data.walk("VEVENT"):
+            component.add("exdate", occurrence_start.astimezone(local_tz))
+
+        headers = {"Content-Type": ICALENDAR_CONTENT_TYPE}
+
+        if current_etag:
+            headers["If-Match"] = current_etag
+
+        response = self.__call("put", self.__client.put, href, calendar_data.to_ical().decode(), headers)
+
+        if response.status == 412:
+            logger.warning("Серия %s изменена во время отмены вхождения", href)
+            return CancelResult.MODIFIED, None
+
+        self.__ensure_status("put", response, {200, 201, 204})
+        logger.info("Вхождение %s серии %s отменено", occurrence_start, href)
+
+        return CancelResult.CANCELLED, response.headers.get("ETag")
+
+    @staticmethod
+    def __build_event(summary, local_start, local_end, description) -> Event:
+        event = Event()
+        event.add("summary", summary)
+        event.add("dtstart", local_start)
+        event.add("dtend", local_end)
+        event.add("uid", str(uuid.uuid4()))
+
+        if description:
+            event.add("description", description)
+
+        return event
+
+    def __put_event(self, event: Event) -> BookedEvent:
+        """
+        Создаёт событие PUT-запросом по собственному адресу вместо add_event: ответ содержит ETag
+        для условной отмены, а If-None-Match не даёт перезаписать существующий ресурс.
+        """
+        uid = str(event.get("uid"))
+        href = f"{str(self.__calendars[self.__booking_calendar_name].url).rstrip('/')}/{uid}.ics"
+
+        calendar_data = Calendar()
+        calendar_data.add_component(event)
+
+        response = self.__call(
+            "put",
+            self.__client.put,
+            href,
+            calendar_data.to_ical().decode(),
+            {"Content-Type": ICALENDAR_CONTENT_TYPE, "If-None-Match": "*"},
+        )
+        self.__ensure_status("put", response, {200, 201, 204})
+
+        return BookedEvent(uid, href, response.headers.get("ETag"))
+
+    @traced("CalDavService.cancel_event")
+    async def cancel_event(self, href: str, etag: str | None) -> CancelResult:
+        """
+        Удаляет событие одним запросом по сохранённому адресу, без поиска по календарям.
+
+        Args:
+            href: Адрес ресурса события.
+            etag: ETag, полученный при создании; если есть, DELETE выполняется с If-Match.
+
+        Returns:
+            CancelResult: CANCELLED (в том числе если события уже нет) или MODIFIED,
+            если событие изменено в календаре после бронирования.
+
+        Raises:
+            CalDavUnavailableError: CalDAV недоступен, отмена не выполнена.
+        """
+        headers = {"If-Match": etag} if etag else {}
+        response = await asyncio.to_thread(self.__call, "delete", self.__client.request, href, "DELETE", "", headers)
+
+        if response.status == 412:
+            logger.warning("Событие %s изменено после бронирования, отмена отклонена", href)
+            return CancelResult.MODIFIED
+
+        self.__ensure_status("delete", response, {200, 204, 404})
+        logger.info("Событие %s удалено", href)
+
+        return CancelResult.CANCELLED
 
     '''def print_events(self):
         # Определяем временной диапазон
@@ -166,7 +437,7 @@ class CalDavService:
     '''
 
     def parse_calendar_events(self, events: list) -> Set[range]:
-        logger.info(f"Преобразование {len(events)} событий в занятое время")
+        logger.debug("Преобразование %s событий в занятое время", len(events))
         busy_hours = set()
 
         for event in events:
@@ -179,26 +450,151 @@ class CalDavService:
 
                     if isinstance(start, datetime) and isinstance(end, datetime):
                         busy_hours.update(range(start.hour, end.hour))
-                        logger.info(f"Преобразование события: {start} - {end}")
+                        logger.debug("Преобразование события: %s - %s", start, end)
             except Exception as exception:
-                logger.error(f"Ошибка при парсинге события: {exception}")
+                logger.error("Ошибка при парсинге события: %s", exception)
 
-        logger.info(f"Занятые часы: {busy_hours}")
+        logger.debug("Занятые часы: %s", busy_hours)
 
         return busy_hours
 
+    def __call(self, method: str, function, *args, **kwargs):
+        """
+        Выполняет запрос к CalDAV через автоматический выключатель.
+
+        :raises CalDavUnavailableError: Автомат разомкнут, запрос завершился ошибкой или ответом 5xx.
+        """
+        if not self.__breaker.allow():
+            CALDAV_ERRORS.inc(method=method, error="CircuitOpen")
+            raise CalDavUnavailableError(f"CalDAV временно недоступен ({method}): автомат разомкнут")
+
+        try:
+            with _observe_request(method):
+                result = function(*args, **kwargs)
+        except Exception as exception:
+            self.__breaker.record_failure()
+            CALDAV_ERRORS.inc(method=method, error=type(exception).__name__)
+            logger.error("Ошибка запроса %s к CalDAV: %s", method, exception)
+            raise CalDavUnavailableError(f"Ошибка запроса {method} к CalDAV: {exception}") from exception
+
+        # Ответ 5xx — отказ сервера, как и исключение; остальные коды проверяют вызывающие методы.
+        status = getattr(result, "status", None)
+
+        if isinstance(status, int) and status >= 500:
+            self.__breaker.record_failure()
+            CALDAV_ERRORS.inc(method=method, error=f"HTTP{status}")
+            logger.error("CalDAV ответил %s на %s", status, method)
+            raise CalDavUnavailableError(f"CalDAV ответил {status} на {method}")
+
+        self.__breaker.record_success()
+        return result
+
+    @staticmethod
+    def __ensure_status(method: str, response, expected: set[int]) -> None:
+        if response.status not in expected:
+            CALDAV_ERRORS.inc(method=method, error=f"HTTP{response.status}")
+            raise CalDavUnavailableError(f"CalDAV ответил {response.status} на {method}")
+
+    @classmethod
+    def __expand(cls, component, local_tz, range_start: datetime, range_end: datetime) -> list[tuple[datetime, datetime]]:
+        """
+        Раскрывает событие во вхождения внутри периода: date_search возвращает повторяющееся
+        событие один раз, с DTSTART первого вхождения.
+        """
+        start, end = cls.__to_interval(component, local_tz)
+        rrule = component.get("RRULE")
+
+        if rrule is None:
+            return [(start, end)]
+
+        duration = end - start
+        excluded = set()
+        exdates = component.get("EXDATE") or []
+
+        for exdate in exdates if isinstance(exdates, list) else [exdates]:
+            for value in exdate.dts:
+                excluded.add(cls.__to_local(value.dt, local_tz))
+
+        # RRULE раскрывается по местному времени зоны события, и каждое вхождение локализуется отдельно:
+        # у pytz-даты смещение фиксировано, и при раскрытии от aware DTSTART вхождения после перехода
+        # на летнее или зимнее время сдвинулись бы на час.
+        original_start = component.get("DTSTART").dt
+        is_zoned = isinstance(original_start, datetime) and original_start.tzinfo is not None
+        event_tz = original_start.tzinfo if is_zoned else local_tz
+        wall_start = start.astimezone(event_tz).replace(tzinfo=None)
+        occurrences = [
+            cls.__localize(occurrence, event_tz).astimezone(local_tz)
+            for occurrence in rrulestr(cls.__wall_rrule(rrule, event_tz), dtstart=wall_start).between(
+                range_start.astimezone(event_tz).replace(tzinfo=None) - duration,
+                range_end.astimezone(event_tz).replace(tzinfo=None),
+                inc=True,
+            )
+        ]
+
+        return [
+            (occurrence, local_tz.normalize(occurrence + duration))
+            for occurrence in occurrences
+            if occurrence not in excluded
+        ]
+
+    @staticmethod
+    def __wall_rrule(rrule, event_tz) -> str:
+        """RRULE с UNTIL в местном времени зоны события: с naive DTSTART dateutil не принимает UNTIL в UTC."""
+        recur = type(rrule)(rrule)
+        until = [
+            value.astimezone(event_tz).replace(tzinfo=None)
+            if isinstance(value, datetime) and value.tzinfo is not None else value
+            for value in recur.get("UNTIL", [])
+        ]
+
+        if until:
+            recur["UNTIL"] = until
+
+        return recur.to_ical().decode()
+
+    @staticmethod
+    def __localize(value: datetime, tz) -> datetime:
+        """Привязывает местное время к зоне: pytz требует localize, остальные зоны — replace."""
+        return tz.localize(value) if hasattr(tz, "localize") else value.replace(tzinfo=tz)
+
+    @staticmethod
+    def __to_local(value, local_tz) -> datetime:
+        if not isinstance(value, datetime):
+            return local_tz.localize(datetime.combine(value, datetime.min.time()))
+
+        if value.tzinfo is None:
+            return local_tz.localize(value)
+
+        return value.astimezone(local_tz)
+
+    @staticmethod
+    def __to_interval(component, local_tz) -> tuple[datetime, datetime]:
+        start = component.get("DTSTART").dt
+        end = component.get("DTEND").dt if component.get("DTEND") else start
+
+        if not isinstance(start, datetime):
+            start = local_tz.localize(datetime.combine(start, datetime.min.time()))
+        if not isinstance(end, datetime):
+            end = local_tz.localize(datetime.combine(end, datetime.min.time()))
+
+        return start.astimezone(local_tz), end.astimezone(local_tz)
+
+    def __search(self, calendar: caldav.Calendar, start_local: datetime, end_local: datetime) -> list:
+        return self.__call("date_search", calendar.date_search, start=start_local, end=end_local)
+
     def __get_calendars(self) -> dict[str, caldav.Calendar]:
         logger.info("Получение календарей")
 
-        calendars = dict()
+        calendars = {
+            calendar.get_name(): self.__principal.calendar(name=calendar.get_name(),
+                                                           cal_id=calendar.get_id(),
+                                                           cal_url=calendar.get_url())
+            for calendar in self.__calendar_configs
+        }
 
-        calendars['work'] = self.__principal.calendar(name=WORK_CALENDAR.get_name(),
-                                                      cal_id=WORK_CALENDAR.get_id(),
-                                                      cal_url=WORK_CALENDAR.get_url())
-        calendars['student_work'] = self.__principal.calendar(name=STUDENT_WORK_CALENDAR.get_name(),
-                                                              cal_id=STUDENT_WORK_CALENDAR.get_id(),
-                                                              cal_url=STUDENT_WORK_CALENDAR.get_url())
+        if self.__booking_calendar_name not in calendars:
+            raise ValueError(f"Календарь бронирований {self.__booking_calendar_name} не входит в набор календарей")
 
-        logger.info("Календари успешно получены")
+        logger.info("Календари успешно получены: %s", len(calendars))
 
         return calendars
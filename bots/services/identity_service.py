@@ -1,14 +1,39 @@
-from sqlalchemy import text
+from sqlalchemy import bindparam, insert, select, update
 
+from bots.config.identity_config import LEGACY_IDENTITY_FALLBACK_ENABLED
 from bots.config.logging_config import get_logger
 from bots.config.platforms import Platforms
 from bots.models.database import Database
-from bots.models.models import UserDTO
-from bots.services.user_service import UserService
+from bots.models.models import UserDTO, UserIdentity
+from bots.services.user_service import USER_COLUMNS, USERS, UserService, row_to_user_dto
 from bots.utils.cryptographer import encrypt_platform_user_id
+from bots.utils.tracing import traced
 
 logger = get_logger(__name__)
 
+IDENTITIES = UserIdentity.__table__
+IDENTITY_MATCHES = (
+    (IDENTITIES.c.platform == bindparam("platform"))
+    & (IDENTITIES.c.platform_user_id == bindparam("platform_user_id"))
+)
+
+SELECT_IDENTITY = select(
+    IDENTITIES.c.id,
+    IDENTITIES.c.user_id,
+    IDENTITIES.c.platform,
+    IDENTITIES.c.platform_user_id,
+    IDENTITIES.c.created_at,
+).where(IDENTITY_MATCHES).limit(1)
+# Пользователь по идентичности одним запросом: уникальный индекс идентичности + первичный ключ users.
+SELECT_USER_BY_IDENTITY = (
+    select(*USER_COLUMNS)
+    .select_from(IDENTITIES.join(USERS, USERS.c.id == IDENTITIES.c.user_id))
+    .where(IDENTITY_MATCHES)
+    .limit(1)
+)
+INSERT_IDENTITY = insert(IDENTITIES)
+UPDATE_IDENTITY_USER = update(IDENTITIES).where(IDENTITY_MATCHES).values(user_id=bindparam("new_user_id"))
+
 
 class IdentityService:
     def __init__(self, database: Database, user_service: UserService):
@@ -31,20 +56,11 @@ class IdentityService:
         encrypted_platform_user_id = self.__encrypt_identity(platform_user_id)
 
         async def query():
-            session = await self.__database.get_session()
+            session = await self.__database.get_read_session()
 
             try:
-                query_text = text(
-                    """
-                    SELECT id, user_id, platform, platform_user_id, created_at
-                    FROM user_identities
-                    WHERE platform = :platform
-                      AND platform_user_id = :platform_user_id
-                    LIMIT 1
-                    """
-                )
                 result = session.execute(
-                    query_text,
+                    SELECT_IDENTITY,
                     {
                         "platform": platform,
                         "platform_user_id": encrypted_platform_user_id,
@@ -64,14 +80,8 @@ class IdentityService:
             session = await self.__database.get_session()
 
             try:
-                insert_query_text = text(
-                    """
-                    INSERT INTO user_identities (user_id, platform, platform_user_id)
-                    VALUES (:user_id, :platform, :platform_user_id)
-                    """
-                )
                 session.execute(
-                    insert_query_text,
+                    INSERT_IDENTITY,
                     {
                         "user_id": user_id,
                         "platform": platform,
@@ -80,17 +90,8 @@ class IdentityService:
                 )
                 session.commit()
 
-                select_query_text = text(
-                    """
-                    SELECT id, user_id, platform, platform_user_id, created_at
-                    FROM user_identities
-                    WHERE platform = :platform
-                      AND platform_user_id = :platform_user_id
-                    LIMIT 1
-                    """
-                )
                 result = session.execute(
-                    select_query_text,
+                    SELECT_IDENTITY,
                     {
                         "platform": platform,
                         "platform_user_id": encrypted_platform_user_id,
@@ -103,11 +104,53 @@ class IdentityService:
 
         return await self.__database.execute_with_retry(query)
 
-    async def get_user_by_identity(self, platform: str, platform_user_id: int | str) -> UserDTO | None:
-        identity = await self.get_identity(platform, platform_user_id)
+    async def __find_user_by_identity(
+        self,
+        platform: str,
+        platform_user_id: int | str,
+        use_primary: bool = False,
+    ) -> UserDTO | None:
+        encrypted_platform_user_id = self.__encrypt_identity(platform_user_id)
+
+        async def query():
+            if use_primary:
+                session = await self.__database.get_session()
+            else:
+                session = await self.__database.get_read_session()
+
+            try:
+                row = session.execute(
+                    SELECT_USER_BY_IDENTITY,
+                    {
+                        "platform": platform,
+                        "platform_user_id": encrypted_platform_user_id,
+                    },
+                ).first()
+
+                return row_to_user_dto(row)
+            finally:
+                await self.__database.close_session()
 
-        if identity:
-            return await self.__user_service.get_user_by_id(identity["user_id"])
+        return await self.__database.execute_with_retry(query)
+
+    @traced("IdentityService.get_user_by_identity")
+    async def get_user_by_identity(self, platform: str, platform_user_id: int | str) -> UserDTO | None:
+        return await self.__get_user_by_identity(platform, platform_user_id)
+
+    async def __get_user_by_identity(
+        self,
+        platform: str,
+        platform_user_id: int | str,
+        use_primary: bool = False,
+    ) -> UserDTO | None:
+        """
+        :param use_primary: Читать связку из основной БД: перед записью реплика может не видеть
+            только что созданного пользователя и привести к повторной вставке.
+        """
+        user = await self.__find_user_by_identity(platform, platform_user_id, use_primary)
+
+        if user or not LEGACY_IDENTITY_FALLBACK_ENABLED:
+            return user
 
         normalized_platform_user_id = self.__normalize_platform_user_id(platform_user_id)
 
@@ -119,8 +162,9 @@ class IdentityService:
 
         return None
 
+    @traced("IdentityService.get_or_create_user_by_identity")
     async def get_or_create_user_by_identity(self, platform: str, platform_user_id: int | str) -> UserDTO | None:
-        user = await self.get_user_by_identity(platform, platform_user_id)
+        user = await self.__get_user_by_identity(platform, platform_user_id, use_primary=True)
 
         if user:
             return user
@@ -134,7 +178,9 @@ class IdentityService:
 
         if not created_user:
             logger.error(
-                f"Не удалось создать пользователя для platform={platform}, platform_user_id={normalized_platform_user_id}"
+                "Не удалось создать пользователя для platform=%s, platform_user_id=%s",
+                platform,
+                normalized_platform_user_id,
             )
             return None
 
@@ -148,18 +194,10 @@ class IdentityService:
             session = await self.__database.get_session()
 
             try:
-                query_text = text(
-                    """
-                    UPDATE user_identities
-                    SET user_id = :user_id
-                    WHERE platform = :platform
-                      AND platform_user_id = :platform_user_id
-                    """
-                )
                 session.execute(
-                    query_text,
+                    UPDATE_IDENTITY_USER,
                     {
-                        "user_id": user_id,
+                        "new_user_id": user_id,
                         "platform": platform,
                         "platform_user_id": encrypted_platform_user_id,
                     },
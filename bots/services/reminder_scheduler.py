@@ -0,0 +1,353 @@
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from pytz import utc
+from sqlalchemy import and_, bindparam, delete, func, insert, select
+
+from bots.config.logging_config import get_logger
+from bots.config.platforms import Platforms
+from bots.config.reminder_config import (REMINDER_MAX_SLEEP_SECONDS,
+                                         REMINDER_OFFSETS_MINUTES,
+                                         REMINDER_RELOAD_OVERLAP_SECONDS,
+                                         REMINDER_RETRY_SECONDS)
+from bots.models.database import Database, DatabaseUnavailableError
+from bots.models.models import Booking, BookingReminder, User, UserIdentity
+from bots.utils.cryptographer import decrypt_platform_user_id
+
+logger = get_logger(__name__)
+
+BOOKINGS = Booking.__table__
+REMINDERS = BookingReminder.__table__
+USERS = User.__table__
+IDENTITIES = UserIdentity.__table__
+
+SELECT_DATABASE_NOW = select(func.now())
+# Telegram-идентичность из user_identities, для не перенесённых пользователей — users.telegram_id.
+UPCOMING_SOURCE = (
+    BOOKINGS
+    .join(USERS, USERS.c.id == BOOKINGS.c.user_id)
+    .outerjoin(IDENTITIES, and_(IDENTITIES.c.user_id == USERS.c.id, IDENTITIES.c.platform == Platforms.TELEGRAM))
+)
+UPCOMING_COLUMNS = (
+    BOOKINGS.c.id,
+    BOOKINGS.c.start_at,
+    BOOKINGS.c.teacher_id,
+    func.coalesce(IDENTITIES.c.platform_user_id, USERS.c.telegram_id).label("telegram_id"),
+)
+UPCOMING_FILTER = and_(
+    BOOKINGS.c.start_at > bindparam("now"),
+    BOOKINGS.c.cancelled_at.is_(None),
+    USERS.c.is_banned.is_(False),
+)
+SELECT_UPCOMING = select(*UPCOMING_COLUMNS).select_from(UPCOMING_SOURCE).where(UPCOMING_FILTER)
+SELECT_CREATED_SINCE = (
+    select(*UPCOMING_COLUMNS)
+    .select_from(UPCOMING_SOURCE)
+    .where(UPCOMING_FILTER, BOOKINGS.c.created_at >= bindparam("since"))
+)
+SELECT_SENT = select(REMINDERS.c.booking_id, REMINDERS.c.offset_minutes).where(
+    REMINDERS.c.booking_id.in_(bindparam("booking_ids", expanding=True))
+)
+SELECT_ACTIVE_START = select(BOOKINGS.c.start_at).where(
+    BOOKINGS.c.id == bindparam("booking_id"),
+    BOOKINGS.c.cancelled_at.is_(None),
+)
+# Захват напоминания: вставилась строка — отправляет этот процесс, иначе напоминание уже отправлено.
+INSERT_SENT_MARKER = insert(REMINDERS).prefix_with("IGNORE")
+# Снятие захвата, если отправка не удалась: напоминание будет отправлено повторно.
+DELETE_SENT_MARKER = delete(REMINDERS).where(
+    REMINDERS.c.booking_id == bindparam("booking_id"),
+    REMINDERS.c.offset_minutes == bindparam("offset_minutes"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Reminder:
+    """Напоминание о занятии: начало в UTC, за сколько минут до него и кому отправить."""
+    booking_id: int
+    offset_minutes: int
+    start_at: datetime
+    teacher_id: int | None
+    telegram_id: int
+
+
+class ReminderScheduler:
+    """
+    Планировщик напоминаний о занятиях на куче по времени отправки.
+
+    При запуске загружает предстоящие записи, затем спит до ближайшего напоминания — без
+    периодического опроса календаря и БД, поэтому нагрузка не зависит от числа записей.
+    Новые записи догружаются по ``created_at`` после ``request_reload`` (из обработчиков
+    или через шину инвалидации). Отменённые записи из кучи не удаляются: перед отправкой
+    запись перепроверяется в БД. Отметки об отправке хранятся в booking_reminders; если
+    отправка не удалась, отметка снимается и напоминание повторяется, пока занятие не началось.
+    """
+
+    INVALIDATION_TOPIC = "bookings"
+
+    def __init__(
+        self,
+        database: Database,
+        send: Callable[[Reminder], Awaitable[None]],
+        offsets_minutes: tuple[int, ...] = REMINDER_OFFSETS_MINUTES,
+    ):
+        self.__database = database
+        self.__send = send
+        self.__offsets_minutes = tuple(sorted(offsets_minutes, reverse=True))
+        self.__heap: list[tuple[float, int, Reminder]] = []
+        self.__queued: set[tuple[int, int]] = set()
+        # Захваты этого процесса, которые не удалось снять после неудачной отправки.
+        self.__held_claims: set[tuple[int, int]] = set()
+        self.__sequence = itertools.count()
+        self.__loaded_at: datetime | None = None
+        self.__is_reload_pending = False
+        self.__reload_lock = asyncio.Lock()
+        self.__wakeup = asyncio.Event()
+        self.__task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        try:
+            await self.reload()
+        except Exception as exception:
+            self.__is_reload_pending = True
+            logger.error("Не удалось загрузить напоминания: %s", exception)
+
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+    def request_reload(self) -> None:
+        """
+        Догрузка новых записей (после бронирования здесь или инвалидации от другого процесса).
+        """
+        if self.__task is not None:
+            asyncio.get_running_loop().create_task(self.__safe_reload())
+
+    async def reload(self) -> None:
+        async with self.__reload_lock:
+            is_initial = self.__loaded_at is None
+
+            if is_initial:
+                statement, parameters = SELECT_UPCOMING, {}
+            else:
+                statement = SELECT_CREATED_SINCE
+                parameters = {"since": self.__loaded_at - timedelta(seconds=REMINDER_RELOAD_OVERLAP_SECONDS)}
+
+            async def query():
+                session = await self.__database.get_session()
+
+                try:
+                    # Водяной знак created_at — по часам БД; start_at хранится в UTC и сравнивается с UTC.
+                    loaded_at = session.execute(SELECT_DATABASE_NOW).scalar()
+                    rows = session.execute(
+                        statement,
+                        {**parameters, "now": datetime.now(utc).replace(tzinfo=None)},
+                    ).all()
+                    sent = set()
+
+                    if rows:
+                        sent = set(session.execute(SELECT_SENT, {"booking_ids": [row.id for row in rows]}).all())
+
+                    return rows, sent, loaded_at
+                finally:
+                    await self.__database.close_session()
+
+            result = await self.__database.execute_with_retry(query)
+
+            if result is None:
+                self.__is_reload_pending = True
+                return
+
+            rows, sent, self.__loaded_at = result
+            self.__is_reload_pending = False
+            scheduled = sum(self.__schedule(row, sent, is_initial) for row in rows)
+
+            if scheduled:
+                self.__wakeup.set()
+                logger.info("Запланировано напоминаний: %s, в очереди %s", scheduled, len(self.__heap))
+
+    def __schedule(self, row, sent: set[tuple[int, int]], catch_up: bool) -> int:
+        """
+        :param catch_up: Досылать пропущенные напоминания (при запуске после простоя). Для новых
+            записей срок, наступивший до бронирования, не считается пропуском.
+        """
+        try:
+            telegram_id = decrypt_platform_user_id(row.telegram_id) if row.telegram_id else None
+        except ValueError as exception:
+            logger.warning("Не удалось расшифровать получателя напоминания о записи %s: %s", row.id, exception)
+            return 0
+
+        if telegram_id is None:
+            return 0
+
+        start_at = utc.localize(row.start_at)
+        now = datetime.now(utc)
+        scheduled = 0
+        overdue = None
+
+        for offset_minutes in self.__offsets_minutes:
+            key = (row.id, offset_minutes)
+
+            if key in sent:
+                # Более близкое к занятию напоминание уже отправлено: пропущенные раньше не досылаются.
+                overdue = None
+                continue
+
+            if key in self.__queued:
+                continue
+
+            reminder = Reminder(row.id, offset_minutes, start_at, row.teacher_id, telegram_id)
+            due_at = start_at - timedelta(minutes=offset_minutes)
+
+            # Из пропущенных отправляется только самое близкое к занятию.
+            if due_at <= now:
+                overdue = (due_at, reminder) if catch_up else None
+                continue
+
+            self.__push(due_at, reminder)
+            scheduled += 1
+
+        if overdue is not None:
+            self.__push(*overdue)
+            scheduled += 1
+
+        return scheduled
+
+    def __push(self, due_at: datetime, reminder: Reminder) -> None:
+        self.__queued.add((reminder.booking_id, reminder.offset_minutes))
+        heapq.heappush(self.__heap, (due_at.timestamp(), next(self.__sequence), reminder))
+
+    async def __safe_reload(self) -> None:
+        try:
+            await self.reload()
+        except Exception as exception:
+            self.__is_reload_pending = True
+            logger.warning("Не удалось догрузить напоминания: %s", exception)
+
+    async def __run(self) -> None:
+        while True:
+            self.__wakeup.clear()
+            delay = self.__heap[0][0] - datetime.now(utc).timestamp() if self.__heap else REMINDER_MAX_SLEEP_SECONDS
+
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.__wakeup.wait(), min(delay, REMINDER_MAX_SLEEP_SECONDS))
+                except asyncio.TimeoutError:
+                    if self.__is_reload_pending and self.__database.is_healthy:
+                        await self.__safe_reload()
+
+                continue
+
+            _, _, reminder = heapq.heappop(self.__heap)
+            self.__queued.discard((reminder.booking_id, reminder.offset_minutes))
+
+            try:
+                await self.__deliver(reminder)
+            except Exception as exception:
+                logger.error("Ошибка отправки напоминания о записи %s: %s", reminder.booking_id, exception)
+
+    async def __deliver(self, reminder: Reminder) -> None:
+        try:
+            is_claimed = await self.__claim(reminder)
+        except DatabaseUnavailableError as exception:
+            is_claimed = None
+            logger.warning("Отметка напоминания о записи %s не записана: %s", reminder.booking_id, exception)
+
+        if is_claimed is None:
+            self.__retry(reminder)
+            return
+
+        key = (reminder.booking_id, reminder.offset_minutes)
+
+        if not is_claimed:
+            self.__held_claims.discard(key)
+            return
+
+        try:
+            await self.__send(reminder)
+        except Exception as exception:
+            logger.warning("Напоминание о записи %s не отправлено, повтор через %s с: %s",
+                           reminder.booking_id, REMINDER_RETRY_SECONDS, exception)
+            await self.__release(reminder)
+            self.__retry(reminder)
+            return
+
+        self.__held_claims.discard(key)
+        logger.info("Напоминание о записи %s за %s мин. отправлено", reminder.booking_id, reminder.offset_minutes)
+
+    def __retry(self, reminder: Reminder) -> None:
+        if reminder.start_at > datetime.now(utc):
+            self.__push(datetime.now(utc) + timedelta(seconds=REMINDER_RETRY_SECONDS), reminder)
+        else:
+            self.__held_claims.discard((reminder.booking_id, reminder.offset_minutes))
+
+    async def __release(self, reminder: Reminder) -> None:
+        """
+        Снимает отметку об отправке. Если БД недоступна, захват остаётся за этим процессом
+        и повторная попытка отправляет напоминание без новой отметки.
+        """
+        key = (reminder.booking_id, reminder.offset_minutes)
+
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                session.execute(DELETE_SENT_MARKER, {"booking_id": reminder.booking_id,
+                                                     "offset_minutes": reminder.offset_minutes})
+                session.commit()
+                return True
+            finally:
+                await self.__database.close_session()
+
+        try:
+            is_released = await self.__database.execute_with_retry(query)
+        except DatabaseUnavailableError:
+            is_released = None
+
+        if is_released:
+            self.__held_claims.discard(key)
+        else:
+            self.__held_claims.add(key)
+
+    async def __claim(self, reminder: Reminder) -> bool | None:
+        """
+        Проверяет, что запись не отменена и занятие ещё не началось, и записывает отметку об отправке.
+        Захват, оставшийся за этим процессом после неудачной отправки, повторно не записывается.
+
+        :return: True — напоминание нужно отправить; False — не нужно; None — БД недоступна.
+        """
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                start_at = session.execute(SELECT_ACTIVE_START, {"booking_id": reminder.booking_id}).scalar()
+
+                if start_at is None or utc.localize(start_at) <= datetime.now(utc):
+                    return False
+
+                if (reminder.booking_id, reminder.offset_minutes) in self.__held_claims:
+                    return True
+
+                result = session.execute(
+                    INSERT_SENT_MARKER,
+                    {
+                        "booking_id": reminder.booking_id,
+                        "offset_minutes": reminder.offset_minutes,
+                        "sent_at": datetime.now(utc).replace(tzinfo=None),
+                    },
+                )
+                session.commit()
+
+                return result.rowcount == 1
+            finally:
+                await self.__database.close_session()
+
+        return await self.__database.execute_with_retry(query)
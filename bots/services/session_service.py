@@ -3,28 +3,59 @@ import json
 from sqlalchemy import text
 
 from bots.models.database import Database
+from bots.utils.tracing import traced
+
+SELECT_SESSION = text(
+    """
+    SELECT id, user_id, platform, state, state_payload, updated_at
+    FROM user_sessions
+    WHERE user_id = :user_id
+      AND platform = :platform
+    LIMIT 1
+    """
+)
+UPSERT_SESSION = text(
+    """
+    INSERT INTO user_sessions (user_id, platform, state, state_payload)
+    VALUES (:user_id, :platform, :state, :state_payload)
+    ON DUPLICATE KEY UPDATE
+        state = VALUES(state),
+        state_payload = VALUES(state_payload),
+        updated_at = CURRENT_TIMESTAMP
+    """
+)
+
+
+def encode_state_payload(payload: dict) -> str:
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def decode_state_payload(raw_payload: str | dict | None) -> dict:
+    if raw_payload is None:
+        return {}
+
+    if isinstance(raw_payload, str):
+        return json.loads(raw_payload)
+
+    return raw_payload
 
 
 class SessionService:
     def __init__(self, database: Database):
         self.__database = database
 
-    async def get_session(self, user_id: int, platform: str) -> dict | None:
+    async def get_session(self, user_id: int, platform: str, for_update: bool = False) -> dict | None:
+        """
+        :param for_update: Читать из основной БД — для чтения перед записью.
+        """
+        get_database_session = self.__database.get_session if for_update else self.__database.get_read_session
+
         async def query():
-            session = await self.__database.get_session()
+            session = await get_database_session()
 
             try:
-                query_text = text(
-                    """
-                    SELECT id, user_id, platform, state, state_payload, updated_at
-                    FROM user_sessions
-                    WHERE user_id = :user_id
-                      AND platform = :platform
-                    LIMIT 1
-                    """
-                )
                 result = session.execute(
-                    query_text,
+                    SELECT_SESSION,
                     {
                         "user_id": user_id,
                         "platform": platform,
@@ -35,11 +66,7 @@ class SessionService:
                     return None
 
                 row = dict(result)
-
-                if row["state_payload"] is None:
-                    row["state_payload"] = {}
-                elif isinstance(row["state_payload"], str):
-                    row["state_payload"] = json.loads(row["state_payload"])
+                row["state_payload"] = decode_state_payload(row["state_payload"])
 
                 return row
             finally:
@@ -63,23 +90,13 @@ class SessionService:
             session = await self.__database.get_session()
 
             try:
-                query_text = text(
-                    """
-                    INSERT INTO user_sessions (user_id, platform, state, state_payload)
-                    VALUES (:user_id, :platform, :state, :state_payload)
-                    ON DUPLICATE KEY UPDATE
-                        state = VALUES(state),
-                        state_payload = VALUES(state_payload),
-                        updated_at = CURRENT_TIMESTAMP
-                    """
-                )
                 session.execute(
-                    query_text,
+                    UPSERT_SESSION,
                     {
                         "user_id": user_id,
                         "platform": platform,
                         "state": state,
-                        "state_payload": json.dumps(payload, ensure_ascii=False),
+                        "state_payload": encode_state_payload(payload),
                     },
                 )
                 session.commit()
@@ -88,9 +105,11 @@ class SessionService:
 
         await self.__database.execute_with_retry(query)
 
+    @traced("SessionService.update_payload")
     async def update_payload(self, user_id: int, platform: str, patch_data: dict) -> None:
-        current_payload = await self.get_payload(user_id, platform)
-        current_state = await self.get_state(user_id, platform)
+        session = await self.get_session(user_id, platform, for_update=True)
+        current_state = session["state"] if session else None
+        current_payload = session["state_payload"] if session else {}
 
         current_payload.update(patch_data)
 
@@ -0,0 +1,250 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Callable
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from sqlalchemy import text
+
+from bots.config.cluster_config import INVALIDATION_POLL_INTERVAL, STATE_BACKEND
+from bots.config.logging_config import get_logger
+from bots.models.database import Database
+from bots.services.session_service import decode_state_payload, encode_state_payload
+
+logger = get_logger(__name__)
+
+UPSERT_FSM_STATE = text(
+    """
+    INSERT INTO fsm_states (storage_key, state, data)
+    VALUES (:storage_key, :state, '{}')
+    ON DUPLICATE KEY UPDATE state = VALUES(state)
+    """
+)
+UPSERT_FSM_DATA = text(
+    """
+    INSERT INTO fsm_states (storage_key, state, data)
+    VALUES (:storage_key, NULL, :data)
+    ON DUPLICATE KEY UPDATE data = VALUES(data)
+    """
+)
+SELECT_FSM_STATE = text("SELECT state, data FROM fsm_states WHERE storage_key = :storage_key")
+INCREMENT_CACHE_VERSION = text(
+    """
+    INSERT INTO cache_versions (topic, version)
+    VALUES (:topic, LAST_INSERT_ID(1))
+    ON DUPLICATE KEY UPDATE version = LAST_INSERT_ID(version + 1)
+    """
+)
+SELECT_LAST_INSERT_ID = text("SELECT LAST_INSERT_ID()")
+SELECT_CACHE_VERSIONS = text("SELECT topic, version FROM cache_versions")
+
+
+class DatabaseStorage(BaseStorage):
+    """
+    Хранилище FSM в таблице ``fsm_states``: состояние переживает перезапуск
+    и доступно любому воркеру.
+    """
+
+    def __init__(self, database: Database):
+        self.__database = database
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state_name = state.state if isinstance(state, State) else state
+
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                session.execute(
+                    UPSERT_FSM_STATE,
+                    {"storage_key": self.__build_key(key), "state": state_name},
+                )
+                session.commit()
+            finally:
+                await self.__database.close_session()
+
+        await self.__database.execute_with_retry(query)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        row = await self.__get_row(key)
+        return row["state"] if row else None
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                session.execute(
+                    UPSERT_FSM_DATA,
+                    {"storage_key": self.__build_key(key), "data": encode_state_payload(data)},
+                )
+                session.commit()
+            finally:
+                await self.__database.close_session()
+
+        await self.__database.execute_with_retry(query)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        row = await self.__get_row(key)
+        return decode_state_payload(row["data"]) if row else {}
+
+    async def close(self) -> None:
+        pass
+
+    async def __get_row(self, key: StorageKey) -> dict | None:
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                result = session.execute(
+                    SELECT_FSM_STATE,
+                    {"storage_key": self.__build_key(key)},
+                ).mappings().first()
+
+                return dict(result) if result else None
+            finally:
+                await self.__database.close_session()
+
+        return await self.__database.execute_with_retry(query)
+
+    @staticmethod
+    def __build_key(key: StorageKey) -> str:
+        return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+
+class LocalInvalidationBus:
+    """
+    Локальная замена шины инвалидации для одного процесса: других процессов нет,
+    поэтому публикация ничего не делает, а кэши обновляются по своему TTL.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, list[Callable[[], None]]] = defaultdict(list)
+
+    def subscribe(self, topic: str, callback: Callable[[], None]) -> None:
+        """
+        Подписывает callback на инвалидацию темы другими процессами.
+        """
+        self._subscribers[topic].append(callback)
+
+    async def publish(self, topic: str) -> None:
+        pass
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def _notify(self, topic: str) -> None:
+        for callback in self._subscribers.get(topic, ()):
+            try:
+                callback()
+            except Exception as exception:
+                logger.error("Ошибка обработчика инвалидации %s: %s", topic, exception)
+
+
+class DatabaseInvalidationBus(LocalInvalidationBus):
+    """
+    Шина инвалидации через таблицу ``cache_versions``: публикация увеличивает версию темы,
+    а каждый процесс периодически читает версии и сбрасывает кэши, изменённые другими.
+    """
+
+    def __init__(self, database: Database, poll_interval: float = INVALIDATION_POLL_INTERVAL):
+        super().__init__()
+        self.__database = database
+        self.__poll_interval = poll_interval
+        self.__versions: dict[str, int] = {}
+        self.__is_polled = False
+        self.__task: asyncio.Task | None = None
+
+    async def publish(self, topic: str) -> None:
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                session.execute(
+                    INCREMENT_CACHE_VERSION,
+                    {"topic": topic},
+                )
+                version = session.execute(SELECT_LAST_INSERT_ID).scalar()
+                session.commit()
+
+                return version
+            finally:
+                await self.__database.close_session()
+
+        version = await self.__database.execute_with_retry(query)
+
+        # Своё изменение не инвалидирует локальный кэш, если между опросами
+        # версию не менял никто другой; иначе дождёмся опроса и сбросим кэш.
+        if version is not None and version == self.__versions.get(topic, 0) + 1:
+            self.__versions[topic] = version
+
+    async def start(self) -> None:
+        if self.__task is None:
+            await self.__poll()
+            self.__task = asyncio.create_task(self.__poll_loop())
+
+    async def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+    async def __poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.__poll_interval)
+
+            if not self.__database.is_healthy:
+                continue
+
+            try:
+                await self.__poll()
+            except Exception as exception:
+                logger.warning("Не удалось прочитать версии кэшей: %s", exception)
+
+    async def __poll(self) -> None:
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                return dict(session.execute(SELECT_CACHE_VERSIONS).all())
+            finally:
+                await self.__database.close_session()
+
+        versions = await self.__database.execute_with_retry(query)
+
+        if versions is None:
+            return
+
+        is_first_poll = not self.__is_polled
+        self.__is_polled = True
+
+        for topic, version in versions.items():
+            known_version = self.__versions.get(topic)
+            self.__versions[topic] = version
+
+            if not is_first_poll and version != known_version:
+                logger.info("Кэш %s инвалидирован другим процессом (версия %s)", topic, version)
+                self._notify(topic)
+
+
+def create_fsm_storage(database: Database) -> BaseStorage:
+    """
+    Хранилище FSM согласно STATE_BACKEND.
+    """
+    if STATE_BACKEND == "database":
+        return DatabaseStorage(database)
+
+    return MemoryStorage()
+
+
+def create_invalidation_bus(database: Database) -> LocalInvalidationBus:
+    """
+    Шина инвалидации кэшей согласно STATE_BACKEND.
+    """
+    if STATE_BACKEND == "database":
+        return DatabaseInvalidationBus(database)
+
+    return LocalInvalidationBus()
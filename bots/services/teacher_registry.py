@@ -0,0 +1,197 @@
+import asyncio
+import os
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from bots.config.availability_days_config import AvailabilityDaysConfig
+from bots.config.consts import (APPLE_APP_PASSWORD, STUDENT_WORK_CALENDAR, URL,
+                                USERNAME, WORK_CALENDAR)
+from bots.config.logging_config import get_logger
+from bots.models.database import Database
+from bots.models.models import Teacher, TeacherCalendar
+from bots.services.apple_calendar import AppleCalendar
+from bots.services.availability_service import AvailabilityService
+from bots.services.cal_dav_service import CalDavService
+from bots.services.shared_state import LocalInvalidationBus
+
+logger = get_logger(__name__)
+
+TEACHERS = Teacher.__table__
+CALENDARS = TeacherCalendar.__table__
+
+SELECT_ACTIVE_TEACHERS = select(TEACHERS).where(TEACHERS.c.is_active.is_(True)).order_by(TEACHERS.c.id)
+SELECT_ACTIVE_CALENDARS = (
+    select(CALENDARS)
+    .select_from(CALENDARS.join(TEACHERS, TEACHERS.c.id == CALENDARS.c.teacher_id))
+    .where(TEACHERS.c.is_active.is_(True))
+    .order_by(CALENDARS.c.teacher_id, CALENDARS.c.id)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TeacherContext:
+    """
+    Всё, что нужно для бронирования у преподавателя: клиент CalDAV, кэш свободных слотов
+    и тема инвалидации этого кэша. Создаётся один раз на преподавателя и переиспользуется всеми апдейтами.
+    """
+    id: int | None
+    name: str
+    hour_rate: int | None
+    config: AvailabilityDaysConfig
+    caldav: CalDavService
+    availability: AvailabilityService
+    invalidation_topic: str
+
+
+class TeacherRegistry:
+    """
+    Реестр преподавателей из таблиц teachers и teacher_calendars.
+
+    Преподаватель по умолчанию — активный с наименьшим id; к нему относятся ученики и записи
+    без teacher_id. Если таблица пуста, используется единственный преподаватель из consts, как
+    до появления реестра. Состав преподавателей читается при запуске; изменения применяются перезапуском.
+    """
+
+    def __init__(self, database: Database, invalidation_bus: LocalInvalidationBus):
+        self.__database = database
+        self.__invalidation_bus = invalidation_bus
+        self.__teachers: dict[int, TeacherContext] = {}
+        self.__default: TeacherContext | None = None
+
+    @property
+    def teachers(self) -> list[TeacherContext]:
+        return list(self.__teachers.values())
+
+    @property
+    def has_choice(self) -> bool:
+        return len(self.__teachers) > 1
+
+    def get(self, teacher_id: int | None) -> TeacherContext:
+        """
+        Преподаватель по id; неизвестный или отключённый id — преподаватель по умолчанию.
+        """
+        return self.__teachers.get(teacher_id) or self.__default
+
+    async def load(self) -> None:
+        """
+        Читает преподавателей и подключается к их CalDAV параллельно: время запуска
+        не растёт с числом преподавателей. Преподаватель, к чьему CalDAV не удалось
+        подключиться, пропускается с ошибкой в логе.
+
+        :raises RuntimeError: Не удалось прочитать преподавателей или подключить ни одного из них.
+        :raises DatabaseUnavailableError: БД недоступна.
+        """
+        async def query():
+            session = await self.__database.get_session()
+
+            try:
+                return session.execute(SELECT_ACTIVE_TEACHERS).all(), session.execute(SELECT_ACTIVE_CALENDARS).all()
+            finally:
+                await self.__database.close_session()
+
+        result = await self.__database.execute_with_retry(query)
+
+        # Ошибка чтения — не пустая таблица: иначе записи всех преподавателей ушли бы в календарь из настроек.
+        if result is None:
+            raise RuntimeError("Не удалось прочитать преподавателей из БД")
+
+        teacher_rows, calendar_rows = result
+
+        if not teacher_rows:
+            logger.info("Таблица teachers пуста, используется преподаватель из настроек")
+            self.__default = self.__subscribe(await asyncio.to_thread(self.__build_default))
+            return
+
+        calendars_by_teacher: dict[int, list] = {}
+
+        for row in calendar_rows:
+            calendars_by_teacher.setdefault(row.teacher_id, []).append(row)
+
+        contexts = await asyncio.gather(
+            *(asyncio.to_thread(self.__build, row, calendars_by_teacher.get(row.id, [])) for row in teacher_rows),
+            return_exceptions=True,
+        )
+
+        for row, context in zip(teacher_rows, contexts):
+            if isinstance(context, Exception):
+                logger.error("Преподаватель %s (%s) не подключён: %s", row.id, row.name, context)
+                continue
+
+            self.__teachers[row.id] = self.__subscribe(context)
+
+        if not self.__teachers:
+            raise RuntimeError("Не удалось подключить ни одного преподавателя")
+
+        self.__default = next(iter(self.__teachers.values()))
+        logger.info("Подключено преподавателей: %s из %s", len(self.__teachers), len(teacher_rows))
+
+    def close(self) -> None:
+        for context in list(self.__teachers.values()) or [self.__default]:
+            if context is not None:
+                context.caldav.close()
+
+    def __subscribe(self, context: TeacherContext) -> TeacherContext:
+        self.__invalidation_bus.subscribe(context.invalidation_topic, context.availability.invalidate)
+        return context
+
+    @staticmethod
+    def __build(row, calendar_rows) -> TeacherContext:
+        if not calendar_rows:
+            raise ValueError("у преподавателя нет календарей")
+
+        app_password = os.getenv(row.caldav_password_env)
+
+        if not app_password:
+            raise ValueError(f"не задана переменная окружения {row.caldav_password_env}")
+
+        calendars = [AppleCalendar(calendar.url, calendar.cal_id, calendar.name) for calendar in calendar_rows]
+        booking_calendars = [
+            calendar for calendar, calendar_row in zip(calendars, calendar_rows) if calendar_row.is_booking_target
+        ]
+
+        if len(booking_calendars) != 1:
+            raise ValueError(f"ожидался один календарь бронирований, найдено {len(booking_calendars)}")
+
+        config = AvailabilityDaysConfig.from_settings(row.availability)
+        cal_dav_service = CalDavService(
+            row.caldav_url,
+            row.caldav_username,
+            app_password,
+            calendars=calendars,
+            booking_calendar=booking_calendars[0],
+            local_tz_name=config.timezone,
+            name=f"caldav:{row.id}",
+        )
+
+        return TeacherContext(
+            id=row.id,
+            name=row.name,
+            hour_rate=row.hour_rate,
+            config=config,
+            caldav=cal_dav_service,
+            availability=AvailabilityService(cal_dav_service, config),
+            invalidation_topic=f"{AvailabilityService.INVALIDATION_TOPIC}:{row.id}",
+        )
+
+    @staticmethod
+    def __build_default() -> TeacherContext:
+        config = AvailabilityDaysConfig()
+        cal_dav_service = CalDavService(
+            URL,
+            USERNAME,
+            APPLE_APP_PASSWORD,
+            calendars=[WORK_CALENDAR, STUDENT_WORK_CALENDAR],
+            booking_calendar=STUDENT_WORK_CALENDAR,
+            local_tz_name=config.timezone,
+        )
+
+        return TeacherContext(
+            id=None,
+            name="",
+            hour_rate=None,
+            config=config,
+            caldav=cal_dav_service,
+            availability=AvailabilityService(cal_dav_service, config),
+            invalidation_topic=AvailabilityService.INVALIDATION_TOPIC,
+        )
@@ -1,3 +1,4 @@
+from sqlalchemy import bindparam, insert, select, update
 from sqlalchemy.exc import IntegrityError
 
 from bots.config.logging_config import get_logger
@@ -7,131 +8,162 @@ from bots.utils.cryptographer import encrypt_telegram_id
 
 logger = get_logger(__name__)
 
+# Запросы к Core-таблице собираются один раз при импорте: SQLAlchemy кэширует их компиляцию,
+# а строки сразу раскладываются в UserDTO без ORM-объектов и identity map.
+USERS = User.__table__
+USER_COLUMNS = (USERS.c.id, USERS.c.name, USERS.c.surname, USERS.c.language, USERS.c.state,
+                USERS.c.hour_rate, USERS.c.is_banned, USERS.c.teacher_id)
+UPDATABLE_COLUMNS = frozenset(USERS.c.keys()) - {"id", "created_at", "updated_at"}
+
+SELECT_USER_BY_ID = select(*USER_COLUMNS).where(USERS.c.id == bindparam("user_id"))
+SELECT_USER_BY_TELEGRAM_ID = select(*USER_COLUMNS).where(USERS.c.telegram_id == bindparam("encrypted_id"))
+SELECT_STATE_BY_TELEGRAM_ID = select(USERS.c.state).where(USERS.c.telegram_id == bindparam("encrypted_id"))
+INSERT_USER = insert(USERS)
+# Колонки SET берутся из ключей параметров при выполнении.
+UPDATE_USER_BY_ID = update(USERS).where(USERS.c.id == bindparam("user_id"))
+UPDATE_USER_BY_TELEGRAM_ID = update(USERS).where(USERS.c.telegram_id == bindparam("encrypted_id"))
+
+DEFAULT_HOUR_RATE = USERS.c.hour_rate.default.arg
+
+
+def row_to_user_dto(row, telegram_id: int | None = None) -> UserDTO | None:
+    """
+    Собирает UserDTO из строки с колонками USER_COLUMNS.
+
+    :param row: Строка результата или None.
+    :param telegram_id: Исходный (незашифрованный) telegram_id, если он известен.
+    """
+    if row is None:
+        return None
+
+    user_id, name, surname, language, state, hour_rate, is_banned, teacher_id = row
+
+    return UserDTO(user_id, telegram_id, name, surname, language, state, hour_rate, bool(is_banned), teacher_id)
+
+
+def _validate_columns(values: dict) -> None:
+    unknown_columns = values.keys() - UPDATABLE_COLUMNS
+
+    if not values:
+        raise ValueError("Не указаны поля пользователя для обновления")
+
+    if unknown_columns:
+        raise ValueError(f"Неизвестные поля пользователя: {', '.join(sorted(unknown_columns))}")
+
 
 class UserService:
     def __init__(self, database: Database):
         self.__database = database
 
-    def __to_dto(self, user: User, original_telegram_id: int | None = None) -> UserDTO | None:
-        if user:
-            return UserDTO(
-                id=user.id,
-                telegram_id=original_telegram_id,
-                name=user.name,
-                surname=user.surname,
-                language=user.language,
-                state=user.state,
-                hour_rate=user.hour_rate,
-                is_banned=user.is_banned,
-            )
-        return None
-
     async def get_user_by_id(self, user_id: int) -> UserDTO | None:
         async def query():
-            session = await self.__database.get_session()
+            session = await self.__database.get_read_session()
 
             try:
-                user = session.query(User).filter(User.id == user_id).first()
-                return self.__to_dto(user)
+                row = session.execute(SELECT_USER_BY_ID, {"user_id": user_id}).first()
+                return row_to_user_dto(row)
             finally:
                 await self.__database.close_session()
 
         return await self.__database.execute_with_retry(query)
 
     async def get_user_by_telegram_id(self, telegram_id: int) -> UserDTO | None:
+        encrypted_id = encrypt_telegram_id(telegram_id)
+
         async def query():
-            session = await self.__database.get_session()
+            session = await self.__database.get_read_session()
 
             try:
-                encrypted_id = encrypt_telegram_id(telegram_id)
-                user = session.query(User).filter(User.telegram_id == encrypted_id).first()
-                return self.__to_dto(user, telegram_id)
+                row = session.execute(SELECT_USER_BY_TELEGRAM_ID, {"encrypted_id": encrypted_id}).first()
+                return row_to_user_dto(row, telegram_id)
             finally:
                 await self.__database.close_session()
 
         return await self.__database.execute_with_retry(query)
 
     async def create_user(self, telegram_id: int | None = None) -> UserDTO | None:
+        encrypted_id = encrypt_telegram_id(telegram_id) if telegram_id is not None else None
+
         async def query():
             session = await self.__database.get_session()
-            encrypted_id = None
 
             try:
-                if telegram_id is not None:
-                    encrypted_id = encrypt_telegram_id(telegram_id)
-
-                user = User(telegram_id=encrypted_id)
-                session.add(user)
+                result = session.execute(INSERT_USER, {"telegram_id": encrypted_id})
                 session.commit()
-                session.refresh(user)
 
-                return self.__to_dto(user, telegram_id)
+                return UserDTO(result.inserted_primary_key[0], telegram_id, hour_rate=DEFAULT_HOUR_RATE)
             except IntegrityError:
                 session.rollback()
-                logger.warning(f"Пользователь с telegram_id={encrypted_id} уже существует")
+                logger.warning("Пользователь с telegram_id=%s уже существует", encrypted_id)
                 return None
             finally:
                 await self.__database.close_session()
 
         return await self.__database.execute_with_retry(query)
 
-    async def update_user_by_id(self, user_id: int, **kwargs) -> UserDTO | None:
+    async def update_user_by_id(self, user_id: int, **kwargs) -> bool:
+        """
+        Обновляет поля пользователя одним UPDATE без предварительного SELECT.
+
+        :return: True, если пользователь найден.
+        """
+        _validate_columns(kwargs)
+
         async def query():
             session = await self.__database.get_session()
 
             try:
-                user = session.query(User).filter(User.id == user_id).first()
-
-                if user:
-                    for key, value in kwargs.items():
-                        setattr(user, key, value)
+                result = session.execute(UPDATE_USER_BY_ID, {"user_id": user_id, **kwargs})
+                session.commit()
 
-                    session.commit()
-                    session.refresh(user)
-                    return self.__to_dto(user)
+                if result.rowcount:
+                    return True
 
-                logger.warning(f"Пользователь с id={user_id} не найден для обновления")
-                return None
+                logger.warning("Пользователь с id=%s не найден для обновления", user_id)
+                return False
             finally:
                 await self.__database.close_session()
 
-        return await self.__database.execute_with_retry(query)
+        return bool(await self.__database.execute_with_retry(query))
+
+    async def update_user(self, telegram_id: int, **kwargs) -> bool:
+        """
+        Обновляет поля пользователя по telegram_id одним UPDATE.
+
+        :return: True, если пользователь найден.
+        """
+        _validate_columns(kwargs)
+        encrypted_id = encrypt_telegram_id(telegram_id)
 
-    async def update_user(self, telegram_id: int, **kwargs) -> UserDTO | None:
         async def query():
             session = await self.__database.get_session()
 
             try:
-                encrypted_id = encrypt_telegram_id(telegram_id)
-                user = session.query(User).filter(User.telegram_id == encrypted_id).first()
-
-                if user:
-                    for key, value in kwargs.items():
-                        setattr(user, key, value)
+                result = session.execute(UPDATE_USER_BY_TELEGRAM_ID, {"encrypted_id": encrypted_id, **kwargs})
+                session.commit()
 
-                    session.commit()
-                    session.refresh(user)
-                    return self.__to_dto(user, telegram_id)
+                if result.rowcount:
+                    return True
 
-                logger.warning(f"Пользователь с telegram_id={encrypted_id} не найден для обновления")
-                return None
+                logger.warning("Пользователь с telegram_id=%s не найден для обновления", encrypted_id)
+                return False
             finally:
                 await self.__database.close_session()
 
-        return await self.__database.execute_with_retry(query)
+        return bool(await self.__database.execute_with_retry(query))
 
     async def get_user_state(self, telegram_id: int) -> str | None:
+        encrypted_id = encrypt_telegram_id(telegram_id)
+
         async def query():
-            session = await self.__database.get_session()
+            session = await self.__database.get_read_session()
 
             try:
-                encrypted_id = encrypt_telegram_id(telegram_id)
-                user = session.query(User).filter(User.telegram_id == encrypted_id).first()
-                return user.state if user else None
+                return session.execute(SELECT_STATE_BY_TELEGRAM_ID, {"encrypted_id": encrypted_id}).scalar()
             finally:
                 await self.__database.close_session()
 
         return await self.__database.execute_with_retry(query)
 
     async def set_user_state(self, telegram_id: int, state: str):
-        await self.update_user(telegram_id, state=state)
\ No newline at end of file
+        await self.update_user(telegram_id, state=state)
@@ -1,5 +1,181 @@
+import base64
+import binascii
+import struct
+from dataclasses import astuple, dataclass
+from datetime import date
 from enum import Enum
 
+CALLBACK_DATA_MAX_BYTES = 64
+
+
+@dataclass(frozen=True, slots=True)
+class TimePayload:
+    """Разобранные данные кнопки выбора часа вместе с выбранной датой."""
+    year: int
+    month: int
+    day: int
+    hour: int
+
+    def __post_init__(self):
+        date(self.year, self.month, self.day)
+
+        if not 0 <= self.hour <= 23:
+            raise ValueError(f"Некорректный час: {self.hour}")
+
+    @property
+    def date(self) -> date:
+        return date(self.year, self.month, self.day)
+
+
+@dataclass(frozen=True, slots=True)
+class DatePayload:
+    """Разобранные данные кнопки выбора даты."""
+    year: int
+    month: int
+    day: int
+
+    def __post_init__(self):
+        date(self.year, self.month, self.day)
+
+    @property
+    def date(self) -> date:
+        return date(self.year, self.month, self.day)
+
+
+@dataclass(frozen=True, slots=True)
+class MonthPayload:
+    """Разобранные данные кнопки навигации по месяцам."""
+    year: int
+    month: int
+
+    def __post_init__(self):
+        if not 1 <= self.month <= 12:
+            raise ValueError(f"Некорректный месяц: {self.month}")
+
+
+@dataclass(frozen=True, slots=True)
+class NextSlotsPayload:
+    """Фильтры поиска ближайших слотов: 0 означает «любой»."""
+    weekday: int
+    time_of_day: int
+
+    def __post_init__(self):
+        if not 0 <= self.weekday <= 7:
+            raise ValueError(f"Некорректный день недели: {self.weekday}")
+
+        if not 0 <= self.time_of_day <= 3:
+            raise ValueError(f"Некорректное время суток: {self.time_of_day}")
+
+
+@dataclass(frozen=True, slots=True)
+class BookingsPagePayload:
+    """Курсор страницы «Моих записей»: начало (Unix-время) и id последней показанной записи; 0, 0 — первая."""
+    after_start: int
+    after_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class WeeklyPayload:
+    """Еженедельная серия: первое занятие серии и количество недель."""
+    year: int
+    month: int
+    day: int
+    hour: int
+    weeks: int
+
+    def __post_init__(self):
+        date(self.year, self.month, self.day)
+
+        if not 0 <= self.hour <= 23:
+            raise ValueError(f"Некорректный час: {self.hour}")
+
+        if not 1 <= self.weeks <= 52:
+            raise ValueError(f"Некорректное количество недель: {self.weeks}")
+
+    @property
+    def date(self) -> date:
+        return date(self.year, self.month, self.day)
+
+
+@dataclass(frozen=True, slots=True)
+class CancelBookingPayload:
+    """Бронирование, которое пользователь отменяет."""
+    booking_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class TeacherPayload:
+    """Преподаватель, выбранный учеником."""
+    teacher_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class LanguagePayload:
+    """Разобранные данные кнопки выбора языка программирования."""
+    language: str
+
+
+class CallbackCodec:
+    """
+    Компактный версионированный кодек callback_data.
+
+    Формат: ``<тег>_<base64url(версия, поля...)>``. Тег определяет тип payload и используется
+    диспетчером как префикс, поля упакованы через ``struct`` без разделителей и паддинга.
+    Декодирование проверяет тег, версию, длину и диапазоны значений.
+    """
+    VERSION = 1
+
+    def __init__(self, prefix: str, field_format: str, payload_type: type):
+        self.__prefix = prefix
+        self.__payload_type = payload_type
+        self.__structs = {self.VERSION: struct.Struct(f">B{field_format}")}
+
+    @property
+    def prefix(self) -> str:
+        return self.__prefix
+
+    def encode(self, *values: int) -> str:
+        try:
+            packed = self.__structs[self.VERSION].pack(self.VERSION, *values)
+        except struct.error as exception:
+            raise ValueError(f"Не удалось упаковать {values}: {exception}") from exception
+
+        data = self.__prefix + base64.urlsafe_b64encode(packed).rstrip(b"=").decode("ascii")
+
+        if len(data) > CALLBACK_DATA_MAX_BYTES:
+            raise ValueError(f"callback_data длиннее {CALLBACK_DATA_MAX_BYTES} байт: {data}")
+
+        return data
+
+    def encode_payload(self, payload) -> str:
+        return self.encode(*astuple(payload))
+
+    def decode(self, data: str):
+        if not data.startswith(self.__prefix):
+            raise ValueError(f"Ожидался префикс {self.__prefix!r}: {data!r}")
+
+        body = data[len(self.__prefix):]
+
+        try:
+            raw = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+        except (binascii.Error, UnicodeEncodeError) as exception:
+            raise ValueError(f"Некорректный base64 в callback_data: {data!r}") from exception
+
+        if not raw:
+            raise ValueError(f"Пустой payload в callback_data: {data!r}")
+
+        packer = self.__structs.get(raw[0])
+
+        if packer is None:
+            raise ValueError(f"Неподдерживаемая версия callback_data: {raw[0]}")
+
+        if len(raw) != packer.size:
+            raise ValueError(f"Некорректная длина payload: {len(raw)} вместо {packer.size}")
+
+        _, *values = packer.unpack(raw)
+
+        return self.__payload_type(*values)
+
 
 class CallbackData(Enum):
     """Класс, хранящий callback_data для клавиатур."""
@@ -9,19 +185,105 @@ class CallbackData(Enum):
     LANGUAGE_CSHARP = "language_C#"
     LANGUAGE_JAVA = "language_java"
     FINISH_BOOKING = "finish_booking"
+    CONFIRM_CHANGES = "confirm_changes"
+    REJECT_CHANGES = "reject_changes"
     IGNORE = "ignore"
-    TIME_PREFIX = "time_"
-    DATE_PREFIX = "date_"
-    MONTH_PREFIX = "month_"
+    CHOOSE_TEACHER = "choose_teacher"
+    TIME_PREFIX = "t_"
+    DATE_PREFIX = "d_"
+    MONTH_PREFIX = "m_"
+    LANGUAGE_PREFIX = "language_"
+    SLOT_PREFIX = "s_"
+    NEXT_SLOTS_PREFIX = "n_"
+    BOOKINGS_PREFIX = "b_"
+    CANCEL_BOOKING_PREFIX = "x_"
+    WEEKLY_PREFIX = "r_"
+    TEACHER_PREFIX = "p_"
 
     @staticmethod
-    def time(hour: int) -> str:
-        return f"{CallbackData.TIME_PREFIX.value}{hour}"
+    def time(selected_date: date, hour: int) -> str:
+        return TIME_CODEC.encode(selected_date.year, selected_date.month, selected_date.day, hour)
 
     @staticmethod
     def date(year: int, month: int, day: int) -> str:
-        return f"{CallbackData.DATE_PREFIX.value}{year}_{month}_{day}"
+        return DATE_CODEC.encode(year, month, day)
 
     @staticmethod
     def month(year: int, month: int) -> str:
-        return f"{CallbackData.MONTH_PREFIX.value}{year}_{month}"
+        return MONTH_CODEC.encode(year, month)
+
+    @staticmethod
+    def slot(selected_date: date, hour: int) -> str:
+        return SLOT_CODEC.encode(selected_date.year, selected_date.month, selected_date.day, hour)
+
+    @staticmethod
+    def next_slots(weekday: int = 0, time_of_day: int = 0) -> str:
+        return NEXT_SLOTS_CODEC.encode(weekday, time_of_day)
+
+    @staticmethod
+    def bookings_page(after_start: int = 0, after_id: int = 0) -> str:
+        return BOOKINGS_PAGE_CODEC.encode(after_start, after_id)
+
+    @staticmethod
+    def cancel_booking(booking_id: int) -> str:
+        return CANCEL_BOOKING_CODEC.encode(booking_id)
+
+    @staticmethod
+    def weekly(first_date: date, hour: int, weeks: int) -> str:
+        return WEEKLY_CODEC.encode(first_date.year, first_date.month, first_date.day, hour, weeks)
+
+    @staticmethod
+    def teacher(teacher_id: int) -> str:
+        return TEACHER_CODEC.encode(teacher_id)
+
+    @staticmethod
+    def parse_slot(data: str) -> TimePayload:
+        return SLOT_CODEC.decode(data)
+
+    @staticmethod
+    def parse_next_slots(data: str) -> NextSlotsPayload:
+        return NEXT_SLOTS_CODEC.decode(data)
+
+    @staticmethod
+    def parse_bookings_page(data: str) -> BookingsPagePayload:
+        return BOOKINGS_PAGE_CODEC.decode(data)
+
+    @staticmethod
+    def parse_cancel_booking(data: str) -> CancelBookingPayload:
+        return CANCEL_BOOKING_CODEC.decode(data)
+
+    @staticmethod
+    def parse_weekly(data: str) -> WeeklyPayload:
+        return WEEKLY_CODEC.decode(data)
+
+    @staticmethod
+    def parse_teacher(data: str) -> TeacherPayload:
+        return TEACHER_CODEC.decode(data)
+
+    @staticmethod
+    def parse_time(data: str) -> TimePayload:
+        return TIME_CODEC.decode(data)
+
+    @staticmethod
+    def parse_date(data: str) -> DatePayload:
+        return DATE_CODEC.decode(data)
+
+    @staticmethod
+    def parse_month(data: str) -> MonthPayload:
+        return MONTH_CODEC.decode(data)
+
+    @staticmethod
+    def parse_language(data: str) -> LanguagePayload:
+        _, language = data.split("_", 1)
+        return LanguagePayload(language=language)
+
+
+TIME_CODEC = CallbackCodec(CallbackData.TIME_PREFIX.value, "HBBB", TimePayload)
+DATE_CODEC = CallbackCodec(CallbackData.DATE_PREFIX.value, "HBB", DatePayload)
+MONTH_CODEC = CallbackCodec(CallbackData.MONTH_PREFIX.value, "HB", MonthPayload)
+SLOT_CODEC = CallbackCodec(CallbackData.SLOT_PREFIX.value, "HBBB", TimePayload)
+NEXT_SLOTS_CODEC = CallbackCodec(CallbackData.NEXT_SLOTS_PREFIX.value, "BB", NextSlotsPayload)
+BOOKINGS_PAGE_CODEC = CallbackCodec(CallbackData.BOOKINGS_PREFIX.value, "II", BookingsPagePayload)
+CANCEL_BOOKING_CODEC = CallbackCodec(CallbackData.CANCEL_BOOKING_PREFIX.value, "I", CancelBookingPayload)
+WEEKLY_CODEC = CallbackCodec(CallbackData.WEEKLY_PREFIX.value, "HBBBB", WeeklyPayload)
+TEACHER_CODEC = CallbackCodec(CallbackData.TEACHER_PREFIX.value, "I", TeacherPayload)
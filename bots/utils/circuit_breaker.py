@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import deque
+from enum import Enum
+
+from bots.config.logging_config import get_logger
+from bots.utils.metrics import CIRCUIT_BREAKER_TRANSITIONS
+
+logger = get_logger(__name__)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель для внешнего сервиса.
+
+    Размыкается, когда в скользящем окне последних вызовов доля ошибок достигает порога.
+    Через ``open_seconds`` пропускает пробный вызов (half-open): успех замыкает цепь,
+    ошибка снова размыкает её. Потокобезопасен — вызовы CalDAV выполняются в потоках.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 5,
+        window_size: int = 20,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.__failure_rate_threshold = failure_rate_threshold
+        self.__minimum_calls = minimum_calls
+        self.__open_seconds = open_seconds
+        self.__results: deque[bool] = deque(maxlen=window_size)
+        self.__state = CircuitState.CLOSED
+        self.__opened_at = 0.0
+        self.__is_probe_running = False
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self.__lock:
+            if self.__state is CircuitState.OPEN and self.__is_open_expired():
+                return CircuitState.HALF_OPEN
+
+            return self.__state
+
+    def allow(self) -> bool:
+        """
+        Разрешён ли вызов сейчас. В состоянии half-open разрешается только один пробный вызов.
+        """
+        with self.__lock:
+            if self.__state is CircuitState.CLOSED:
+                return True
+
+            if self.__state is CircuitState.OPEN:
+                if not self.__is_open_expired():
+                    return False
+
+                self.__transition(CircuitState.HALF_OPEN)
+
+            if self.__is_probe_running:
+                return False
+
+            self.__is_probe_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self.__lock:
+            if self.__state is CircuitState.HALF_OPEN:
+                self.__results.clear()
+                self.__transition(CircuitState.CLOSED)
+
+            self.__is_probe_running = False
+            self.__results.append(True)
+
+    def record_failure(self) -> None:
+        with self.__lock:
+            self.__is_probe_running = False
+
+            if self.__state is CircuitState.HALF_OPEN:
+                self.__open()
+                return
+
+            self.__results.append(False)
+
+            if len(self.__results) >= self.__minimum_calls:
+                failure_rate = self.__results.count(False) / len(self.__results)
+
+                if failure_rate >= self.__failure_rate_threshold:
+                    self.__open()
+
+    def __open(self) -> None:
+        self.__opened_at = time.monotonic()
+        self.__results.clear()
+        self.__transition(CircuitState.OPEN)
+
+    def __is_open_expired(self) -> bool:
+        return time.monotonic() - self.__opened_at >= self.__open_seconds
+
+    def __transition(self, state: CircuitState) -> None:
+        if self.__state is state:
+            return
+
+        logger.warning("Автомат %s: %s -> %s", self.name, self.__state.value, state.value)
+        self.__state = state
+        CIRCUIT_BREAKER_TRANSITIONS.inc(name=self.name, state=state.value)
@@ -0,0 +1,246 @@
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from bots.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    """
+    Монотонно растущий счётчик с метками в формате Prometheus.
+    """
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.__values: dict[tuple[str, ...], float] = {}
+        self.__lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_values(self.labelnames, labels)
+
+        with self.__lock:
+            self.__values[key] = self.__values.get(key, 0.0) + amount
+
+    def collect(self) -> list[str]:
+        with self.__lock:
+            items = list(self.__values.items())
+
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram:
+    """
+    Гистограмма длительностей с накопительными бакетами в формате Prometheus.
+    """
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.__buckets = tuple(sorted(buckets))
+        self.__series: dict[tuple[str, ...], list] = {}
+        self.__lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_values(self.labelnames, labels)
+        index = bisect.bisect_left(self.__buckets, value)
+
+        with self.__lock:
+            series = self.__series.get(key)
+
+            if series is None:
+                series = [[0] * (len(self.__buckets) + 1), 0.0, 0]
+                self.__series[key] = series
+
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Замеряет длительность блока кода.
+        """
+        started_at = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def collect(self) -> list[str]:
+        with self.__lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self.__series.items()]
+
+        lines = []
+
+        for key, (counts, total, count) in items:
+            cumulative = 0
+
+            for bound, bucket_count in zip(self.__buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_float(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+            labels = _format_labels(self.labelnames + ("le",), key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик, отдающий их в текстовом формате Prometheus.
+    """
+
+    def __init__(self):
+        self.__metrics: dict[str, Counter | Histogram] = {}
+
+    def register(self, metric: Counter | Histogram) -> Counter | Histogram:
+        if metric.name in self.__metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+
+        self.__metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames))
+
+    def render(self) -> str:
+        lines = []
+
+        for metric in self.__metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(metric.collect())
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Минимальный HTTP-сервер на asyncio, отдающий метрики по пути /metrics.
+    """
+
+    def __init__(self, registry: "MetricsRegistry", host: str, port: int):
+        self.__registry = registry
+        self.__host = host
+        self.__port = port
+        self.__server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        self.__server = await asyncio.start_server(self.__handle, self.__host, self.__port)
+        logger.info("Метрики доступны на http://%s:%s/metrics", self.__host, self.__port)
+
+    async def stop(self) -> None:
+        if self.__server:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.__registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as exception:
+            logger.debug("Ошибка при отдаче метрик: %s", exception)
+        finally:
+            writer.close()
+
+
+def _label_values(labelnames: tuple[str, ...], labels: dict) -> tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not labelnames:
+        return ""
+
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(labelnames, values))
+    return "{" + pairs + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+HANDLER_DURATION = REGISTRY.histogram(
+    "bot_handler_duration_seconds", "Длительность обработки апдейта", ("handler", "route"),
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "bot_handler_errors_total", "Исключения в обработчиках", ("handler", "route", "error"),
+)
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "Длительность запросов к БД", ("operation",),
+)
+DB_ERRORS = REGISTRY.counter(
+    "db_errors_total", "Ошибки запросов к БД", ("operation", "error"),
+)
+CALDAV_REQUEST_DURATION = REGISTRY.histogram(
+    "caldav_request_duration_seconds", "Длительность запросов к CalDAV", ("method",),
+)
+CALDAV_ERRORS = REGISTRY.counter(
+    "caldav_errors_total", "Ошибки запросов к CalDAV", ("method", "error"),
+)
+BOT_API_DURATION = REGISTRY.histogram(
+    "bot_api_request_duration_seconds", "Длительность запросов к Telegram Bot API", ("method",),
+)
+BOT_API_ERRORS = REGISTRY.counter(
+    "bot_api_errors_total", "Ошибки запросов к Telegram Bot API", ("method", "error"),
+)
+SUPERVISOR_UPDATES = REGISTRY.counter(
+    "supervisor_updates_total", "Апдейты, переданные воркерам", ("shard",),
+)
+SUPERVISOR_REJECTED_UPDATES = REGISTRY.counter(
+    "supervisor_rejected_updates_total", "Апдейты, отклонённые из-за переполненной очереди воркера", ("shard",),
+)
+CIRCUIT_BREAKER_TRANSITIONS = REGISTRY.counter(
+    "circuit_breaker_transitions_total", "Переходы автоматических выключателей между состояниями", ("name", "state"),
+)
+DB_READ_ROUTES = REGISTRY.counter(
+    "db_read_routes_total", "Чтения, направленные на реплику или основную БД", ("target", "reason"),
+)
@@ -0,0 +1,62 @@
+import hashlib
+
+# Поля апдейта, из которых берётся автор события (в порядке проверки).
+USER_UPDATE_FIELDS = (
+    "message",
+    "edited_message",
+    "callback_query",
+    "inline_query",
+    "chosen_inline_result",
+    "shipping_query",
+    "pre_checkout_query",
+    "poll_answer",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+    "message_reaction",
+)
+
+
+def extract_user_id(raw_update: dict) -> int | None:
+    """
+    Возвращает id пользователя, от которого пришёл апдейт (в сыром виде Bot API).
+
+    :param raw_update: Апдейт в формате JSON Bot API.
+    :return: id пользователя, id чата для событий без автора или None.
+    """
+    for field in USER_UPDATE_FIELDS:
+        event = raw_update.get(field)
+
+        if not event:
+            continue
+
+        user = event.get("from") or event.get("user")
+
+        if user:
+            return user["id"]
+
+        chat = event.get("chat")
+        return chat["id"] if chat else None
+
+    return None
+
+
+def get_shard(key: int, shards: int) -> int:
+    """
+    Стабильно отображает ключ (id пользователя) на номер шарда.
+    Хэш одинаков во всех процессах и перезапусках, в отличие от встроенного ``hash``.
+
+    :param key: Ключ шардирования.
+    :param shards: Количество шардов.
+    """
+    digest = hashlib.blake2b(key.to_bytes(8, "big", signed=True), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def get_update_shard(raw_update: dict, shards: int) -> int:
+    """
+    Номер шарда для апдейта: все апдейты одного пользователя попадают в один воркер.
+    Апдейты без пользователя распределяются по update_id.
+    """
+    user_id = extract_user_id(raw_update)
+    return get_shard(user_id if user_id is not None else raw_update.get("update_id", 0), shards)
@@ -0,0 +1,295 @@
+import asyncio
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from bots.config.logging_config import get_logger
+from bots.config.monitoring_config import TRACING_SAMPLE_RATE
+
+logger = get_logger(__name__)
+
+
+class Span:
+    """
+    Отрезок работы внутри трассы апдейта.
+    Неотобранные (unsampled) спаны создаются, но не экспортируются.
+    """
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "sampled",
+                 "start_ns", "end_ns", "status", "error")
+
+    def __init__(self, trace_id: str, span_id: str, parent_id: str | None, name: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.sampled = sampled
+        self.attributes: dict[str, str | int | float | bool] = {}
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.status = "OK"
+        self.error: str | None = None
+
+    def set_attribute(self, key: str, value) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def set_error(self, exception: BaseException) -> None:
+        self.status = "ERROR"
+        self.error = f"{type(exception).__name__}: {exception}"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1_000_000 if self.end_ns else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class JsonLinesExporter:
+    """
+    Записывает спаны в файл построчно в формате JSON для офлайн-анализа.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.__path = path
+
+    def export(self, spans: list[Span]) -> None:
+        with open(self.__path, "a", encoding="utf-8") as file:
+            for span in spans:
+                file.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+
+class OtlpHttpExporter:
+    """
+    Отправляет спаны в OTLP/HTTP-коллектор (JSON-кодирование, путь /v1/traces).
+    """
+    __STATUS_CODES = {"OK": 1, "ERROR": 2}
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.__endpoint = endpoint.rstrip("/") + "/v1/traces"
+        self.__service_name = service_name
+        self.__timeout = timeout
+
+    def export(self, spans: list[Span]) -> None:
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [self.__attribute("service.name", self.__service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "bots"},
+                    "spans": [self.__to_otlp(span) for span in spans],
+                }],
+            }],
+        }
+        request = urllib.request.Request(
+            self.__endpoint,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+
+        with urllib.request.urlopen(request, timeout=self.__timeout):
+            pass
+
+    def __to_otlp(self, span: Span) -> dict:
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [self.__attribute(key, value) for key, value in span.attributes.items()],
+            "status": {"code": self.__STATUS_CODES[span.status], "message": span.error or ""},
+        }
+
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+
+        return otlp_span
+
+    @staticmethod
+    def __attribute(key: str, value) -> dict:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Tracer:
+    """
+    Трассировщик с head-based семплированием.
+
+    Решение об экспорте принимается при создании корневого спана и наследуется дочерними.
+    Завершённые спаны складываются в очередь, а экспорт выполняет фоновый поток,
+    поэтому event loop не ждёт ни диска, ни сети.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, batch_size: int = 256, flush_interval: float = 2.0):
+        self.__sample_rate = sample_rate
+        self.__batch_size = batch_size
+        self.__flush_interval = flush_interval
+        self.__exporters = []
+        self.__current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+        self.__queue: queue.SimpleQueue[Span | None] = queue.SimpleQueue()
+        self.__worker: threading.Thread | None = None
+
+    def add_exporter(self, exporter) -> None:
+        self.__exporters.append(exporter)
+
+        if self.__worker is None:
+            self.__worker = threading.Thread(target=self.__export_loop, name="tracing-exporter", daemon=True)
+            self.__worker.start()
+
+    def shutdown(self) -> None:
+        if self.__worker is not None:
+            self.__queue.put(None)
+            self.__worker.join(timeout=self.__flush_interval * 2)
+            self.__worker = None
+
+    @property
+    def current_span(self) -> Span | None:
+        return self.__current_span.get()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Открывает дочерний спан текущего спана (или корневой, если текущего нет).
+        """
+        parent = self.__current_span.get()
+
+        if parent is None:
+            span = Span(
+                random.getrandbits(128).to_bytes(16, "big").hex(),
+                random.getrandbits(64).to_bytes(8, "big").hex(),
+                None,
+                name,
+                bool(self.__exporters) and random.random() < self.__sample_rate,
+            )
+        else:
+            span = Span(
+                parent.trace_id,
+                random.getrandbits(64).to_bytes(8, "big").hex(),
+                parent.span_id,
+                name,
+                parent.sampled,
+            )
+
+        for key, value in attributes.items():
+            span.set_attribute(key, value)
+
+        token = self.__current_span.set(span)
+
+        try:
+            yield span
+        except BaseException as exception:
+            span.set_error(exception)
+            raise
+        finally:
+            self.__current_span.reset(token)
+            self.finish(span)
+
+    def start_detached(self, name: str, **attributes) -> Span:
+        """
+        Создаёт дочерний спан без смены текущего контекста.
+        Нужен для колбэков, где начало и конец разнесены (например, события SQLAlchemy).
+        Завершается вызовом ``finish``.
+        """
+        parent = self.__current_span.get()
+
+        if parent is None or not parent.sampled:
+            return Span("", "", None, name, False)
+
+        span = Span(parent.trace_id, random.getrandbits(64).to_bytes(8, "big").hex(), parent.span_id, name, True)
+        span.attributes.update(attributes)
+
+        return span
+
+    def finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+
+        if span.sampled:
+            self.__queue.put(span)
+
+    def __export_loop(self) -> None:
+        batch = []
+        flushed_at = time.monotonic()
+
+        while True:
+            try:
+                span = self.__queue.get(timeout=self.__flush_interval)
+            except queue.Empty:
+                span = ...
+
+            if span is None:
+                self.__flush(batch)
+                return
+
+            if span is not ...:
+                batch.append(span)
+
+            if len(batch) >= self.__batch_size or time.monotonic() - flushed_at >= self.__flush_interval:
+                self.__flush(batch)
+                batch = []
+                flushed_at = time.monotonic()
+
+    def __flush(self, batch: list[Span]) -> None:
+        if not batch:
+            return
+
+        for exporter in self.__exporters:
+            try:
+                exporter.export(batch)
+            except Exception as exception:
+                logger.warning("Не удалось экспортировать %s спанов через %s: %s",
+                               len(batch), type(exporter).__name__, exception)
+
+
+tracer = Tracer(sample_rate=TRACING_SAMPLE_RATE)
+
+
+def traced(name: str | None = None):
+    """
+    Декоратор, оборачивающий вызов функции (синхронной или асинхронной) в спан.
+
+    :param name: Имя спана (по умолчанию — qualname функции).
+    """
+
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        if asyncio.iscoroutinefunction(function):
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(span_name):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
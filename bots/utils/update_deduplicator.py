@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import Hashable
+
+from bots.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class UpdateDeduplicator:
+    """
+    Ограниченный по памяти реестр для подавления повторных апдейтов.
+
+    Хранит:
+    - идентификаторы уже принятых апдейтов (callback id / message id) — защита от повторной доставки;
+    - ключи действий (пользователь, payload), которые выполняются сейчас или завершились недавно —
+      защита от двойных нажатий, в том числе пришедших после завершения обработчика;
+    - блокировки пользователей, которые удаляются, как только их никто не держит и не ждёт.
+
+    Записи живут ограниченное время (TTL) и вытесняются по LRU при достижении лимита.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        update_ttl_seconds: float = 300.0,
+        action_ttl_seconds: float = 2.0,
+    ):
+        self.__max_entries = max_entries
+        self.__update_ttl_seconds = update_ttl_seconds
+        self.__action_ttl_seconds = action_ttl_seconds
+
+        self.__seen_updates: OrderedDict[Hashable, float] = OrderedDict()
+        self.__recent_actions: OrderedDict[Hashable, float] = OrderedDict()
+        self.__in_flight_actions: set[Hashable] = set()
+        self.__user_locks: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+        self.__counters = Counter()
+
+    def try_begin(self, update_key: Hashable | None, action_key: Hashable) -> bool:
+        """
+        Регистрирует начало обработки апдейта.
+
+        :param update_key: Уникальный идентификатор апдейта (None, если его нет).
+        :param action_key: Ключ действия пользователя, например (user_id, callback_data).
+        :return: False, если апдейт — дубликат и его нужно пропустить.
+        """
+        now = time.monotonic()
+        self.__expire(self.__seen_updates, now)
+        self.__expire(self.__recent_actions, now)
+
+        if update_key is not None and update_key in self.__seen_updates:
+            self.__counters["suppressed_redelivered"] += 1
+            return False
+
+        if action_key in self.__in_flight_actions:
+            self.__counters["suppressed_in_flight"] += 1
+            return False
+
+        if action_key in self.__recent_actions:
+            self.__counters["suppressed_recent"] += 1
+            return False
+
+        if update_key is not None:
+            self.__remember(self.__seen_updates, update_key, now + self.__update_ttl_seconds)
+
+        self.__in_flight_actions.add(action_key)
+        self.__counters["accepted"] += 1
+
+        return True
+
+    def finish(self, action_key: Hashable) -> None:
+        """
+        Отмечает завершение действия: повторы в течение короткого окна будут подавлены.
+        """
+        self.__in_flight_actions.discard(action_key)
+        self.__remember(self.__recent_actions, action_key, time.monotonic() + self.__action_ttl_seconds)
+
+    @asynccontextmanager
+    async def user_lock(self, user_id: Hashable):
+        """
+        Сериализует обработчики одного пользователя.
+        Блокировка удаляется из реестра, когда её больше никто не держит и не ждёт.
+        """
+        lock, holders = self.__user_locks.get(user_id, (None, 0))
+
+        if lock is None:
+            lock = asyncio.Lock()
+
+        self.__user_locks[user_id] = (lock, holders + 1)
+
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, holders = self.__user_locks[user_id]
+
+            if holders <= 1:
+                del self.__user_locks[user_id]
+            else:
+                self.__user_locks[user_id] = (lock, holders - 1)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Возвращает счётчики подавленных дубликатов и текущий размер реестра.
+        """
+        return {
+            **self.__counters,
+            "seen_updates": len(self.__seen_updates),
+            "recent_actions": len(self.__recent_actions),
+            "in_flight_actions": len(self.__in_flight_actions),
+            "user_locks": len(self.__user_locks),
+        }
+
+    def __remember(self, entries: OrderedDict, key: Hashable, expires_at: float) -> None:
+        entries[key] = expires_at
+        entries.move_to_end(key)
+
+        while len(entries) > self.__max_entries:
+            entries.popitem(last=False)
+            self.__counters["evicted"] += 1
+
+    @staticmethod
+    def __expire(entries: OrderedDict, now: float) -> None:
+        while entries:
+            key, expires_at = next(iter(entries.items()))
+
+            if expires_at > now:
+                break
+
+            del entries[key]
@@ -0,0 +1,65 @@
+import asyncio
+import itertools
+import time
+
+from aiohttp import web
+
+
+class FakeBotApi:
+    """
+    Внутрипроцессный HTTP-сервер, отвечающий на запросы aiogram вместо api.telegram.org.
+    Возвращает минимально валидные объекты и считает вызовы по методам.
+    """
+
+    def __init__(self, latency: float = 0.02, host: str = "127.0.0.1", port: int = 0):
+        self.__latency = latency
+        self.__host = host
+        self.__port = port
+        self.__runner: web.AppRunner | None = None
+        self.__message_ids = itertools.count(1)
+        self.calls: dict[str, int] = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.__host}:{self.__port}"
+
+    async def start(self) -> None:
+        application = web.Application()
+        application.router.add_post("/bot{token}/{method}", self.__handle)
+
+        self.__runner = web.AppRunner(application, access_log=None)
+        await self.__runner.setup()
+
+        site = web.TCPSite(self.__runner, self.__host, self.__port)
+        await site.start()
+
+        self.__port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self.__runner:
+            await self.__runner.cleanup()
+
+    async def __handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        data = await request.post()
+
+        if self.__latency:
+            await asyncio.sleep(self.__latency)
+
+        if method in ("sendMessage", "editMessageText"):
+            result = self.__message(data)
+        else:
+            result = True
+
+        return web.json_response({"ok": True, "result": result})
+
+    def __message(self, data) -> dict:
+        chat_id = int(data.get("chat_id", 0))
+
+        return {
+            "message_id": int(data.get("message_id") or next(self.__message_ids)),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": data.get("text", ""),
+        }
@@ -0,0 +1,183 @@
+import threading
+import time
+from datetime import datetime
+
+from icalendar import Calendar
+
+
+class FakeEvent:
+    """
+    Событие в формате, который возвращает caldav: сырые iCalendar-данные в ``data``.
+    """
+
+    def __init__(self, data: str, start: datetime, end: datetime, url: str = "", is_recurring: bool = False):
+        self.data = data
+        self.start = start
+        self.end = end
+        self.url = url
+        # Как и настоящий сервер без expand, повторяющееся событие возвращается целиком, а вхождения
+        # раскрывает клиент; для простоты серия считается бесконечной.
+        self.is_recurring = is_recurring
+
+
+class FakeResponse:
+    """
+    Ответ в формате ``caldav.DAVResponse``: статус и заголовки.
+    """
+
+    def __init__(self, status: int, headers: dict[str, str] | None = None, raw: str = ""):
+        self.status = status
+        self.headers = headers or {}
+        self.raw = raw
+
+
+class FakeCalendar:
+    """
+    Календарь в памяти с той же поверхностью API, что использует CalDavService.
+    Блокирующая задержка имитирует синхронный HTTP-запрос библиотеки caldav.
+    """
+
+    def __init__(self, name: str, latency: float):
+        self.name = name
+        self.url = f"/calendars/{name}/"
+        self.__latency = latency
+        self.__events: dict[str, FakeEvent] = {}
+        self.__etags: dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    def date_search(self, start: datetime, end: datetime) -> list[FakeEvent]:
+        time.sleep(self.__latency)
+
+        with self.__lock:
+            return [
+                event for event in self.__events.values()
+                if event.start < end and (event.end > start or event.is_recurring)
+            ]
+
+    def add_event(self, ical: bytes | str) -> FakeEvent:
+        data = ical.decode() if isinstance(ical, bytes) else ical
+        href = f"{self.url}{next(Calendar.from_ical(data).walk('VEVENT')).get('UID')}.ics"
+        self.put(href, data, {})
+
+        return self.__events[href]
+
+    def put(self, href: str, data: str, headers: dict[str, str]) -> FakeResponse:
+        time.sleep(self.__latency)
+
+        component = next(Calendar.from_ical(data).walk("VEVENT"))
+
+        with self.__lock:
+            if headers.get("If-None-Match") == "*" and href in self.__events:
+                return FakeResponse(412)
+
+            if "If-Match" in headers and headers["If-Match"] != self.__etag(href):
+                return FakeResponse(412)
+
+            self.__events[href] = FakeEvent(data, component.get("DTSTART").dt, component.get("DTEND").dt, href,
+                                            component.get("RRULE") is not None)
+            self.__etags[href] = self.__etags.get(href, 0) + 1
+
+            return FakeResponse(201, {"ETag": self.__etag(href)})
+
+    def get(self, href: str) -> FakeResponse:
+        time.sleep(self.__latency)
+
+        with self.__lock:
+            if href not in self.__events:
+                return FakeResponse(404)
+
+            return FakeResponse(200, {"ETag": self.__etag(href)}, self.__events[href].data)
+
+    def delete(self, href: str, headers: dict[str, str]) -> FakeResponse:
+        time.sleep(self.__latency)
+
+        with self.__lock:
+            if href not in self.__events:
+                return FakeResponse(404)
+
+            if "If-Match" in headers and headers["If-Match"] != self.__etag(href):
+                return FakeResponse(412)
+
+            del self.__events[href]
+
+            return FakeResponse(204)
+
+    def __etag(self, href: str) -> str | None:
+        return f'"{self.__etags[href]}"' if href in self.__etags else None
+
+    def events_count(self) -> int:
+        with self.__lock:
+            return len(self.__events)
+
+
+class FakePrincipal:
+    def __init__(self, server: "FakeCalDavServer"):
+        self.__server = server
+
+    def calendars(self) -> list[FakeCalendar]:
+        return self.__server.calendars()
+
+    def calendar(self, name: str | None = None, cal_id: str | None = None, cal_url: str | None = None) -> FakeCalendar:
+        return self.__server.get_calendar(name or cal_id or cal_url)
+
+
+class FakeDAVClient:
+    """
+    Подменяет ``caldav.DAVClient``: все клиенты работают с одним общим сервером.
+    """
+    server: "FakeCalDavServer | None" = None
+
+    def __init__(self, url: str, username: str | None = None, password: str | None = None,
+                 timeout: float | None = None):
+        self.url = url
+
+    def principal(self) -> FakePrincipal:
+        return FakePrincipal(self.server)
+
+    def put(self, url: str, body: str, headers: dict[str, str] | None = None) -> FakeResponse:
+        return self.server.get_calendar_by_href(url).put(url, body, headers or {})
+
+    def request(self, url: str, method: str = "GET", body: str = "", headers: dict[str, str] | None = None):
+        calendar = self.server.get_calendar_by_href(url)
+
+        if method == "GET":
+            return calendar.get(url)
+
+        if method == "DELETE":
+            return calendar.delete(url, headers or {})
+
+        raise NotImplementedError(f"Фейковый CalDAV не поддерживает {method}")
+
+
+class FakeCalDavServer:
+    """
+    Локальная замена CalDAV-сервера с настраиваемой задержкой ответа.
+    """
+
+    def __init__(self, latency: float = 0.05):
+        self.__latency = latency
+        self.__calendars: dict[str, FakeCalendar] = {}
+        self.__lock = threading.Lock()
+
+    def get_calendar(self, name: str) -> FakeCalendar:
+        with self.__lock:
+            if name not in self.__calendars:
+                self.__calendars[name] = FakeCalendar(name, self.__latency)
+
+            return self.__calendars[name]
+
+    def calendars(self) -> list[FakeCalendar]:
+        with self.__lock:
+            return list(self.__calendars.values())
+
+    def get_calendar_by_href(self, href: str) -> FakeCalendar:
+        return self.get_calendar(href.rstrip("/").split("/")[-2])
+
+    def install(self) -> None:
+        """
+        Подключает сервер к CalDavService вместо настоящего caldav.DAVClient.
+        """
+        from bots.services import cal_dav_service
+
+        FakeDAVClient.server = self
+        cal_dav_service.caldav.DAVClient = FakeDAVClient
@@ -0,0 +1,105 @@
+"""
+Нагрузочный прогон бота: N пользователей проходят реальные сценарии через настоящие
+dispatcher и router, а Telegram Bot API и CalDAV заменены локальными серверами.
+
+Пример: ``python -m loadtest.run --users 50 --bookings 2 --caldav-latency 0.2``
+
+База данных используется настоящая: укажите тестовую через переменную DATABASE_URL.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from loadtest.fake_bot_api import FakeBotApi
+from loadtest.fake_caldav import FakeCalDavServer
+from loadtest.scenario import LatencyRecorder, SimulatedUser, UpdateFactory
+
+FIRST_USER_ID = 900_000_000
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест бота бронирования")
+    parser.add_argument("--users", type=int, default=20, help="Количество одновременных пользователей")
+    parser.add_argument("--bookings", type=int, default=1, help="Бронирований на пользователя")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Средняя пауза между действиями, с")
+    parser.add_argument("--caldav-latency", type=float, default=0.05, help="Задержка ответа CalDAV, с")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="Задержка ответа Bot API, с")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Сохранить отчёт в JSON-файл")
+    return parser.parse_args()
+
+
+async def run_load(arguments: argparse.Namespace, telegram_bot, caldav_server: FakeCalDavServer) -> dict:
+    from aiogram.client.telegram import TelegramAPIServer
+
+    bot_api = FakeBotApi(latency=arguments.api_latency)
+    await bot_api.start()
+
+    await telegram_bot.connect_services()
+    telegram_bot.bot.session.api = TelegramAPIServer.from_base(bot_api.base_url)
+    telegram_bot.dispatcher.include_router(telegram_bot.router)
+
+    recorder = LatencyRecorder()
+    factory = UpdateFactory(telegram_bot.bot.id)
+    rng = random.Random(arguments.seed)
+
+    users = [
+        SimulatedUser(FIRST_USER_ID + index, telegram_bot.dispatcher, telegram_bot.bot, factory, recorder,
+                      arguments.think_time, random.Random(rng.random()))
+        for index in range(arguments.users)
+    ]
+
+    started_at = time.perf_counter()
+
+    try:
+        await asyncio.gather(*(user.run(arguments.bookings) for user in users))
+    finally:
+        elapsed = time.perf_counter() - started_at
+        await bot_api.stop()
+        await telegram_bot.bot.session.close()
+
+    return {
+        "users": arguments.users,
+        "elapsed_seconds": elapsed,
+        "updates": recorder.total_updates,
+        "throughput_updates_per_second": recorder.total_updates / elapsed if elapsed else 0.0,
+        "bot_api_calls": bot_api.calls,
+        "caldav_events": sum(calendar.events_count() for calendar in caldav_server.calendars()),
+        "steps": recorder.summary(),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"Пользователей: {report['users']}, апдейтов: {report['updates']}, "
+          f"время: {report['elapsed_seconds']:.1f} с, "
+          f"пропускная способность: {report['throughput_updates_per_second']:.1f} апдейтов/с")
+    print(f"Событий в CalDAV: {report['caldav_events']}, вызовы Bot API: {report['bot_api_calls']}")
+    print(f"{'шаг':<18}{'count':>7}{'errors':>8}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}{'max, мс':>10}")
+
+    for step, stats in report["steps"].items():
+        print(f"{step:<18}{stats['count']:>7}{stats['errors']:>8}"
+              f"{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}"
+              f"{stats['p99'] * 1000:>10.1f}{stats['max'] * 1000:>10.1f}")
+
+
+def main() -> None:
+    arguments = parse_arguments()
+
+    caldav_server = FakeCalDavServer(latency=arguments.caldav_latency)
+    caldav_server.install()
+
+    # Подмена CalDAV до подключения: connect_services подключается к календарям преподавателей.
+    from bots.handlers import telegram_bot
+
+    report = asyncio.run(run_load(arguments, telegram_bot, caldav_server))
+    print_report(report)
+
+    if arguments.json_path:
+        with open(arguments.json_path, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+import math
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from bots.config.availability_days_config import AvailabilityDaysConfig
+from bots.utils.callback_data import CallbackData
+
+
+class UpdateFactory:
+    """
+    Собирает сырые апдейты Telegram (словари) для Dispatcher.feed_raw_update.
+    """
+
+    def __init__(self, bot_id: int):
+        self.__bot_id = bot_id
+        self.__update_ids = itertools.count(1)
+        self.__callback_ids = itertools.count(1)
+        self.__message_ids = itertools.count(1)
+
+    def message(self, user_id: int, text: str) -> dict:
+        return {
+            "update_id": next(self.__update_ids),
+            "message": {
+                "message_id": next(self.__message_ids),
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": self.__user(user_id),
+                "text": text,
+            },
+        }
+
+    def callback(self, user_id: int, data: str) -> dict:
+        return {
+            "update_id": next(self.__update_ids),
+            "callback_query": {
+                "id": str(next(self.__callback_ids)),
+                "from": self.__user(user_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": {
+                    "message_id": next(self.__message_ids),
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "from": {"id": self.__bot_id, "is_bot": True, "first_name": "bot"},
+                    "text": "Выберите действие:",
+                },
+            },
+        }
+
+    @staticmethod
+    def __user(user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"load{user_id}", "language_code": "ru"}
+
+
+class LatencyRecorder:
+    """
+    Копит длительности шагов сценария и считает перцентили.
+    """
+
+    def __init__(self):
+        self.__samples: dict[str, list[float]] = defaultdict(list)
+        self.__errors: dict[str, int] = defaultdict(int)
+
+    def record(self, step: str, duration: float) -> None:
+        self.__samples[step].append(duration)
+
+    def record_error(self, step: str) -> None:
+        self.__errors[step] += 1
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result = {}
+
+        for step, samples in sorted(self.__samples.items()):
+            ordered = sorted(samples)
+            result[step] = {
+                "count": len(ordered),
+                "errors": self.__errors.get(step, 0),
+                "p50": self.__percentile(ordered, 50),
+                "p95": self.__percentile(ordered, 95),
+                "p99": self.__percentile(ordered, 99),
+                "max": ordered[-1],
+            }
+
+        return result
+
+    @property
+    def total_updates(self) -> int:
+        return sum(len(samples) for samples in self.__samples.values())
+
+    @staticmethod
+    def __percentile(ordered: list[float], percent: int) -> float:
+        index = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class SimulatedUser:
+    """
+    Пользователь, проходящий типичный сценарий: /start, заполнение данных,
+    бронирование (календарь, навигация по месяцам, дата, час) и завершение.
+    """
+
+    def __init__(self, user_id: int, dispatcher, bot, factory: UpdateFactory, recorder: LatencyRecorder,
+                 think_time: float, rng: random.Random):
+        self.__user_id = user_id
+        self.__dispatcher = dispatcher
+        self.__bot = bot
+        self.__factory = factory
+        self.__recorder = recorder
+        self.__think_time = think_time
+        self.__rng = rng
+
+    async def run(self, bookings: int) -> None:
+        await self.__send("start", self.__factory.message(self.__user_id, "/start"))
+        await self.__send("change_data", self.__factory.callback(self.__user_id, CallbackData.UPDATE_DATA.value))
+        await self.__send("process_name", self.__factory.message(self.__user_id, f"Load{self.__user_id}"))
+        await self.__send("process_surname", self.__factory.message(self.__user_id, "Test"))
+        await self.__send("process_language", self.__factory.callback(self.__user_id, CallbackData.LANGUAGE_PYTHON.value))
+        await self.__send("confirm_changes", self.__factory.callback(self.__user_id, CallbackData.CONFIRM_CHANGES.value))
+
+        for _ in range(bookings):
+            await self.__book_once()
+
+    async def __book_once(self) -> None:
+        today = date.today()
+        next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+        selected_date = self.__pick_date(today)
+
+        await self.__send("book_event", self.__factory.callback(self.__user_id, CallbackData.BOOK_EVENT.value))
+        await self.__send("change_month", self.__factory.callback(
+            self.__user_id, CallbackData.month(next_month.year, next_month.month)))
+        await self.__send("change_month", self.__factory.callback(
+            self.__user_id, CallbackData.month(today.year, today.month)))
+        await self.__send("select_date", self.__factory.callback(
+            self.__user_id, CallbackData.date(selected_date.year, selected_date.month, selected_date.day)))
+        await self.__send("select_time", self.__factory.callback(
+            self.__user_id, CallbackData.time(selected_date, self.__rng.randint(10, 17))))
+        await self.__send("finish_booking", self.__factory.callback(self.__user_id, CallbackData.FINISH_BOOKING.value))
+
+    def __pick_date(self, today: date) -> date:
+        config = AvailabilityDaysConfig()
+
+        while True:
+            candidate = today + timedelta(days=self.__rng.randint(1, 30))
+
+            if not config.is_date_blocked(candidate):
+                return candidate
+
+    async def __send(self, step: str, update: dict) -> None:
+        await asyncio.sleep(self.__rng.uniform(0, 2 * self.__think_time))
+
+        started_at = time.perf_counter()
+
+        try:
+            await self.__dispatcher.feed_raw_update(self.__bot, update)
+        except Exception:
+            self.__recorder.record_error(step)
+        finally:
+            self.__recorder.record(step, time.perf_counter() - started_at)
@@ -1,6 +1,6 @@
 import asyncio
+from bots.config.cluster_config import WORKERS
 from bots.config.logging_config import get_logger
-from bots.handlers.telegram_bot import main as start_telegram_bot
 
 logger = get_logger(__name__)
 
@@ -8,14 +8,23 @@ logger = get_logger(__name__)
 async def start_application():
     """
     Главная точка запуска приложения.
+    При BOT_WORKERS > 1 запускается супервизор с webhook-фронтендом и воркерами,
+    иначе — один процесс с long polling.
     """
 
     logger.info("Запуск приложения...")
 
     try:
-        await start_telegram_bot()
+        if WORKERS > 1:
+            from bots.handlers.supervisor import Supervisor
+
+            await Supervisor(WORKERS).run()
+        else:
+            from bots.handlers.telegram_bot import main as start_telegram_bot
+
+            await start_telegram_bot()
     except Exception as exeption:
-        logger.error(f"Ошибка в приложении: {exeption}")
+        logger.error("Ошибка в приложении: %s", exeption)
     finally:
         logger.info("Приложение завершено.")
 
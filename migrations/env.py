@@ -0,0 +1,34 @@
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from bots.models import models  # noqa: F401 — регистрирует таблицы в Base.metadata
+from bots.models.base import Base
+from bots.models.database import DATABASE_URL
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """
+    Генерирует SQL без подключения к БД: ``alembic upgrade head --sql``.
+    """
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    engine = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, compare_type=True)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
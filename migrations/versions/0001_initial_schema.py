@@ -0,0 +1,71 @@
+"""Исходная схема: таблицы в том виде, в котором они создавались вручную.
+
+Для существующей базы выполните ``alembic stamp 0001``, затем ``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("telegram_id", sa.String(255), nullable=True),
+        sa.Column("name", sa.String(255), nullable=True),
+        sa.Column("surname", sa.String(255), nullable=True),
+        sa.Column("language", sa.String(50), nullable=True),
+        sa.Column("state", sa.String(255), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP, server_default=sa.func.now()),
+        sa.Column("is_banned", sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.Column("hour_rate", sa.Integer, nullable=False, server_default="1500"),
+    )
+    op.create_table(
+        "user_identities",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("platform", sa.String(16), nullable=False),
+        sa.Column("platform_user_id", sa.String(64), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "user_sessions",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("platform", sa.String(16), nullable=False),
+        sa.Column("state", sa.String(255), nullable=True),
+        sa.Column("state_payload", sa.JSON, nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP,
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        ),
+    )
+    op.create_table(
+        "fsm_states",
+        sa.Column("storage_key", sa.String(255), primary_key=True),
+        sa.Column("state", sa.String(255), nullable=True),
+        sa.Column("data", sa.JSON, nullable=False),
+    )
+    op.create_table(
+        "cache_versions",
+        sa.Column("topic", sa.String(64), primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cache_versions")
+    op.drop_table("fsm_states")
+    op.drop_table("user_sessions")
+    op.drop_table("user_identities")
+    op.drop_table("users")
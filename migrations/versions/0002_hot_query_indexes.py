@@ -0,0 +1,76 @@
+"""Индексы для горячих запросов и ограниченные типы колонок.
+
+- users.telegram_id: VARCHAR(64) и уникальный индекс (поиск legacy-пользователя);
+- user_identities (platform, platform_user_id): уникальный индекс для поиска по идентичности;
+- user_identities.user_id: индекс и внешний ключ;
+- user_sessions (user_id, platform): уникальный индекс для поиска и ON DUPLICATE KEY UPDATE.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "users",
+        "telegram_id",
+        existing_type=sa.String(255),
+        type_=sa.String(64),
+        existing_nullable=True,
+    )
+    op.create_unique_constraint("ux_users_telegram_id", "users", ["telegram_id"])
+
+    op.create_unique_constraint(
+        "ux_user_identities_platform_user",
+        "user_identities",
+        ["platform", "platform_user_id"],
+    )
+    op.create_index("ix_user_identities_user_id", "user_identities", ["user_id"])
+    op.create_foreign_key(
+        "fk_user_identities_user_id",
+        "user_identities",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+    op.create_unique_constraint(
+        "ux_user_sessions_user_platform",
+        "user_sessions",
+        ["user_id", "platform"],
+    )
+    op.create_foreign_key(
+        "fk_user_sessions_user_id",
+        "user_sessions",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_user_sessions_user_id", "user_sessions", type_="foreignkey")
+    op.drop_constraint("ux_user_sessions_user_platform", "user_sessions", type_="unique")
+
+    op.drop_constraint("fk_user_identities_user_id", "user_identities", type_="foreignkey")
+    op.drop_index("ix_user_identities_user_id", "user_identities")
+    op.drop_constraint("ux_user_identities_platform_user", "user_identities", type_="unique")
+
+    op.drop_constraint("ux_users_telegram_id", "users", type_="unique")
+    op.alter_column(
+        "users",
+        "telegram_id",
+        existing_type=sa.String(64),
+        type_=sa.String(255),
+        existing_nullable=True,
+    )
@@ -0,0 +1,31 @@
+"""users.updated_at: водяной знак для инкрементального обновления реестра банов.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP,
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        ),
+    )
+    op.create_index("ix_users_updated_at", "users", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_updated_at", "users")
+    op.drop_column("users", "updated_at")
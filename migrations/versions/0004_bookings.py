@@ -0,0 +1,33 @@
+"""bookings: локальная история бронирований для «Моих записей» без запросов к CalDAV.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bookings",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("start_at", sa.DateTime, nullable=False),
+        sa.Column("end_at", sa.DateTime, nullable=False),
+        sa.Column("caldav_uid", sa.String(255), nullable=False),
+        sa.Column("caldav_href", sa.String(512), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP, nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="fk_bookings_user_id", ondelete="CASCADE"),
+        sa.UniqueConstraint("caldav_uid", name="ux_bookings_caldav_uid"),
+    )
+    op.create_index("ix_bookings_user_start", "bookings", ["user_id", "start_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("bookings")
@@ -0,0 +1,23 @@
+"""bookings.caldav_etag и cancelled_at: условная отмена бронирования по адресу ресурса.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("bookings", sa.Column("caldav_etag", sa.String(255), nullable=True))
+    op.add_column("bookings", sa.Column("cancelled_at", sa.DateTime, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("bookings", "cancelled_at")
+    op.drop_column("bookings", "caldav_etag")
@@ -0,0 +1,25 @@
+"""bookings.recurrence_id: занятия еженедельной серии хранятся строками с общим UID события.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("bookings", sa.Column("recurrence_id", sa.DateTime, nullable=True))
+    op.create_unique_constraint("ux_bookings_caldav_uid_recurrence", "bookings", ["caldav_uid", "recurrence_id"])
+    op.drop_constraint("ux_bookings_caldav_uid", "bookings", type_="unique")
+
+
+def downgrade() -> None:
+    op.create_unique_constraint("ux_bookings_caldav_uid", "bookings", ["caldav_uid"])
+    op.drop_constraint("ux_bookings_caldav_uid_recurrence", "bookings", type_="unique")
+    op.drop_column("bookings", "recurrence_id")
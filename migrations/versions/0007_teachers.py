@@ -0,0 +1,55 @@
+"""teachers, teacher_calendars: реестр преподавателей с наборами календарей; выбор преподавателя у ученика и записи.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "teachers",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("caldav_url", sa.String(512), nullable=False),
+        sa.Column("caldav_username", sa.String(255), nullable=False),
+        sa.Column("caldav_password_env", sa.String(64), nullable=False),
+        sa.Column("hour_rate", sa.Integer, nullable=True),
+        sa.Column("availability", sa.JSON, nullable=True),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+        sa.Column("created_at", sa.TIMESTAMP, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "teacher_calendars",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("teacher_id", sa.Integer, nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("cal_id", sa.String(255), nullable=True),
+        sa.Column("url", sa.String(512), nullable=True),
+        sa.Column("is_booking_target", sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.ForeignKeyConstraint(["teacher_id"], ["teachers.id"], name="fk_teacher_calendars_teacher_id",
+                                ondelete="CASCADE"),
+        sa.UniqueConstraint("teacher_id", "name", name="ux_teacher_calendars_teacher_name"),
+    )
+
+    op.add_column("users", sa.Column("teacher_id", sa.Integer, nullable=True))
+    op.create_foreign_key("fk_users_teacher_id", "users", "teachers", ["teacher_id"], ["id"], ondelete="SET NULL")
+    op.add_column("bookings", sa.Column("teacher_id", sa.Integer, nullable=True))
+    op.create_foreign_key("fk_bookings_teacher_id", "bookings", "teachers", ["teacher_id"], ["id"],
+                          ondelete="SET NULL")
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_bookings_teacher_id", "bookings", type_="foreignkey")
+    op.drop_column("bookings", "teacher_id")
+    op.drop_constraint("fk_users_teacher_id", "users", type_="foreignkey")
+    op.drop_column("users", "teacher_id")
+    op.drop_table("teacher_calendars")
+    op.drop_table("teachers")
@@ -0,0 +1,33 @@
+"""booking_reminders: отметки об отправленных напоминаниях; индексы bookings по start_at и created_at.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "booking_reminders",
+        sa.Column("booking_id", sa.Integer, nullable=False),
+        sa.Column("offset_minutes", sa.Integer, nullable=False),
+        sa.Column("sent_at", sa.DateTime, nullable=False),
+        sa.PrimaryKeyConstraint("booking_id", "offset_minutes"),
+        sa.ForeignKeyConstraint(["booking_id"], ["bookings.id"], name="fk_booking_reminders_booking_id",
+                                ondelete="CASCADE"),
+    )
+    op.create_index("ix_bookings_start_at", "bookings", ["start_at"])
+    op.create_index("ix_bookings_created_at", "bookings", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_created_at", table_name="bookings")
+    op.drop_index("ix_bookings_start_at", table_name="bookings")
+    op.drop_table("booking_reminders")
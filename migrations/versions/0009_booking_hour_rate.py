@@ -0,0 +1,21 @@
+"""bookings.hour_rate: ставка на момент бронирования для отчётов о выручке.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("bookings", sa.Column("hour_rate", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("bookings", "hour_rate")